@@ -8,56 +8,50 @@ from flask import Flask
 from flask_migrate import Migrate
 from flask_executor import Executor
 from .models import db
+from .services import config_cache, db_profile, serialization
+
+
+# Verzeichnis der JSON-Dateien mit Konfiguration und Vorschlägen
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
 
 
 def get_attribute_suggestions() -> Dict[str, Any]:
-    """Läd die Attribut-Vorschläge aus der JSON-Datei."""
+    """Läd die Attribut-Vorschläge aus der JSON-Datei (zwischengespeichert)."""
     try:
-        # Pfad korrigiert relativ zur App-Basis
-        filepath = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)),
-            "..",
-            "data",
-            "attribute_suggestions.json",
-        )
-        with open(filepath, "r", encoding="utf-8") as file:
-            return json.load(file)
+        return config_cache.get_file(
+            os.path.join(DATA_DIR, "attribute_suggestions.json")
+        ).load()
     except (FileNotFoundError, json.JSONDecodeError) as err:
         print(f"Fehler beim Laden von data/attribute_suggestions.json: {err}")
         return {}
 
 
 def get_selection_options() -> Dict[str, List[str]]:
-    """Läd die globalen Auswahloptionen aus der JSON-Datei."""
+    """Läd die globalen Auswahloptionen aus der JSON-Datei (zwischengespeichert)."""
     try:
-        # Pfad korrigiert relativ zur App-Basis
-        filepath = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)),
-            "..",
-            "data",
-            "selection_options.json",
+        options_list = (
+            config_cache.get_file(os.path.join(DATA_DIR, "selection_options.json"))
+            .load()
+            .get("options", [])
         )
-        with open(filepath, "r", encoding="utf-8") as file:
-            # Die Optionen werden in einem Dictionary bereitgestellt, das nach Attributname mappt
-            options_list = json.load(file).get("options", [])
-            options_dict = {
-                item["name"]: [val.strip() for val in item["values"].split(",")]
-                for item in options_list
-            }
-            return options_dict
+        # Die Optionen werden in einem Dictionary bereitgestellt, das nach Attributname mappt
+        options_dict = {
+            item["name"]: [val.strip() for val in item["values"].split(",")]
+            for item in options_list
+        }
+        return options_dict
     except (FileNotFoundError, json.JSONDecodeError) as err:
         print(f"Fehler beim Laden von data/selection_options.json: {err}")
         return {}
 
 
 def get_config() -> Dict[str, Any]:
-    """Läd die allgemeine Konfiguration aus der JSON-Datei."""
+    """
+    Läd die allgemeine Konfiguration aus der JSON-Datei (zwischengespeichert).
+    Das Ergebnis wird geteilt und darf nicht verändert werden.
+    """
     try:
-        filepath = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "..", "data", "config.json"
-        )
-        with open(filepath, "r", encoding="utf-8") as file:
-            return json.load(file)
+        return config_cache.get_file(os.path.join(DATA_DIR, "config.json")).load()
     except (FileNotFoundError, json.JSONDecodeError) as err:
         print(f"Fehler beim Laden von data/config.json: {err}")
         return {}
@@ -81,18 +75,45 @@ def create_app() -> Flask:
     os.makedirs(upload_path, exist_ok=True)
 
     app.config["SECRET_KEY"] = "dein-super-geheimer-schluessel-hier"
-    db_uri = f"sqlite:///{os.path.join(instance_path, 'kundenverwaltung.db')}"
-    app.config["SQLALCHEMY_DATABASE_URI"] = db_uri
+    # Datenbank (SQLite oder DATABASE_URL), Verbindungspool und SQLite-PRAGMAs
+    db_profile.configure(app, instance_path)
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["UPLOAD_FOLDER"] = upload_path
+    # Anzahl der Kontakte, die beim Import pro Transaktion gespeichert werden
+    app.config["IMPORT_CHUNK_SIZE"] = 5000
+    # Beim Excel-Import alle Tabellenblätter statt nur des aktiven einlesen
+    app.config["IMPORT_XLSX_ALL_SHEETS"] = False
+    # Worker-Prozesse, auf die mehrere hochgeladene Dateien verteilt werden
+    app.config["IMPORT_WORKERS"] = os.cpu_count() or 1
+    # Maximale Anzahl gleichzeitig verarbeiteter Uploads pro Worker-Prozess des Servers
+    app.config["MAX_CONCURRENT_IMPORTS"] = 2
+    # Gemeinsamer Speicher für Hintergrundaufgaben aller Worker-Prozesse
+    app.config["TASK_STORE_PATH"] = os.path.join(instance_path, "tasks.db")
+    # Nicht abgefragte Aufgaben samt Ergebnissen werden nach dieser Zeit gelöscht
+    app.config["TASK_TTL_SECONDS"] = 6 * 60 * 60
+    # Fertige PDF-Exporte liegen hier, bis sie heruntergeladen werden
+    export_path = os.path.join(instance_path, "exports")
+    os.makedirs(export_path, exist_ok=True)
+    app.config["EXPORT_FOLDER"] = export_path
+    # Seiten pro Teilstück, die beim PDF-Export parallel gerendert werden
+    app.config["EXPORT_PDF_CHUNK_PAGES"] = 50
+    # Format, in dem die Attribute eines Kontakts gespeichert werden ("orjson" oder "json")
+    app.config["KONTAKT_DATA_CODEC"] = "orjson"
+    serialization.set_data_codec(app.config["KONTAKT_DATA_CODEC"])
 
     # Datenbank und Migration initialisieren
     db.init_app(app)
+    db_profile.init_app(app, db)
     Migrate(app, db)
 
     # Executor für Hintergrundaufgaben initialisieren
     Executor(app)
 
+    # pylint: disable=import-outside-toplevel
+    from .services import task_store
+
+    task_store.init_app(app)
+
     with app.app_context():
         # pylint: disable=import-outside-toplevel, cyclic-import
         from .routes import main, vorlagen, kontakte, api, import_export, settings
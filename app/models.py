@@ -1,12 +1,88 @@
 # app/models.py
 """This module defines the database models for the application."""
-import json
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, event
+
+from .services.serialization import (
+    CompressedText,
+    dumps_data,
+    loads_data,
+    loads_data_many,
+)
 
 db = SQLAlchemy()
 
+# Alle Attributwerte eines Kontakts als durchsuchbarer Text (für den Volltextindex)
+_KONTAKT_FTS_INHALT = (
+    "(SELECT group_concat(value, ' ') FROM json_each("
+    "CASE WHEN json_valid(NEW.daten) THEN NEW.daten ELSE '{}' END"
+    ") WHERE atom IS NOT NULL)"
+)
+
+# Volltextindex (SQLite FTS5) über Kontakte, wird per Trigger synchron gehalten.
+# Die rowid des Index entspricht der Kontakt-ID.
+KONTAKT_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS kontakt_fts USING fts5("
+    "vorname, nachname, firma, inhalt, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "CREATE TRIGGER IF NOT EXISTS kontakt_fts_insert AFTER INSERT ON kontakt BEGIN "
+    "INSERT INTO kontakt_fts (rowid, vorname, nachname, firma, inhalt) VALUES "
+    f"(NEW.id, NEW.vorname, NEW.nachname, NEW.firma, {_KONTAKT_FTS_INHALT}); END",
+    "CREATE TRIGGER IF NOT EXISTS kontakt_fts_delete AFTER DELETE ON kontakt BEGIN "
+    "DELETE FROM kontakt_fts WHERE rowid = OLD.id; END",
+    "CREATE TRIGGER IF NOT EXISTS kontakt_fts_update "
+    "AFTER UPDATE OF daten, vorname, nachname, firma ON kontakt BEGIN "
+    "DELETE FROM kontakt_fts WHERE rowid = OLD.id; "
+    "INSERT INTO kontakt_fts (rowid, vorname, nachname, firma, inhalt) VALUES "
+    f"(NEW.id, NEW.vorname, NEW.nachname, NEW.firma, {_KONTAKT_FTS_INHALT}); END",
+]
+
+
+# Häufig gefilterte und sortierte Attribute aus `daten`, die in SQLite als generierte
+# Spalten (json_extract) mit Index vorliegen: Attributname -> Spaltenname.
+# Neue Einträge benötigen eine Migration, die Spalte und Index anlegt.
+INDEXED_ATTRIBUTES = {
+    "Postleitzahl": "attr_postleitzahl",
+    "Ort": "attr_ort",
+    "E-Mail": "attr_email",
+    "Anrede": "attr_anrede",
+}
+
+
+def indexed_attribute_ddl(attribute: str, column_name: str):
+    """
+    DDL für die generierte Spalte eines Attributs und ihren Index. Der Index passt zur
+    Sortierung der Kontaktliste (Vorlage, Wert ohne Groß-/Kleinschreibung, ID).
+    """
+    path = attribute.replace("\\", "\\\\").replace('"', '\\"').replace("'", "''")
+    return [
+        f"ALTER TABLE kontakt ADD COLUMN {column_name} GENERATED ALWAYS AS ("
+        f"CASE WHEN json_valid(daten) THEN json_extract(daten, '$.\"{path}\"') END"
+        ") VIRTUAL",
+        f"CREATE INDEX IF NOT EXISTS ix_kontakt_{column_name} ON kontakt "
+        f"(vorlage_id, coalesce({column_name}, '') COLLATE NOCASE, id)",
+    ]
+
+
+# Als eigene Spalten gespiegelte Suchfelder: Spalte -> (Attribut, Ersatz aus englischen
+# Importen, falls das Attribut fehlt)
+MIRRORED_ATTRIBUTES = {
+    "vorname": ("Vorname", "First Name"),
+    "nachname": ("Nachname", "Last Name"),
+    "firma": ("Firma", "Company"),
+}
+
+
+# Indizes für die Sortierung der Kontaktliste nach den gespiegelten Suchspalten. Sie
+# entsprechen exakt dem Sortierausdruck in kontakt_service (coalesce + NOCASE).
+KONTAKT_SORT_INDEX_DDL = [
+    f"CREATE INDEX IF NOT EXISTS ix_kontakt_{column_name}_nocase ON kontakt "
+    f"(vorlage_id, coalesce({column_name}, '') COLLATE NOCASE, id)"
+    for column_name in ("vorname", "nachname", "firma")
+]
+
 
 class Vorlage(db.Model):
     """Definiert die Struktur eines Kontakttyps."""
@@ -38,7 +114,9 @@ class Gruppe(db.Model):
     __tablename__ = "gruppe"
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    vorlage_id = db.Column(db.Integer, db.ForeignKey("vorlage.id"), nullable=False)
+    vorlage_id = db.Column(
+        db.Integer, db.ForeignKey("vorlage.id"), nullable=False, index=True
+    )
     eigenschaften = db.relationship(
         "Eigenschaft", backref="gruppe", lazy=True, cascade="all, delete-orphan"
     )
@@ -52,7 +130,9 @@ class Eigenschaft(db.Model):
     name = db.Column(db.String(100), nullable=False)
     datentyp = db.Column(db.String(50), nullable=False)
     optionen = db.Column(db.Text)
-    gruppe_id = db.Column(db.Integer, db.ForeignKey("gruppe.id"), nullable=False)
+    gruppe_id = db.Column(
+        db.Integer, db.ForeignKey("gruppe.id"), nullable=False, index=True
+    )
     # NEUES FELD für Mehrfachauswahl
     allow_multiselect = db.Column(db.Boolean, default=False, nullable=False)
 
@@ -62,11 +142,13 @@ class Kontakt(db.Model):
 
     __tablename__ = "kontakt"
     id = db.Column(db.Integer, primary_key=True)
-    vorlage_id = db.Column(db.Integer, db.ForeignKey("vorlage.id"), nullable=False)
+    vorlage_id = db.Column(
+        db.Integer, db.ForeignKey("vorlage.id"), nullable=False, index=True
+    )
     daten = db.Column(db.Text, nullable=False, default="{}")
 
-    # NEUES FELD für den rohen Import-Inhalt
-    import_raw_content = db.Column(db.Text, nullable=True)
+    # NEUES FELD für den rohen Import-Inhalt (komprimiert gespeichert)
+    import_raw_content = db.Column(CompressedText, nullable=True)
 
     # NEUES FELD für die Quittierung von Validierungsfehlern
     validation_acknowledged = db.Column(db.Boolean, default=False, nullable=False)
@@ -77,19 +159,65 @@ class Kontakt(db.Model):
     firma = db.Column(db.String(100))
 
     def get_data(self) -> Dict[str, Any]:
-        """Gibt die gespeicherten JSON-Daten als Python-Dictionary zurück."""
-        return json.loads(self.daten or "{}")
+        """
+        Gibt die gespeicherten JSON-Daten als Python-Dictionary zurück. Das Ergebnis wird
+        am Objekt zwischengespeichert, solange sich `daten` nicht ändert. Änderungen am
+        Dictionary müssen deshalb immer mit set_data gespeichert werden.
+        """
+        cache = getattr(self, "_data_cache", None)
+        # Identitätsvergleich: Auch ein neu geladener, gleicher Wert wird neu dekodiert
+        if cache is None or cache[0] is not self.daten:
+            cache = (self.daten, loads_data(self.daten))
+            self._data_cache = cache
+        return cache[1]
+
+    @staticmethod
+    def get_data_many(kontakte: List["Kontakt"]) -> List[Dict[str, Any]]:
+        """Dekodiert die Daten mehrerer Kontakte auf einmal und füllt ihre Zwischenspeicher."""
+        texts = [kontakt.daten for kontakt in kontakte]
+        decoded = loads_data_many(texts)
+        for kontakt, text, data in zip(kontakte, texts, decoded):
+            kontakt._data_cache = (text, data)  # pylint: disable=protected-access
+        return decoded
+
+    @staticmethod
+    def prepare_data(data_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Bereitet ein Daten-Dictionary für die Speicherung vor und gibt die Spaltenwerte
+        (daten, vorname, nachname, firma) zurück. Wird auch für Massen-Inserts genutzt.
+        """
+        for key, value in data_dict.items():
+            data_dict[key] = Kontakt.prepare_value(value)
+
+        # Die Suchfelder werden aus den Daten übernommen
+        row = {"daten": dumps_data(data_dict)}
+        for column_name, (attribute, fallback) in MIRRORED_ATTRIBUTES.items():
+            row[column_name] = data_dict.get(attribute, data_dict.get(fallback, ""))
+        return row
+
+    @staticmethod
+    def prepare_value(value: Any) -> Any:
+        """Konvertiert Listen (von Multi-Selects) in kommaseparierte Strings."""
+        if isinstance(value, list):
+            return ", ".join(map(str, value))
+        return value
 
     def set_data(self, data_dict: Dict[str, Any]):
         """Speichert das Python-Dictionary als JSON und aktualisiert die Suchfelder."""
-        # Konvertiere Listen (von Multi-Selects) in kommaseparierte Strings
-        for key, value in data_dict.items():
-            if isinstance(value, list):
-                data_dict[key] = ", ".join(map(str, value))
-
-        # Aktualisiere die Suchfelder basierend auf den Daten
-        self.vorname = data_dict.get("Vorname", data_dict.get("First Name", ""))
-        self.nachname = data_dict.get("Nachname", data_dict.get("Last Name", ""))
-        # KORREKTUR: Tippfehler von data_get zu data_dict.get behoben
-        self.firma = data_dict.get("Firma", data_dict.get("Company", ""))
-        self.daten = json.dumps(data_dict)
+        self._data_cache = None
+        for column_name, value in self.prepare_data(data_dict).items():
+            setattr(self, column_name, value)
+
+
+# Legt Volltextindex, Sortierindizes und generierte Spalten an, wenn die Tabelle über db.create_all()
+# erstellt wird. Bestehende Datenbanken erhalten sie über die entsprechenden Migrationen.
+for _statement in KONTAKT_FTS_DDL + KONTAKT_SORT_INDEX_DDL + [
+    statement
+    for attribute, column_name in INDEXED_ATTRIBUTES.items()
+    for statement in indexed_attribute_ddl(attribute, column_name)
+]:
+    event.listen(
+        Kontakt.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
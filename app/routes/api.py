@@ -1,23 +1,43 @@
 # app/routes/api.py
 """Dieses Modul definiert die API-Endpunkte für die Anwendung."""
-from flask import Blueprint, jsonify, send_from_directory, request
+import json
+import os
+from flask import Blueprint, Response, abort, jsonify, request
 from sqlalchemy.exc import SQLAlchemyError
-from ..models import db, Kontakt
+from .. import DATA_DIR
+from ..models import db, Kontakt, Vorlage
+from ..services import config_cache, kontakt_service
 from ..services.gender_detector import get_anrede_from_vorname as guess_anrede
 
 bp = Blueprint("api", __name__, url_prefix="/api")
 
 
+def _cached_json_file(filename: str) -> Response:
+    """
+    Liefert eine JSON-Datei aus `data/` aus dem Cache. Mit ETag: kennt der Browser die
+    aktuelle Version bereits, wird nur 304 Not Modified gesendet.
+    """
+    try:
+        raw, etag = config_cache.get_file(os.path.join(DATA_DIR, filename)).read_raw()
+    except FileNotFoundError:
+        abort(404)
+    response = Response(raw, mimetype="application/json")
+    response.set_etag(etag)
+    # Der Browser darf die Datei behalten, muss aber vor jeder Verwendung nachfragen
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
 @bp.route("/attribute-suggestions")
 def attribute_suggestions():
     """Liefert die JSON-Datei mit Vorschlägen für Attribute."""
-    return send_from_directory("../data", "attribute_suggestions.json")
+    return _cached_json_file("attribute_suggestions.json")
 
 
 @bp.route("/selection-options")
 def selection_options():
     """Liefert die JSON-Datei mit globalen Auswahloptionen."""
-    return send_from_directory("../data", "selection_options.json")
+    return _cached_json_file("selection_options.json")
 
 
 @bp.route("/kontakte-by-vorlage/<int:vorlage_id>")
@@ -25,8 +45,7 @@ def get_kontakte_by_vorlage(vorlage_id):
     """Gibt alle Kontakte für eine bestimmte Vorlagen-ID zurück."""
     kontakte = Kontakt.query.filter_by(vorlage_id=vorlage_id).all()
     result = []
-    for k in kontakte:
-        data = k.get_data()
+    for k, data in zip(kontakte, Kontakt.get_data_many(kontakte)):
         display_name = (
             data.get("Name")
             or f"{data.get('Vorname', '')} {data.get('Nachname', '')}".strip()
@@ -36,6 +55,38 @@ def get_kontakte_by_vorlage(vorlage_id):
     return jsonify(result)
 
 
+@bp.route("/vorlage/<int:vorlage_id>/kontakte")
+def list_kontakte(vorlage_id):
+    """
+    Liefert Kontakte einer Vorlage seitenweise (Keyset-Paginierung).
+
+    Query-Parameter: sort, dir (asc/desc), cursor, limit, q (Freitextsuche)
+    und filter (JSON-Objekt Attributname -> Teilstring).
+    """
+    if db.session.get(Vorlage, vorlage_id) is None:
+        return jsonify({"success": False, "error": "Vorlage nicht gefunden"}), 404
+
+    try:
+        filters = json.loads(request.args.get("filter") or "{}")
+        if not isinstance(filters, dict):
+            raise ValueError("Filter muss ein Objekt sein")
+        page = kontakt_service.list_kontakte_page(
+            vorlage_id,
+            sort=request.args.get("sort", "id"),
+            direction=request.args.get("dir", "asc"),
+            cursor=request.args.get("cursor") or None,
+            limit=request.args.get(
+                "limit", kontakt_service.DEFAULT_PAGE_SIZE, type=int
+            ),
+            filters=filters,
+            search=request.args.get("q", ""),
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    return jsonify({"success": True, **page})
+
+
 @bp.route("/kontakt/<int:kontakt_id>/update", methods=["POST"])
 def update_kontakt_field(kontakt_id):
     """Aktualisiert ein einzelnes Feld eines Kontakts in der Datenbank."""
@@ -49,13 +100,41 @@ def update_kontakt_field(kontakt_id):
     if field_name is None:
         return jsonify({"success": False, "error": "Fehlende Daten"}), 400
 
-    kontakt_daten = kontakt.get_data()
-    kontakt_daten[field_name] = new_value
-    kontakt.set_data(kontakt_daten)
-    db.session.commit()
+    try:
+        (result,) = kontakt_service.update_fields(
+            [{"id": kontakt_id, "fields": {field_name: new_value}}]
+        )
+    except SQLAlchemyError as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+    if not result["success"]:
+        return jsonify(result), 400
     return jsonify({"success": True, "message": "Feld aktualisiert"})
 
 
+@bp.route("/kontakte", methods=["PATCH"])
+def update_kontakte_fields():
+    """
+    Ändert Attribute mehrerer Kontakte in einer Transaktion.
+
+    Erwartet {"updates": [{"id": 1, "fields": {"Ort": "Leer"}}, ...]} und liefert in
+    `results` pro Eintrag {"id", "success"} bzw. "error", in derselben Reihenfolge.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "Fehlende Daten"}), 400
+
+    try:
+        results = kontakt_service.update_fields(data.get("updates"))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except SQLAlchemyError as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    return jsonify(
+        {"success": all(r["success"] for r in results), "results": results}
+    )
+
+
 @bp.route("/kontakt/neu", methods=["POST"])
 def create_kontakt():
     """Erstellt einen neuen Kontakt in der Datenbank."""
@@ -66,7 +145,10 @@ def create_kontakt():
         return jsonify({"success": False, "error": "Fehlende Daten"}), 400
 
     neuer_kontakt = Kontakt(vorlage_id=vorlage_id)
-    neuer_kontakt.set_data(kontakt_daten)
+    try:
+        neuer_kontakt.set_data(kontakt_daten)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     db.session.add(neuer_kontakt)
     db.session.commit()
 
@@ -1,71 +1,222 @@
 # app/routes/import_export.py
 """This module handles the import and export of contact data."""
 import os
+import threading
 import uuid
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from typing import List, Dict, Any, Tuple, Union
-
-from flask import Blueprint, request, jsonify, flash, url_for, Response, current_app
+from typing import List, Dict, Any, Optional, Union
+
+from flask import (
+    Blueprint,
+    request,
+    jsonify,
+    flash,
+    url_for,
+    Response,
+    current_app,
+    stream_with_context,
+)
 from flask_executor import Executor
+from sqlalchemy.exc import SQLAlchemyError
 from werkzeug.utils import secure_filename
 
 from ..models import db, Vorlage, Kontakt
-from ..services import importer_service, exporter_service
-
-# KORREKTUR: Relative Import-Ebene korrigiert
-from .. import get_config
+from ..services import importer_service, exporter_service, task_store, worker_pool
 
 bp = Blueprint("import_export", __name__)
 ALLOWED_EXTENSIONS = {"csv", "msg", "oft", "txt", "vcf", "xlsx"}
 
-# Ein einfacher In-Memory-Speicher für den Fortschritt der Tasks
-task_progress = {}
+# Anzahl der Datensätze, die für die Vorschau im Ergebnis mitgeliefert werden
+PREVIEW_ROWS = 5
 
+# Anzahl der gleichzeitig laufenden Datei-Importe dieses Prozesses
+_active_imports = 0
+_active_imports_lock = threading.Lock()
 
-def process_files_task(task_id: str, file_paths: List[Dict[str, str]]):
+
+def _try_start_import() -> bool:
+    """Reserviert einen Import-Platz, solange MAX_CONCURRENT_IMPORTS nicht erreicht ist."""
+    global _active_imports  # pylint: disable=global-statement
+    with _active_imports_lock:
+        if _active_imports >= current_app.config["MAX_CONCURRENT_IMPORTS"]:
+            return False
+        _active_imports += 1
+        return True
+
+
+def _finish_import():
+    """Gibt einen Import-Platz wieder frei."""
+    global _active_imports  # pylint: disable=global-statement
+    with _active_imports_lock:
+        _active_imports = max(0, _active_imports - 1)
+
+
+class _ImportCollector:
     """
-    Diese Funktion läuft im Hintergrund und verarbeitet die hochgeladenen Dateien.
+    Sammelt Spaltennamen und Vorschau der geparsten Datensätze und lagert die
+    Datensätze selbst in den Task-Speicher aus, damit sie nicht im Speicher bleiben.
     """
-    total_files = len(file_paths)
-    all_records: List[Dict[str, Any]] = []
-    error_list: List[Dict[str, str]] = []
-
-    task_progress[task_id] = {
-        "status": "processing",
-        "progress": 0,
-        "total": total_files,
-        "result": None,
-    }
-
-    for i, file_info in enumerate(file_paths):
-        filename = file_info["original_name"]
-        filepath = file_info["path"]
 
-        try:
-            data = importer_service.import_file_from_path(filepath)
-            if isinstance(data, dict) and "error" in data:
-                error_list.append({"filename": filename, "error": data["error"]})
-            else:
-                all_records.extend(data)
-        except (IOError, ValueError) as e:
-            error_list.append(
-                {"filename": filename, "error": f"Systemfehler: {str(e)}"}
-            )
-        finally:
-            if os.path.exists(filepath):
-                os.remove(filepath)
+    def __init__(self, task_id: str, file_count: int):
+        self.task_id = task_id
+        self.headers: Dict[str, None] = {}
+        self.previews: List[List[Dict[str, Any]]] = [[] for _ in range(file_count)]
+        self.records = 0
+
+    def reset(self):
+        """Verwirft alles bisher Gesammelte, z.B. nach einem Fehler mitten in der Datei."""
+        self.headers = {}
+        self.previews = [[] for _ in self.previews]
+        self.records = 0
+
+    def add(self, part: int, records: List[Dict[str, Any]], start: int = 0) -> int:
+        """Übernimmt einen Block Datensätze der Datei `part`."""
+        for record in records:
+            self.headers.update(dict.fromkeys(record))
+        preview = self.previews[part]
+        preview.extend(records[: PREVIEW_ROWS - len(preview)])
+        self.records += len(records)
+        return task_store.append_rows(self.task_id, records, part, start)
+
+    def preview(self) -> List[Dict[str, Any]]:
+        """Die ersten Datensätze in der Reihenfolge der hochgeladenen Dateien."""
+        return [record for part in self.previews for record in part][:PREVIEW_ROWS]
+
+
+def _read_single_file(
+    collector: _ImportCollector, filepath: str, xlsx_all_sheets: bool
+):
+    """Liest eine einzelne Datei blockweise im aktuellen Thread und meldet die Datensätze."""
+    position = 0
+    # Große Dateien werden blockweise eingelesen
+    for chunk in importer_service.iter_file_records(
+        filepath, xlsx_all_sheets=xlsx_all_sheets
+    ):
+        position = collector.add(0, chunk, position)
+        task_store.update_task(collector.task_id, records=collector.records)
 
-        task_progress[task_id]["progress"] = i + 1
 
-    all_headers = set(key for record in all_records for key in record.keys())
+def process_files_task(task_id: str, file_paths: List[Dict[str, str]]):
+    """
+    Diese Funktion läuft im Hintergrund und verarbeitet die hochgeladenen Dateien.
+    Mehrere Dateien werden parallel auf den Worker-Prozessen geparst, das Ergebnis
+    behält aber die Reihenfolge der hochgeladenen Dateien bei.
+    """
+    total_files = len(file_paths)
+    collector = _ImportCollector(task_id, total_files)
+    file_errors: Dict[int, str] = {}
+    xlsx_all_sheets = current_app.config["IMPORT_XLSX_ALL_SHEETS"]
+
+    try:
+        if total_files == 1:
+            # Eine einzelne (evtl. große) Datei lohnt den Umweg über den Pool nicht
+            try:
+                _read_single_file(collector, file_paths[0]["path"], xlsx_all_sheets)
+            except Exception as e:  # pylint: disable=broad-except
+                # Jeder Parserfehler (z.B. zipfile.BadZipFile) betrifft nur diese Datei.
+                # Wie bei mehreren Dateien wird sie nicht teilweise importiert.
+                task_store.delete_rows(task_id)
+                collector.reset()
+                file_errors[0] = str(e)
+            task_store.update_task(task_id, progress=1)
+        else:
+            pool = worker_pool.get_pool(current_app.config["IMPORT_WORKERS"])
+            futures = {
+                pool.submit(
+                    importer_service.parse_file, file_info["path"], xlsx_all_sheets
+                ): i
+                for i, file_info in enumerate(file_paths)
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                i = futures[future]
+                try:
+                    collector.add(i, future.result())
+                except BrokenProcessPool:
+                    file_errors[i] = "Die Datei konnte nicht verarbeitet werden."
+                except Exception as e:  # pylint: disable=broad-except
+                    file_errors[i] = str(e)
+                task_store.update_task(
+                    task_id, progress=done, records=collector.records
+                )
+
+            if any(isinstance(f.exception(), BrokenProcessPool) for f in futures):
+                # Ein abgestürzter Worker macht den ganzen Pool unbrauchbar
+                worker_pool.reset_pool()
+
+        error_list = [
+            {"filename": file_paths[i]["original_name"], "error": file_errors[i]}
+            for i in sorted(file_errors)
+        ]
+        task_store.update_task(
+            task_id,
+            status="complete",
+            records=collector.records,
+            result={
+                "headers": list(collector.headers),
+                "preview_data": collector.preview(),
+                "errors": error_list,
+            },
+        )
+    except Exception as e:  # pylint: disable=broad-except
+        # Sonst bliebe die Aufgabe für immer im Status "processing"
+        current_app.logger.error(f"Import {task_id} fehlgeschlagen: {e}")
+        task_store.delete_rows(task_id)
+        task_store.update_task(
+            task_id, status="error", error=f"Fehler beim Verarbeiten: {e}"
+        )
+    finally:
+        for file_info in file_paths:
+            if os.path.exists(file_info["path"]):
+                os.remove(file_info["path"])
+        _finish_import()
+
+
+def save_import_task(
+    task_id: str,
+    vorlage_id: int,
+    mappings: Dict[str, str],
+    chunk_size: int,
+    redirect_url: str,
+):
+    """
+    Speichert die bereitgestellten Datensätze eines Imports im Hintergrund blockweise
+    in der Datenbank. Die Datensätze werden dabei direkt aus dem Task-Speicher gelesen.
+    """
 
-    task_progress[task_id]["status"] = "complete"
-    task_progress[task_id]["result"] = {
-        "headers": list(all_headers),
-        "preview_data": all_records[:5],
-        "original_data": all_records,
-        "errors": error_list,
-    }
+    def report_progress(processed: int):
+        task_store.update_task(task_id, progress=processed)
+
+    try:
+        count = importer_service.bulk_insert_kontakte(
+            vorlage_id,
+            task_store.iter_rows(task_id),
+            mappings,
+            chunk_size=chunk_size,
+            progress_callback=report_progress,
+        )
+    except SQLAlchemyError as e:
+        task_store.update_task(
+            task_id, status="error", error=f"Fehler beim Speichern: {e}"
+        )
+        return
+    except Exception as e:  # pylint: disable=broad-except
+        # Jeder Fehler muss beim Abfragen ankommen, sonst wartet die Oberfläche endlos
+        current_app.logger.error(f"Import {task_id} fehlgeschlagen: {e}")
+        task_store.update_task(
+            task_id, status="error", error=f"Fehler beim Importieren: {e}"
+        )
+        return
+    finally:
+        # Bereits gespeicherte Blöcke dürfen nicht erneut importiert werden
+        task_store.delete_rows(task_id)
+
+    task_store.update_task(
+        task_id,
+        status="complete",
+        result={"imported": count, "redirect_url": redirect_url},
+    )
 
 
 @bp.route("/import/upload", methods=["POST"])
@@ -80,21 +231,40 @@ def upload_import_file():
     if not files or files[0].filename == "":
         return jsonify({"error": "Keine Dateien ausgewählt."}), 400
 
+    if not _try_start_import():
+        return (
+            jsonify(
+                {
+                    "error": "Es laufen bereits zu viele Importe. Bitte später erneut versuchen."
+                }
+            ),
+            429,
+        )
+
     executor = Executor(current_app)
     task_id = uuid.uuid4().hex
     temp_dir = current_app.config["UPLOAD_FOLDER"]
     file_paths = []
 
-    for file in files:
-        filename = secure_filename(file.filename) if file.filename else "tempfile"
-        file_ext = os.path.splitext(filename)[1].lower()
-
-        temp_filename = f"{task_id}_{uuid.uuid4().hex}{file_ext}"
-        filepath = os.path.join(temp_dir, temp_filename)
-        file.save(filepath)
-        file_paths.append({"path": filepath, "original_name": file.filename})
-
-    executor.submit(process_files_task, task_id, file_paths)
+    try:
+        for file in files:
+            filename = secure_filename(file.filename) if file.filename else "tempfile"
+            file_ext = os.path.splitext(filename)[1].lower()
+
+            temp_filename = f"{task_id}_{uuid.uuid4().hex}{file_ext}"
+            filepath = os.path.join(temp_dir, temp_filename)
+            file_paths.append({"path": filepath, "original_name": file.filename})
+            file.save(filepath)
+
+        task_store.create_task(task_id, "processing", total=len(file_paths))
+        executor.submit(process_files_task, task_id, file_paths)
+    except BaseException:
+        # Ohne gestartete Hintergrundaufgabe gibt niemand sonst den Platz wieder frei
+        for file_info in file_paths:
+            if os.path.exists(file_info["path"]):
+                os.remove(file_info["path"])
+        _finish_import()
+        raise
 
     return jsonify({"task_id": task_id}), 202
 
@@ -104,51 +274,166 @@ def get_import_status(task_id: str):
     """
     Gibt den aktuellen Status einer Hintergrundaufgabe zurück.
     """
-    progress = task_progress.get(task_id)
+    progress = task_store.get_task(task_id)
     if not progress:
         return jsonify({"error": "Task nicht gefunden"}), 404
 
     if progress["status"] == "complete":
         result_data = progress["result"]
-        task_progress.pop(task_id, None)
+        if "imported" in result_data:
+            flash(
+                f"{result_data['imported']} Kontakte wurden erfolgreich importiert.",
+                "success",
+            )
+            task_store.delete_task(task_id)
+        else:
+            # Die Datensätze bleiben auf dem Server, bis der Import abgeschlossen wird
+            result_data["records"] = progress["records"]
         return jsonify({"status": "complete", "data": result_data})
 
+    if progress["status"] == "error":
+        task_store.delete_task(task_id)
+
     return jsonify(progress)
 
 
 @bp.route("/import/finalize", methods=["POST"])
 def finalize_import():
     """
-    Speichert die importierten und zugeordneten Kontaktdaten in der Datenbank.
+    Startet das Speichern der auf dem Server bereitgestellten Datensätze eines Uploads
+    anhand der Zuordnung. Der Fortschritt kann über `/import/status/<task_id>`
+    abgefragt werden.
     """
     data = request.get_json()
+    task_id = data.get("task_id")
     vorlage_id = data.get("vorlage_id")
     mappings = data.get("mappings")
-    original_data = data.get("original_data")
 
-    if not all([vorlage_id, mappings, original_data]):
+    if not all([task_id, vorlage_id, mappings]):
         return jsonify({"success": False, "error": "Fehlende Daten."}), 400
 
     vorlage = db.session.get(Vorlage, vorlage_id)
     if not vorlage:
         return jsonify({"success": False, "error": "Vorlage nicht gefunden."}), 404
 
-    count = 0
-    for row in original_data:
-        new_kontakt_data = {
-            vorlage_prop: row.get(import_header)
-            for import_header, vorlage_prop in mappings.items()
-            if vorlage_prop
-        }
-        if new_kontakt_data:
-            kontakt = Kontakt(vorlage_id=vorlage_id)
-            kontakt.set_data(new_kontakt_data)
-            db.session.add(kontakt)
-            count += 1
+    task = task_store.get_task(task_id)
+    if not task or "headers" not in (task["result"] or {}):
+        return (
+            jsonify(
+                {"success": False, "error": "Import nicht gefunden oder abgelaufen."}
+            ),
+            404,
+        )
+
+    if not task_store.claim_task(
+        task_id, "complete", "saving", progress=0, total=task["records"]
+    ):
+        return (
+            jsonify({"success": False, "error": "Der Import läuft bereits."}),
+            409,
+        )
+
+    executor = Executor(current_app)
+    executor.submit(
+        save_import_task,
+        task_id,
+        vorlage_id,
+        mappings,
+        current_app.config["IMPORT_CHUNK_SIZE"],
+        url_for("kontakte.auflisten"),
+    )
+
+    return jsonify({"success": True, "task_id": task_id}), 202
+
+
+def _vorlage_struktur(vorlage_model: Vorlage) -> Dict[str, Any]:
+    """Gruppen und Eigenschaften einer Vorlage in der Form, die die Exporter erwarten."""
+    return {
+        "name": vorlage_model.name,
+        "gruppen": [
+            {
+                "name": g.name,
+                "eigenschaften": [{"name": e.name} for e in g.eigenschaften],
+            }
+            for g in vorlage_model.gruppen
+        ],
+    }
 
-    db.session.commit()
-    flash(f"{count} Kontakte wurden erfolgreich importiert.", "success")
-    return jsonify({"success": True, "redirect_url": url_for("kontakte.auflisten")})
+
+def _parse_kontakt_ids(kontakt_ids_str: Optional[str]) -> Optional[List[int]]:
+    """Liest die optionale, kommagetrennte Liste von Kontakt-IDs. None bei ungültiger Eingabe."""
+    if not kontakt_ids_str:
+        return []
+    try:
+        return [int(kid) for kid in kontakt_ids_str.split(",") if kid.isdigit()]
+    except (ValueError, TypeError):
+        return None
+
+
+def _kontakte_query(vorlage_id: int, kontakt_ids: List[int]):
+    """Die Kontakte einer Vorlage, optional eingeschränkt auf die ausgewählten IDs."""
+    kontakte_query = Kontakt.query.filter_by(vorlage_id=vorlage_id)
+    if kontakt_ids:
+        kontakte_query = kontakte_query.filter(Kontakt.id.in_(kontakt_ids))
+    return kontakte_query
+
+
+def _export_path(task_id: str) -> str:
+    """Pfad der fertigen Exportdatei einer Hintergrundaufgabe."""
+    return os.path.join(current_app.config["EXPORT_FOLDER"], f"{task_id}.pdf")
+
+
+def export_pdf_task(
+    task_id: str,
+    vorlage_id: int,
+    kontakt_ids: List[int],
+    file_format: str,
+    vorlage_struktur: Dict[str, Any],
+):
+    """
+    Diese Funktion läuft im Hintergrund und rendert einen PDF-Export in Teilstücken
+    auf den Worker-Prozessen. Das Ergebnis wird als Datei im Export-Ordner abgelegt.
+    """
+
+    def report_progress(done: int):
+        task_store.update_task(task_id, progress=done)
+
+    output_path = _export_path(task_id)
+    try:
+        with open(output_path, "wb") as output:
+            count = exporter_service.export_pdf_file(
+                file_format,
+                exporter_service.iter_kontakte_data(
+                    _kontakte_query(vorlage_id, kontakt_ids)
+                ),
+                vorlage_struktur,
+                output,
+                worker_pool.get_pool(current_app.config["IMPORT_WORKERS"]),
+                chunk_pages=current_app.config["EXPORT_PDF_CHUNK_PAGES"],
+                progress_callback=report_progress,
+            )
+    except Exception as e:  # pylint: disable=broad-except
+        # Jeder Fehler muss beim Abfragen ankommen, sonst wartet die Oberfläche endlos
+        if isinstance(e, BrokenProcessPool):
+            worker_pool.reset_pool()
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        current_app.logger.error(f"PDF-Export {task_id} fehlgeschlagen: {e}")
+        task_store.update_task(
+            task_id, status="error", error=f"Fehler beim Erstellen des PDFs: {e}"
+        )
+        return
+
+    task_store.update_task(task_id, status="complete", progress=count)
+
+
+def _file_response(file_obj, mimetype: str, filename: str) -> Response:
+    """Liefert eine fertige temporäre Exportdatei blockweise aus und schließt sie danach."""
+    return Response(
+        exporter_service.iter_file_chunks(file_obj),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment;filename={filename}"},
+    )
 
 
 @bp.route("/export/<int:vorlage_id>/<string:file_format>")
@@ -161,32 +446,46 @@ def export_data(vorlage_id: int, file_format: str) -> Union[Response, tuple]:
     if not vorlage_model:
         return "Vorlage nicht gefunden", 404
 
-    kontakt_ids_str = request.args.get("ids")
-    kontakte_query = Kontakt.query.filter_by(vorlage_id=vorlage_id)
+    kontakt_ids = _parse_kontakt_ids(request.args.get("ids"))
+    if kontakt_ids is None:
+        return "Ungültige Kontakt-IDs angegeben", 400
+    kontakte_query = _kontakte_query(vorlage_id, kontakt_ids)
 
-    if kontakt_ids_str:
-        try:
-            kontakt_ids = [
-                int(kid) for kid in kontakt_ids_str.split(",") if kid.isdigit()
+    vorlage_struktur = _vorlage_struktur(vorlage_model)
+    filename = f"{vorlage_model.name}_export_{datetime.now().strftime('%Y-%m-%d')}.{file_format.split('-')[0]}"
+
+    # CSV wird zeilenweise vom Datenbank-Cursor in die Antwort geschrieben
+    stream, mimetype = exporter_service.stream_export(
+        file_format,
+        exporter_service.iter_kontakte_data(kontakte_query),
+        vorlage_struktur,
+    )
+    if stream is not None:
+        return Response(
+            stream_with_context(stream),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f"attachment;filename={filename}"},
+        )
+
+    if file_format == "xlsx":
+        # Excel wird im Write-only-Modus in eine temporäre Datei geschrieben
+        output = exporter_service.export_xlsx_file(
+            [
+                (
+                    vorlage_model.name,
+                    vorlage_struktur,
+                    exporter_service.iter_kontakte_data(kontakte_query),
+                )
             ]
-            if kontakt_ids:
-                kontakte_query = kontakte_query.filter(Kontakt.id.in_(kontakt_ids))
-        except (ValueError, TypeError):
-            return "Ungültige Kontakt-IDs angegeben", 400
+        )
+        return _file_response(output, exporter_service.XLSX_MIMETYPE, filename)
 
     kontakte_models = kontakte_query.all()
 
-    kontakte_data = [{"id": k.id, "daten": k.get_data()} for k in kontakte_models]
-    vorlage_struktur = {
-        "name": vorlage_model.name,
-        "gruppen": [
-            {
-                "name": g.name,
-                "eigenschaften": [{"name": e.name} for e in g.eigenschaften],
-            }
-            for g in vorlage_model.gruppen
-        ],
-    }
+    kontakte_data = [
+        {"id": k.id, "daten": daten}
+        for k, daten in zip(kontakte_models, Kontakt.get_data_many(kontakte_models))
+    ]
 
     content, mimetype = exporter_service.export_data(
         file_format, kontakte_data, vorlage_struktur
@@ -195,10 +494,119 @@ def export_data(vorlage_id: int, file_format: str) -> Union[Response, tuple]:
     if not content:
         return "Ungültiges Export-Format", 400
 
-    filename = f"{vorlage_model.name}_export_{datetime.now().strftime('%Y-%m-%d')}.{file_format.split('-')[0]}"
-
     return Response(
         content,
         mimetype=mimetype,
         headers={"Content-Disposition": f"attachment;filename={filename}"},
     )
+
+
+@bp.route("/export/<int:vorlage_id>/<string:file_format>/job", methods=["POST"])
+def start_pdf_export(vorlage_id: int, file_format: str):
+    """
+    Startet einen PDF-Export als Hintergrundaufgabe. Der Fortschritt kann über
+    `/export/status/<task_id>` abgefragt werden, die fertige Datei wird über
+    `/export/download/<task_id>` abgeholt.
+    """
+    if file_format not in exporter_service.PDF_FORMATS:
+        return jsonify({"error": "Ungültiges Export-Format"}), 400
+
+    vorlage_model = db.session.get(Vorlage, vorlage_id)
+    if not vorlage_model:
+        return jsonify({"error": "Vorlage nicht gefunden"}), 404
+
+    kontakt_ids = _parse_kontakt_ids(request.args.get("ids"))
+    if kontakt_ids is None:
+        return jsonify({"error": "Ungültige Kontakt-IDs angegeben"}), 400
+
+    total = _kontakte_query(vorlage_id, kontakt_ids).count()
+    kind = "serienbrief" if file_format == "serienbrief" else "export"
+    filename = f"{vorlage_model.name}_{kind}_{datetime.now().strftime('%Y-%m-%d')}.pdf"
+
+    # Nicht abgeholte Dateien früherer Exporte aufräumen
+    exporter_service.remove_stale_files(
+        current_app.config["EXPORT_FOLDER"], current_app.config["TASK_TTL_SECONDS"]
+    )
+
+    task_id = uuid.uuid4().hex
+    task_store.create_task(task_id, "processing", total=total)
+    task_store.update_task(task_id, result={"filename": filename})
+
+    executor = Executor(current_app)
+    executor.submit(
+        export_pdf_task,
+        task_id,
+        vorlage_id,
+        kontakt_ids,
+        file_format,
+        _vorlage_struktur(vorlage_model),
+    )
+
+    return jsonify({"task_id": task_id}), 202
+
+
+@bp.route("/export/status/<string:task_id>", methods=["GET"])
+def get_export_status(task_id: str):
+    """Gibt den aktuellen Status eines PDF-Exports zurück."""
+    progress = task_store.get_task(task_id)
+    if not progress:
+        return jsonify({"error": "Task nicht gefunden"}), 404
+
+    if progress["status"] == "complete":
+        return jsonify(
+            {
+                "status": "complete",
+                "data": {
+                    "download_url": url_for(
+                        "import_export.download_export", task_id=task_id
+                    )
+                },
+            }
+        )
+
+    if progress["status"] == "error":
+        task_store.delete_task(task_id)
+
+    return jsonify(progress)
+
+
+@bp.route("/export/download/<string:task_id>", methods=["GET"])
+def download_export(task_id: str) -> Union[Response, tuple]:
+    """Liefert die fertige Datei eines PDF-Exports aus und entfernt sie danach."""
+    task = task_store.get_task(task_id)
+    output_path = _export_path(task_id)
+    if not task or task["status"] != "complete" or not os.path.exists(output_path):
+        return "Export nicht gefunden oder abgelaufen", 404
+
+    def send_and_remove():
+        try:
+            yield from exporter_service.iter_file_chunks(open(output_path, "rb"))
+        finally:
+            os.remove(output_path)
+            task_store.delete_task(task_id)
+
+    return Response(
+        stream_with_context(send_and_remove()),
+        mimetype=exporter_service.PDF_MIMETYPE,
+        headers={
+            "Content-Disposition": f"attachment;filename={task['result']['filename']}"
+        },
+    )
+
+
+@bp.route("/export/alle/xlsx")
+def export_all_xlsx() -> Response:
+    """Exportiert alle Vorlagen in eine Excel-Datei, jede Vorlage in ein eigenes Tabellenblatt."""
+    vorlagen = Vorlage.query.order_by(Vorlage.name).all()
+    output = exporter_service.export_xlsx_file(
+        (
+            vorlage.name,
+            _vorlage_struktur(vorlage),
+            exporter_service.iter_kontakte_data(
+                Kontakt.query.filter_by(vorlage_id=vorlage.id)
+            ),
+        )
+        for vorlage in vorlagen
+    )
+    filename = f"Alle_Vorlagen_export_{datetime.now().strftime('%Y-%m-%d')}.xlsx"
+    return _file_response(output, exporter_service.XLSX_MIMETYPE, filename)
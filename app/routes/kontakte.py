@@ -3,8 +3,8 @@
 import json
 from flask import Blueprint, render_template, request, redirect, url_for, jsonify
 from sqlalchemy.orm import subqueryload
-from sqlalchemy import or_
 from ..models import db, Vorlage, Kontakt, Gruppe
+from ..services import kontakt_service
 from .. import get_attribute_suggestions, get_selection_options
 
 bp = Blueprint("kontakte", __name__, url_prefix="/kontakte")
@@ -12,10 +12,12 @@ bp = Blueprint("kontakte", __name__, url_prefix="/kontakte")
 
 @bp.route("/")
 def auflisten():
-    """Zeigt die Kontaktübersicht an und lädt alle Vorlagen und Kontakte."""
+    """
+    Zeigt die Kontaktübersicht an. Es wird nur die Struktur der Vorlagen mitgeliefert,
+    die Kontakte lädt die Seite seitenweise über `/api/vorlage/<id>/kontakte` nach.
+    """
     vorlagen_query = (
         Vorlage.query.options(
-            subqueryload(Vorlage.kontakte),
             subqueryload(Vorlage.gruppen).subqueryload(Gruppe.eigenschaften),
         )
         .order_by(Vorlage.name)
@@ -27,14 +29,6 @@ def auflisten():
         vorlage_dict = {
             "id": v.id,
             "name": v.name,
-            "kontakte": [
-                {
-                    "id": k.id,
-                    "daten": k.get_data(),
-                    "validation_acknowledged": k.validation_acknowledged,
-                }
-                for k in v.kontakte
-            ],
             "gruppen": [
                 {
                     "id": g.id,
@@ -150,23 +144,12 @@ def editor():
 
 @bp.route("/api/kontakte/search", methods=["GET"])
 def search_kontakte():
-    """Sucht nach Kontakten für Verknüpfungen."""
+    """Sucht nach Kontakten für Verknüpfungen (Volltextsuche über alle Attribute)."""
     query = request.args.get("q", "").strip()
     limit = request.args.get("limit", 10, type=int)
     if not query or len(query) < 2:
         return jsonify([])
-    search_term = f"%{query}%"
-    results = (
-        Kontakt.query.filter(
-            or_(
-                Kontakt.vorname.ilike(search_term),
-                Kontakt.nachname.ilike(search_term),
-                Kontakt.firma.ilike(search_term),
-            )
-        )
-        .limit(limit)
-        .all()
-    )
+    results = kontakt_service.search_kontakte(query, limit=limit)
     formatted_results = []
     for kontakt_item in results:
         display_name = f"{kontakt_item.vorname} {kontakt_item.nachname}".strip()
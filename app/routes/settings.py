@@ -13,6 +13,8 @@ from flask import (
 )
 from werkzeug.utils import secure_filename
 
+from ..services import config_cache
+
 bp = Blueprint("settings", __name__, url_prefix="/settings")
 
 ALLOWED_EXTENSIONS = {"png", "jpg", "jpeg", "svg"}
@@ -81,6 +83,7 @@ def save_selection_options():
     try:
         with open(filepath, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        config_cache.invalidate(filepath)
         return jsonify({"success": True, "message": "Auswahloptionen gespeichert."})
     except IOError as e:
         return (
@@ -110,6 +113,7 @@ def save_config():
 
         with open(filepath, "w", encoding="utf-8") as f:
             json.dump(config_data, f, ensure_ascii=False, indent=2)
+        config_cache.invalidate(filepath)
         return jsonify({"success": True, "message": "Einstellungen gespeichert."})
     except IOError as e:
         return (
@@ -157,6 +161,7 @@ def upload_logo():
         except (FileNotFoundError, json.JSONDecodeError):
             with open(config_filepath, "w", encoding="utf-8") as f:
                 json.dump({"logo_path": save_path}, f, ensure_ascii=False, indent=2)
+        config_cache.invalidate(config_filepath)
 
         logo_url = url_for("static", filename=f"user_data/{filename}")
         return jsonify(
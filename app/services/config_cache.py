@@ -0,0 +1,90 @@
+# app/services/config_cache.py
+"""
+Dieses Modul hält die JSON-Dateien aus `data/` (Konfiguration, Auswahloptionen,
+Attribut-Vorschläge) geparst im Speicher. Bei jedem Zugriff wird nur Änderungszeit
+und Größe der Datei geprüft, gelesen und geparst wird erst nach einer Änderung.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+_files: Dict[str, "CachedJsonFile"] = {}
+_files_lock = threading.Lock()
+
+
+class CachedJsonFile:
+    """Eine JSON-Datei samt Inhalt, ETag und geparsten Daten der zuletzt gelesenen Version."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._raw = b""
+        self._etag = ""
+        self._data: Any = None
+        self._parsed = False
+
+    def _refresh(self):
+        """Liest die Datei neu ein, falls sie sich seit dem letzten Lesen geändert hat."""
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+        with open(self.path, "rb") as file:
+            raw = file.read()
+        self._raw = raw
+        self._etag = hashlib.blake2b(raw, digest_size=8).hexdigest()
+        self._data = None
+        self._parsed = False
+        self._signature = signature
+
+    def read_raw(self) -> Tuple[bytes, str]:
+        """
+        Gibt den Dateiinhalt und einen ETag dazu zurück.
+
+        Raises:
+            FileNotFoundError: Wenn die Datei nicht existiert.
+        """
+        with self._lock:
+            self._refresh()
+            return self._raw, self._etag
+
+    def load(self) -> Any:
+        """
+        Gibt die geparsten Daten zurück. Die Daten werden von allen Aufrufern geteilt
+        und dürfen nicht verändert werden.
+
+        Raises:
+            FileNotFoundError: Wenn die Datei nicht existiert.
+            json.JSONDecodeError: Wenn die Datei kein gültiges JSON enthält.
+        """
+        with self._lock:
+            self._refresh()
+            if not self._parsed:
+                self._data = json.loads(self._raw.decode("utf-8"))
+                self._parsed = True
+            return self._data
+
+    def invalidate(self):
+        """Verwirft den Inhalt, beim nächsten Zugriff wird die Datei neu gelesen."""
+        with self._lock:
+            self._signature = None
+
+
+def get_file(path: str) -> CachedJsonFile:
+    """Gibt den (prozessweit geteilten) Cache-Eintrag für eine Datei zurück."""
+    key = os.path.realpath(path)
+    with _files_lock:
+        if key not in _files:
+            _files[key] = CachedJsonFile(key)
+        return _files[key]
+
+
+def invalidate(path: str):
+    """
+    Verwirft den Cache einer Datei, z.B. nachdem die Einstellungen gespeichert wurden.
+    Änderungen innerhalb derselben Zeitstempel-Auflösung würden sonst übersehen.
+    """
+    get_file(path).invalidate()
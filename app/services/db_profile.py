@@ -0,0 +1,110 @@
+# app/services/db_profile.py
+"""
+Dieses Modul legt fest, wie sich die Anwendung mit der Datenbank verbindet. Ohne
+weitere Angabe wird die SQLite-Datei im instance-Ordner verwendet, jede neue
+Verbindung erhält dabei WAL-Modus und die PRAGMAs aus SQLITE_PRAGMAS. Über die
+Umgebungsvariable DATABASE_URL kann stattdessen z.B. PostgreSQL genutzt werden
+(benötigt zusätzlich den Treiber `psycopg`).
+"""
+import os
+from typing import Any, Dict
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+# Standardwerte, einzelne Werte lassen sich über app.config["SQLITE_PRAGMAS"] ändern
+SQLITE_PRAGMAS: Dict[str, Any] = {
+    # Leser warten nicht mehr auf Schreiber (z.B. einen laufenden Import)
+    "journal_mode": "WAL",
+    # Im WAL-Modus sicher, spart das fsync bei jedem Commit
+    "synchronous": "NORMAL",
+    # Wartezeit in ms, bevor "database is locked" gemeldet wird
+    "busy_timeout": 30_000,
+    # Negative Werte sind KiB, also 64 MiB Seitencache pro Verbindung
+    "cache_size": -64 * 1024,
+    # Bis zu 256 MiB der Datei werden direkt in den Speicher eingeblendet
+    "mmap_size": 256 * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+
+def _env_int(name: str, default: int) -> int:
+    """Liest eine ganze Zahl aus der Umgebung, ungültige Werte ergeben den Standard."""
+    try:
+        return int(os.environ[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def database_uri(instance_path: str) -> str:
+    """Die Datenbank aus DATABASE_URL oder die SQLite-Datei im instance-Ordner."""
+    uri = os.environ.get("DATABASE_URL")
+    if not uri:
+        return f"sqlite:///{os.path.join(instance_path, 'kundenverwaltung.db')}"
+    # Viele Hoster geben noch das veraltete Schema "postgres://" aus
+    if uri.startswith("postgres://"):
+        uri = "postgresql+psycopg://" + uri[len("postgres://") :]
+    elif uri.startswith("postgresql://"):
+        uri = "postgresql+psycopg://" + uri[len("postgresql://") :]
+    return uri
+
+
+def configure(app: Flask, instance_path: str):
+    """Setzt Datenbank-URI, Pool-Einstellungen und PRAGMAs in der App-Konfiguration."""
+    uri = database_uri(instance_path)
+    app.config["SQLALCHEMY_DATABASE_URI"] = uri
+    # Verbindungen pro Prozess: Threads des Servers plus Hintergrundaufgaben
+    app.config["DB_POOL_SIZE"] = _env_int("DB_POOL_SIZE", 10)
+    app.config["DB_MAX_OVERFLOW"] = _env_int("DB_MAX_OVERFLOW", 20)
+    app.config["DB_POOL_TIMEOUT"] = _env_int("DB_POOL_TIMEOUT", 30)
+    app.config["SQLITE_PRAGMAS"] = dict(SQLITE_PRAGMAS)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(uri, app.config)
+
+
+def engine_options(uri: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Die Optionen für create_engine passend zur Datenbank."""
+    url = make_url(uri)
+    pool = {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+    }
+    if url.get_backend_name() == "sqlite":
+        if url.database in (None, "", ":memory:"):
+            # In-Memory-Datenbanken nutzen den StaticPool von Flask-SQLAlchemy
+            return {}
+        busy_timeout = config["SQLITE_PRAGMAS"].get("busy_timeout", 0)
+        return {
+            **pool,
+            "connect_args": {
+                # Verbindungen wandern zwischen den Threads des Servers und des Executors
+                "check_same_thread": False,
+                "timeout": busy_timeout / 1000,
+            },
+        }
+    return {
+        **pool,
+        # Vom Server getrennte Verbindungen vor der Verwendung erkennen und ersetzen
+        "pool_pre_ping": True,
+        "pool_recycle": 30 * 60,
+    }
+
+
+def init_app(app: Flask, db):
+    """Setzt die PRAGMAs für jede neue Verbindung zur SQLite-Datenbank."""
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = app.config["SQLITE_PRAGMAS"]
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
@@ -1,31 +1,246 @@
 # app/services/exporter_service.py
 """This service handles the selection of the correct exporter."""
-from .exporters import csv_exporter, xlsx_exporter, pdf_exporter
+import os
+import time
+from collections import deque
+from itertools import islice
 
+from .. import get_config
+from ..models import Kontakt
+from . import worker_pool
+from .serialization import loads_data_many
+from .exporters import csv_exporter, xlsx_exporter, pdf_exporter, pdf_merge
+from .exporters.address_formatter import AddressFormatter
 
-def export_data(file_format, kontakte_data, vorlage_struktur):
-    """
-    Erkennt das gewünschte Exportformat und ruft die entsprechende Funktion auf.
-    """
-    eigenschaften = [
+# Anzahl der Kontakte, die pro Roundtrip vom Datenbank-Cursor gelesen werden
+EXPORT_BATCH_SIZE = 1000
+
+# Formate, die ohne Zwischenspeicher direkt in die Antwort geschrieben werden können
+STREAMING_FORMATS = {"csv": "text/csv", "csv-serienbrief": "text/csv"}
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Blockgröße beim Ausliefern fertiger Exportdateien
+FILE_CHUNK_BYTES = 64 * 1024
+
+# PDF-Formate, die in Teilstücken parallel gerendert und danach zusammengeführt werden
+PDF_FORMATS = {"pdf", "pdf-labels", "serienbrief"}
+PDF_MIMETYPE = "application/pdf"
+
+
+def _eigenschaften(vorlage_struktur):
+    """Alle Eigenschaften der Vorlage in der Reihenfolge ihrer Gruppen."""
+    return [
         e
         for g in vorlage_struktur.get("gruppen", [])
         for e in g.get("eigenschaften", [])
     ]
 
+
+def iter_kontakte_data(query, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Liest die Kontakte einer Abfrage blockweise über einen Datenbank-Cursor (yield_per)
+    und gibt sie einzeln als {"id", "daten"} zurück. Es werden nur die benötigten
+    Spalten geladen und keine ORM-Objekte in der Session gehalten.
+    """
+    rows = (
+        query.with_entities(Kontakt.id, Kontakt.daten)
+        .order_by(Kontakt.id)
+        .yield_per(batch_size)
+    )
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        for (kontakt_id, _), daten in zip(batch, loads_data_many(d for _, d in batch)):
+            yield {"id": kontakt_id, "daten": daten}
+
+
+def stream_export(file_format, kontakte_data, vorlage_struktur):
+    """
+    Gibt für streamingfähige Formate einen Generator über die Teile der Datei und den
+    Mimetype zurück, sonst (None, None).
+    """
+    if file_format not in STREAMING_FORMATS:
+        return None, None
+
+    if file_format == "csv-serienbrief":
+        # Adressblöcke nach den Vorlagen aus der Konfiguration, die einmal zerlegt werden
+        formatter = AddressFormatter.from_config(get_config())
+        content = csv_exporter.iter_address_csv(kontakte_data, formatter)
+    else:
+        eigenschaften = _eigenschaften(vorlage_struktur)
+        content = csv_exporter.iter_csv(kontakte_data, eigenschaften)
+    return content, STREAMING_FORMATS[file_format]
+
+
+def export_xlsx_file(sheets):
+    """
+    Erstellt eine Excel-Datei mit einem Tabellenblatt pro Eintrag in `sheets`.
+
+    Args:
+        sheets: Folge von (Blattname, Vorlagenstruktur, Kontaktdaten). Die Kontaktdaten
+            werden z.B. von `iter_kontakte_data` blockweise geliefert.
+
+    Returns:
+        Eine auf den Anfang zurückgespulte temporäre Datei, die der Aufrufer schließt.
+    """
+    return xlsx_exporter.generate_xlsx_file(
+        (name, _eigenschaften(vorlage_struktur), kontakte_data)
+        for name, vorlage_struktur, kontakte_data in sheets
+    )
+
+
+def iter_file_chunks(file_obj, chunk_size=FILE_CHUNK_BYTES):
+    """Liest eine Datei blockweise für eine gestreamte Antwort und schließt sie am Ende."""
+    try:
+        while True:
+            chunk = file_obj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file_obj.close()
+
+
+def render_pdf_chunk(file_format, kontakte_data, vorlage_struktur, config=None):
+    """
+    Rendert ein Teilstück eines PDF-Exports. Benötigt keinen App-Kontext und kann
+    daher in einem Worker-Prozess (siehe worker_pool) ausgeführt werden.
+    """
+    if file_format == "pdf-labels":
+        return pdf_exporter.generate_labels_pdf(kontakte_data, config)
+    if file_format == "serienbrief":
+        return pdf_exporter.generate_letters_pdf(kontakte_data, config)
+    return pdf_exporter.generate_pdf(kontakte_data, vorlage_struktur)
+
+
+def pdf_chunk_size(file_format, chunk_pages):
+    """
+    Anzahl der Kontakte pro Teilstück. Bei Etiketten ein Vielfaches der Etiketten pro
+    Seite, damit die Seiten beim Zusammenführen exakt aneinanderpassen. In der
+    Detailansicht und bei Serienbriefen beginnt jeder Kontakt ohnehin auf einer
+    eigenen Seite.
+    """
+    if file_format == "pdf-labels":
+        return max(1, chunk_pages) * pdf_exporter.LABELS_PER_PAGE
+    return max(1, chunk_pages)
+
+
+def _chunked(items, size):
+    """Teilt eine (evtl. lange) Folge in Listen mit höchstens `size` Einträgen."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def export_pdf_file(
+    file_format,
+    kontakte_data,
+    vorlage_struktur,
+    output,
+    pool,
+    chunk_pages,
+    max_pending=None,
+    progress_callback=None,
+):
+    """
+    Rendert einen PDF-Export in seitenbündigen Teilstücken parallel auf dem Pool und
+    führt die Teilstücke in ihrer Reihenfolge zu einer Datei zusammen.
+
+    Es sind nur wenige Teilstücke gleichzeitig in Arbeit und fertige Teilstücke werden
+    sofort in `output` geschrieben, damit auch sehr große Exporte (z.B. Serienbriefe an
+    100.000 Empfänger) nicht komplett im Speicher landen.
+
+    Args:
+        file_format: "pdf", "pdf-labels" oder "serienbrief".
+        kontakte_data: Die Kontakte mit `daten`, z.B. von `iter_kontakte_data`.
+        vorlage_struktur: Die Struktur der Vorlage (für die Detailansicht).
+        output: Dateiobjekt, in das das PDF geschrieben wird.
+        pool: Ein ProcessPoolExecutor (siehe worker_pool).
+        chunk_pages: Seiten pro Teilstück (EXPORT_PDF_CHUNK_PAGES der Konfiguration).
+        max_pending: Höchstzahl gleichzeitig gerenderter Teilstücke, standardmäßig
+            zwei pro CPU-Kern.
+        progress_callback: Wird nach jedem Teilstück mit der Anzahl fertiger Kontakte aufgerufen.
+
+    Returns:
+        Die Anzahl der exportierten Kontakte.
+    """
+    # Die Konfiguration wird einmal gelesen und an alle Teilstücke weitergegeben
+    config = get_config() if file_format in ("pdf-labels", "serienbrief") else None
+    max_pending = max(1, max_pending or 2 * worker_pool.default_worker_count())
+    pending = deque()
+    done = 0
+
+    def finish_oldest():
+        nonlocal done
+        count, future = pending.popleft()
+        part = future.result()
+        done += count
+        if progress_callback:
+            progress_callback(done)
+        return part
+
+    def parts():
+        for chunk in _chunked(kontakte_data, pdf_chunk_size(file_format, chunk_pages)):
+            pending.append(
+                (
+                    len(chunk),
+                    pool.submit(
+                        render_pdf_chunk, file_format, chunk, vorlage_struktur, config
+                    ),
+                )
+            )
+            if len(pending) >= max_pending:
+                yield finish_oldest()
+        while pending:
+            yield finish_oldest()
+        if not done:
+            # Ohne Kontakte wie bisher ein leeres Dokument mit einer Seite
+            yield render_pdf_chunk(file_format, [], vorlage_struktur, config)
+
+    try:
+        pdf_merge.merge_pdfs(parts(), output)
+    finally:
+        for _, future in pending:
+            future.cancel()
+    return done
+
+
+def remove_stale_files(folder, max_age_seconds):
+    """Löscht fertige Exportdateien, die nicht innerhalb von `max_age_seconds` abgeholt wurden."""
+    cutoff = time.time() - max_age_seconds
+    for entry in os.scandir(folder):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+def export_data(file_format, kontakte_data, vorlage_struktur):
+    """
+    Erkennt das gewünschte Exportformat und ruft die entsprechende Funktion auf.
+    """
+    eigenschaften = _eigenschaften(vorlage_struktur)
+
     if file_format == "csv":
         content = csv_exporter.generate_csv(kontakte_data, eigenschaften)
         mimetype = "text/csv"
     elif file_format == "xlsx":
         content = xlsx_exporter.generate_xlsx(kontakte_data, eigenschaften)
-        mimetype = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        mimetype = XLSX_MIMETYPE
     elif file_format == "pdf":
         content = pdf_exporter.generate_pdf(kontakte_data, vorlage_struktur)
-        mimetype = "application/pdf"
+        mimetype = PDF_MIMETYPE
     # NEUE OPTION für Adressaufkleber
     elif file_format == "pdf-labels":
         content = pdf_exporter.generate_labels_pdf(kontakte_data)
-        mimetype = "application/pdf"
+        mimetype = PDF_MIMETYPE
     else:
         return None, None
 
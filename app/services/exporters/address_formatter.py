@@ -0,0 +1,161 @@
+# app/services/exporters/address_formatter.py
+"""This module formats address blocks from the templates in config.json."""
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+DEFAULT_COMPANY_FORMAT = (
+    "{firmenname}\nz. Hd. {name_komplett}\n{strasse} {hausnummer}\n{plz} {ort}"
+)
+DEFAULT_PRIVATE_FORMAT = "{name_komplett}\n{strasse} {hausnummer}\n{plz} {ort}"
+
+
+def clean_value(daten: Dict[str, Any], key: str) -> str:
+    """Gibt einen Wert als bereinigten Text zurück, leere Werte und "None" als ""."""
+    val = daten.get(key)
+    return str(val).strip() if val and str(val).strip().lower() != "none" else ""
+
+
+def get_formatted_name(daten: Dict[str, Any]) -> str:
+    """
+    Formatiert den vollständigen Namen inklusive korrekt sortierter akademischer Titel.
+    """
+    titel_str = clean_value(daten, "Titel (akademisch)") or clean_value(daten, "Titel")
+    name_parts = [
+        clean_value(daten, "Anrede"),
+        titel_str,
+        clean_value(daten, "Vorname"),
+        clean_value(daten, "Nachname"),
+    ]
+    return " ".join(filter(None, name_parts)).strip()
+
+
+# Platzhalter der Adressvorlagen und wie ihr Wert aus den Kontaktdaten gebildet wird
+PLACEHOLDERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "{firmenname}": lambda d: clean_value(d, "Firmenname"),
+    "{anrede}": lambda d: clean_value(d, "Anrede"),
+    "{titel}": lambda d: clean_value(d, "Titel (akademisch)") or clean_value(d, "Titel"),
+    "{vorname}": lambda d: clean_value(d, "Vorname"),
+    "{nachname}": lambda d: clean_value(d, "Nachname"),
+    "{name_komplett}": get_formatted_name,
+    "{strasse}": lambda d: clean_value(d, "Straße"),
+    "{hausnummer}": lambda d: clean_value(d, "Hausnummer"),
+    "{plz}": lambda d: clean_value(d, "Postleitzahl"),
+    "{ort}": lambda d: clean_value(d, "Ort"),
+    "{land}": lambda d: clean_value(d, "Land"),
+}
+_PLACEHOLDER_PATTERN = re.compile(
+    "(" + "|".join(re.escape(key) for key in PLACEHOLDERS) + ")"
+)
+
+
+def _collapse(line: str) -> str:
+    """Fasst Leerraum zusammen, wie er durch leere Platzhalter entsteht."""
+    return " ".join(line.split())
+
+
+class CompiledTemplate:
+    """
+    Eine einmalig zerlegte Adressvorlage. Jede Zeile ist entweder fester Text (bereits
+    bereinigt) oder eine Folge aus Text und Platzhaltern. Pro Kontakt werden nur die
+    Platzhalter eingesetzt, Zeilen ohne Inhalt entfallen.
+    """
+
+    def __init__(self, template: str):
+        self.template = template
+        self.lines: List[Union[str, Tuple[str, ...]]] = []
+        used: Dict[str, None] = {}
+        for line in template.splitlines():
+            parts = tuple(p for p in _PLACEHOLDER_PATTERN.split(line) if p)
+            placeholders = [p for p in parts if p in PLACEHOLDERS]
+            if placeholders:
+                self.lines.append(parts)
+                used.update(dict.fromkeys(placeholders))
+            elif _collapse(line):
+                self.lines.append(_collapse(line))
+        self.placeholders = tuple(used)
+
+    def format_lines(self, values: Dict[str, str]) -> List[str]:
+        """Setzt die Werte der Platzhalter ein und gibt die nicht leeren Zeilen zurück."""
+        result = []
+        for line in self.lines:
+            if isinstance(line, str):
+                result.append(line)
+                continue
+            text = "".join(values.get(part, part) for part in line)
+            # Werte mit Zeilenumbruch (auch \r, \u2028 usw.) ergeben wie bisher mehrere Zeilen
+            for sub_line in text.splitlines():
+                collapsed = _collapse(sub_line)
+                if collapsed:
+                    result.append(collapsed)
+        return result
+
+
+class AddressFormatter:
+    """
+    Bildet Adressblöcke anhand der Vorlagen für Firmen- und Privatkontakte. Die
+    Vorlagen werden beim Erzeugen einmal zerlegt, danach kann der Formatter auf
+    beliebig viele Kontakte angewendet werden.
+    """
+
+    def __init__(
+        self,
+        company_format: str = DEFAULT_COMPANY_FORMAT,
+        private_format: str = DEFAULT_PRIVATE_FORMAT,
+    ):
+        self.company = CompiledTemplate(company_format)
+        self.private = CompiledTemplate(private_format)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "AddressFormatter":
+        """Erstellt den Formatter aus der Konfiguration, leere Vorlagen durch die Standards ersetzt."""
+        return cls(
+            config.get("address_format_company") or DEFAULT_COMPANY_FORMAT,
+            config.get("address_format_private") or DEFAULT_PRIVATE_FORMAT,
+        )
+
+    def format_lines(self, daten: Dict[str, Any]) -> List[str]:
+        """Die Zeilen des Adressblocks eines Kontakts."""
+        template = self.company if clean_value(daten, "Firmenname") else self.private
+        values = {key: PLACEHOLDERS[key](daten) for key in template.placeholders}
+        return template.format_lines(values)
+
+    def format(self, daten: Dict[str, Any]) -> str:
+        """Der Adressblock eines Kontakts als Text mit Zeilenumbrüchen."""
+        return "\n".join(self.format_lines(daten))
+
+    def format_batch(self, kontakte: Iterable[Dict[str, Any]]) -> Iterator[List[str]]:
+        """Die Zeilen der Adressblöcke mehrerer Kontakte (mit `daten`), auch als Generator."""
+        for kontakt in kontakte:
+            yield self.format_lines(kontakt.get("daten", {}))
+
+
+class TextTemplate:
+    """
+    Eine einmalig zerlegte Freitext-Vorlage (z.B. Betreff und Text eines Serienbriefs)
+    mit denselben Platzhaltern wie die Adressvorlagen. Leerzeilen und Absätze bleiben
+    erhalten, nur in Zeilen mit Platzhaltern wird doppelter Leerraum zusammengefasst.
+    """
+
+    def __init__(self, template: str):
+        self.template = template
+        self.lines: List[Union[str, Tuple[str, ...]]] = []
+        used: Dict[str, None] = {}
+        for line in template.splitlines():
+            parts = tuple(p for p in _PLACEHOLDER_PATTERN.split(line) if p)
+            placeholders = [p for p in parts if p in PLACEHOLDERS]
+            if placeholders:
+                self.lines.append(parts)
+                used.update(dict.fromkeys(placeholders))
+            else:
+                self.lines.append(line.rstrip())
+        self.placeholders = tuple(used)
+
+    def format(self, daten: Dict[str, Any]) -> str:
+        """Setzt die Kontaktdaten in die Vorlage ein."""
+        values = {key: PLACEHOLDERS[key](daten) for key in self.placeholders}
+        return "\n".join(
+            line
+            if isinstance(line, str)
+            else _collapse("".join(values.get(part, part) for part in line))
+            for line in self.lines
+        )
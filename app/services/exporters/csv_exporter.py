@@ -2,17 +2,77 @@
 import csv
 import io
 
-def generate_csv(kontakte, eigenschaften):
-    """Erstellt eine CSV-Datei im Speicher."""
+# Anzahl der Zeilen, die zu einem Block der gestreamten Antwort zusammengefasst werden
+STREAM_BLOCK_ROWS = 500
+
+
+# Anzahl der Adresszeilen, die der Serienbrief-Export als einzelne Spalten ausgibt
+ADDRESS_LINE_COLUMNS = 6
+
+
+def _iter_rows(headers, rows, block_rows):
+    """
+    Schreibt Kopfzeile und Zeilen als CSV. Die Kopfzeile wird sofort geliefert, danach
+    jeweils `block_rows` Zeilen, sodass nie die ganze Datei im Speicher liegt.
+    """
     output = io.StringIO()
     writer = csv.writer(output)
-    
-    headers = [e['name'] for e in eigenschaften]
+
     writer.writerow(headers)
-    
-    for kontakt in kontakte:
-        row = [str(kontakt['daten'].get(h, '')) for h in headers]
-        writer.writerow(row)
-        
+    yield output.getvalue()
     output.seek(0)
-    return output.getvalue()
\ No newline at end of file
+    output.truncate()
+
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % block_rows == 0:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+
+    rest = output.getvalue()
+    if rest:
+        yield rest
+
+
+def iter_csv(kontakte, eigenschaften, block_rows=STREAM_BLOCK_ROWS):
+    """Erzeugt die CSV-Datei mit allen Eigenschaften der Vorlage stückweise."""
+    headers = [e['name'] for e in eigenschaften]
+    rows = (
+        [str(kontakt['daten'].get(h, '')) for h in headers] for kontakt in kontakte
+    )
+    return _iter_rows(headers, rows, block_rows)
+
+
+def iter_address_csv(kontakte, formatter, block_rows=STREAM_BLOCK_ROWS):
+    """
+    Erzeugt eine CSV-Datei für Serienbriefe stückweise: der komplette Adressblock
+    und jede Adresszeile in einer eigenen Spalte, gebildet mit den Adressvorlagen.
+
+    Args:
+        kontakte: Kontakte mit `daten`, auch als Generator.
+        formatter: Ein AddressFormatter mit den Vorlagen aus der Konfiguration.
+    """
+    headers = ['Adresse'] + [
+        f'Adresszeile {i}' for i in range(1, ADDRESS_LINE_COLUMNS + 1)
+    ]
+    rows = (
+        ['\n'.join(lines)] + _pad_lines(lines)
+        for lines in formatter.format_batch(kontakte)
+    )
+    return _iter_rows(headers, rows, block_rows)
+
+
+def _pad_lines(lines):
+    """Verteilt die Adresszeilen auf die festen Spalten, überzählige landen in der letzten."""
+    if len(lines) > ADDRESS_LINE_COLUMNS:
+        keep = ADDRESS_LINE_COLUMNS - 1
+        lines = lines[:keep] + [', '.join(lines[keep:])]
+    return lines + [''] * (ADDRESS_LINE_COLUMNS - len(lines))
+
+
+def generate_csv(kontakte, eigenschaften):
+    """Erstellt eine CSV-Datei im Speicher."""
+    return "".join(iter_csv(kontakte, eigenschaften))
@@ -1,10 +1,14 @@
 # app/services/exporters/pdf_exporter.py
 """This module handles the generation of PDF files for contacts."""
 import os
+import re
+from datetime import date
+
 from fpdf import FPDF
 from ... import (
     get_config,
 )
+from .address_formatter import AddressFormatter, TextTemplate, get_formatted_name
 
 # Konstanten exakt nach deinen Vorgaben
 LABEL_WIDTH = 105
@@ -15,78 +19,286 @@ MARGIN_TOP = 4.5
 MARGIN_LEFT = 0
 H_SPACING = 0
 V_SPACING = 0
+# Etiketten pro Seite. Teilstücke für das parallele Rendern müssen ein Vielfaches
+# davon sein, damit jedes Teilstück auf einer neuen Seite beginnt.
+LABELS_PER_PAGE = LABELS_PER_ROW * LABELS_PER_COL
+
+# Serienbrief nach DIN 5008 Form B (Maße in mm)
+LETTER_MARGIN_LEFT = 25
+LETTER_MARGIN_RIGHT = 20
+LETTER_MARGIN_TOP = 20
+LETTER_MARGIN_BOTTOM = 25
+LETTER_SENDER_Y = 59.7
+LETTER_ADDRESS_Y = 62.7
+LETTER_DATE_Y = 100
+LETTER_SUBJECT_Y = 108
+LETTER_BODY_Y = 120
+LETTER_LOGO_WIDTH = 40
+DEFAULT_LETTER_SUBJECT = "Aktuelle Informationen"
+DEFAULT_LETTER_TEXT = (
+    "Sehr geehrte Damen und Herren,\n\n"
+    "hier steht der Text Ihres Serienbriefs.\n\n"
+    "Mit freundlichen Grüßen"
+)
+
+
+# Ressourcen, auf die ein Inhaltsstrom verweist: Grafikzustände ("/GS0 gs"), Muster
+# ("/P1 scn"), Schriften ("/F1 10 Tf") und Bilder bzw. andere XObjects ("/I1 Do")
+_RESOURCE_PATTERNS = {
+    "ExtGState": re.compile(rb"/(GS\d+) gs"),
+    "Pattern": re.compile(rb"/(P\d+)\s+(?:scn|SCN)"),
+    "Font": re.compile(rb"/F(\d+)\s+[-+]?\d+(?:\.\d+)?\s+Tf"),
+    "XObject": re.compile(rb"/I(\d+) Do"),
+}
 
 
-def _get_formatted_name(daten):
+def _latin1(text):
+    """Die Standardschriften von FPDF kennen nur Latin-1, andere Zeichen werden ersetzt."""
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+class _FormResources:
     """
-    Formatiert den vollständigen Namen inklusive korrekt sortierter akademischer Titel.
+    Liefert beim Schreiben der PDF das Ressourcen-Verzeichnis des Logo-Formulars. Die
+    Objektnummern der Ressourcen stehen erst in diesem Moment fest.
     """
 
-    def get_clean(key):
-        val = daten.get(key)
-        return str(val).strip() if val and str(val).strip().lower() != "none" else ""
-
-    titel_str = get_clean("Titel (akademisch)") or get_clean("Titel")
-    anrede = get_clean("Anrede")
-    vorname = get_clean("Vorname")
-    nachname = get_clean("Nachname")
-
-    name_parts = [anrede, titel_str, vorname, nachname]
-    return " ".join(filter(None, name_parts)).strip()
-
-
-def _build_address_block(template, daten):
-    """Ersetzt Platzhalter in einer Vorlage mit Kontaktdaten."""
-
-    def get_clean(key):
-        val = daten.get(key)
-        return str(val).strip() if val and str(val).strip().lower() != "none" else ""
-
-    placeholders = {
-        "{firmenname}": get_clean("Firmenname"),
-        "{anrede}": get_clean("Anrede"),
-        "{titel}": get_clean("Titel (akademisch)") or get_clean("Titel"),
-        "{vorname}": get_clean("Vorname"),
-        "{nachname}": get_clean("Nachname"),
-        "{name_komplett}": _get_formatted_name(daten),
-        "{strasse}": get_clean("Straße"),
-        "{hausnummer}": get_clean("Hausnummer"),
-        "{plz}": get_clean("Postleitzahl"),
-        "{ort}": get_clean("Ort"),
-        "{land}": get_clean("Land"),
-    }
-
-    address_block = template
-    for key, value in placeholders.items():
-        address_block = address_block.replace(key, value)
-
-    cleaned_lines = []
-    for line in address_block.splitlines():
-        cleaned_line = " ".join(line.split())
-        if cleaned_line:
-            cleaned_lines.append(cleaned_line)
-    return "\n".join(cleaned_lines)
-
-
-def generate_labels_pdf(kontakte):
+    def __init__(self, stream):
+        self.names = {
+            kind: sorted({name.decode("latin-1") for name in pattern.findall(stream)})
+            for kind, pattern in _RESOURCE_PATTERNS.items()
+        }
+
+    def get_resource_dictionary(
+        self, gfxstate_objs, pattern_objs, _shading_objs, font_objs, img_objs
+    ):
+        """Wird von FPDF für Form-XObjects aufgerufen."""
+        lookups = {
+            "ExtGState": lambda name: (name, gfxstate_objs.get(name)),
+            "Pattern": lambda name: (name, pattern_objs.get(name)),
+            "Font": lambda index: (f"F{index}", font_objs.get(int(index))),
+            "XObject": lambda index: (f"I{index}", img_objs.get(int(index))),
+        }
+        parts = []
+        for kind, names in self.names.items():
+            refs = "".join(
+                f"/{key} {obj.id} 0 R"
+                for key, obj in map(lookups[kind], names)
+                if obj is not None
+            )
+            if refs:
+                parts.append(f"/{kind} <<{refs}>>")
+        return f"<<{''.join(parts)}>>"
+
+
+class _LogoStamp:
     """
-    Erstellt eine PDF-Datei mit Adressaufklebern basierend auf benutzerdefinierten Formaten.
+    Platziert das Logo auf Etiketten und Briefen. Rastergrafiken zeichnet `pdf.image`,
+    das die Bilddaten ohnehin nur einmal einbettet. SVG-Logos werden einmal gezeichnet
+    und die dabei erzeugten PDF-Anweisungen als Form-XObject abgelegt, auf das jede
+    weitere Platzierung nur noch verschoben verweist, statt die SVG-Pfade jedes Mal neu
+    umzurechnen und in die Seite zu kopieren.
     """
-    config = get_config()
-    sender_address = config.get("sender_address", "Standard Absender")
-    logo_path = config.get("logo_path")
-    logo_exists = logo_path and os.path.exists(logo_path)
 
-    sender_font_size = config.get("export_sender_font_size", 7)
-    logo_width = config.get("export_logo_size", 8)
-    recipient_font_size = config.get("export_recipient_font_size", 10)
+    def __init__(self, logo_path, width):
+        self.logo_path = logo_path
+        self.width = width
+        self._origin = None
+        self._index = None
+        self._x_object_type = None
+        self._draw_inline = not (logo_path and logo_path.lower().endswith(".svg"))
+
+    def place(self, pdf, x, y):
+        """Setzt das Logo mit der linken oberen Ecke an (x, y)."""
+        if not self.logo_path:
+            return
+        if self._index is None and not self._draw_inline:
+            self._create_form(pdf, x, y)
+        if self._draw_inline:
+            self._draw_image(pdf, x, y)
+            return
+        if self._index is None:
+            return
+
+        # pylint: disable=protected-access
+        origin_x, origin_y = self._origin
+        dx = (x - origin_x) * pdf.k
+        dy = (origin_y - y) * pdf.k
+        pdf._out(f"q 1 0 0 1 {dx:.2f} {dy:.2f} cm /I{self._index} Do Q")
+        pdf._resource_catalog.add(self._x_object_type, self._index, pdf.page)
+
+    def _draw_image(self, pdf, x, y):
+        """Zeichnet das Logo direkt, bei einem Fehler wird es für alle weiteren ausgelassen."""
+        try:
+            pdf.image(self.logo_path, x=x, y=y, w=self.width)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(f"WARNUNG: Logo konnte nicht verarbeitet werden. Fehler: {e}")
+            self.logo_path = None
+            return False
+        return True
+
+    def _create_form(self, pdf, x, y):
+        # Form-XObjects sind in fpdf2 keine öffentliche Schnittstelle. Genutzt wird der
+        # Weg, über den fpdf2 selbst Blend-Gruppen als Formular ablegt (geprüft mit
+        # fpdf2 2.8.9). Fehlt er in einer anderen Version, wird das Logo wie
+        # Rastergrafiken bei jeder Platzierung neu gezeichnet.
+        # pylint: disable=protected-access,import-outside-toplevel
+        try:
+            from fpdf.enums import PDFResourceType
+            from fpdf.output import PDFContentStream
+            from fpdf.syntax import Name, PDFArray
+
+            catalog = pdf._resource_catalog
+            index = catalog.next_xobject_index
+            form_xobjects = catalog.form_xobjects
+            contents = pdf.pages[pdf.page].contents
+        except (ImportError, AttributeError):
+            self._draw_inline = True
+            return
+        if not isinstance(contents, bytearray):
+            self._draw_inline = True
+            return
+
+        start = len(contents)
+        if not self._draw_image(pdf, x, y):
+            return
+        stream = bytes(contents[start:]).strip()
+        # Das erste Logo wird ebenfalls über das Formular gezeichnet
+        del contents[start:]
+
+        form = PDFContentStream(contents=stream, compress=pdf.compress)
+        form.type = Name("XObject")
+        form.subtype = Name("Form")
+        form.b_box = PDFArray([0, 0, pdf.w_pt, pdf.h_pt])
+        form._blend_group = _FormResources(stream)
+        form._registered = False
+
+        catalog.next_xobject_index = index + 1
+        form_xobjects.append((index, form))
+        self._index = index
+        self._x_object_type = PDFResourceType.X_OBJECT
+        self._origin = (x, y)
+
+
+class _LabelLayout:
+    """
+    Einstellungen und vorberechnete Positionen für einen Etikettenbogen. Die Konfiguration
+    wird einmal pro Export gelesen und der Absenderblock einmal umbrochen und ausgemessen.
+    """
+
+    SENDER_LINE_HEIGHT = 3
+    RECIPIENT_LINE_HEIGHT = 5
+    # Der Absenderbereich ist 10mm hoch (von y+2 bis y+12)
+    SENDER_AREA_HEIGHT = 10
 
-    sender_align = config.get("export_sender_alignment", "L")
-    recipient_align = config.get("export_recipient_alignment", "L")
+    def __init__(self, pdf, config):
+        self.sender_font_size = config.get("export_sender_font_size", 7)
+        self.recipient_font_size = config.get("export_recipient_font_size", 10)
+        self.sender_align = config.get("export_sender_alignment", "L")
+        self.recipient_align = config.get("export_recipient_alignment", "L")
 
+        self.addresses = AddressFormatter.from_config(config)
+
+        logo_path = config.get("logo_path")
+        logo_exists = bool(logo_path and os.path.exists(logo_path))
+        logo_width = config.get("export_logo_size", 8)
+        self.logo = _LogoStamp(logo_path if logo_exists else None, logo_width)
+
+        # Bestimme die Textbreite basierend auf der Logo-Existenz
+        self.sender_width = LABEL_WIDTH - 6 - (logo_width if logo_exists else 0)
+        self.recipient_width = LABEL_WIDTH - 6
+        self.logo_offset_x = LABEL_WIDTH - logo_width - 3
+
+        # Absender einmal umbrechen, die Zeilen werden pro Etikett nur noch platziert
+        pdf.set_font("Arial", size=self.sender_font_size)
+        sender = _latin1(config.get("sender_address", "Standard Absender"))
+        sender_lines = pdf.multi_cell(
+            w=self.sender_width,
+            h=self.SENDER_LINE_HEIGHT,
+            text=sender,
+            dry_run=True,
+            output="LINES",
+            align=self.sender_align,
+        )
+        # Bisherige Platzierung beibehalten: die erste Zeile beginnt in der Mitte des
+        # Absenderbereichs (multi_cell lieferte hier früher keine Höhe zurück)
+        text_y_offset = self.SENDER_AREA_HEIGHT / 2
+        self.sender_lines = [
+            (
+                self._line_offset(pdf, line, self.sender_width, self.sender_align),
+                2 + text_y_offset + i * self.SENDER_LINE_HEIGHT,
+                line,
+            )
+            for i, line in enumerate(sender_lines)
+        ]
+
+    @staticmethod
+    def _line_offset(pdf, line, width, align):
+        """Horizontaler Versatz einer Zeile innerhalb einer Zelle, wie bei `cell`."""
+        text_width = pdf.get_string_width(line)
+        if align == "R":
+            return width - pdf.c_margin - text_width
+        if align == "C":
+            return (width - text_width) / 2
+        return pdf.c_margin
+
+    @staticmethod
+    def _baseline(pdf, line_height):
+        """Abstand der Grundlinie vom oberen Zellrand, wie bei `cell`."""
+        return 0.5 * line_height + 0.3 * pdf.font_size
+
+    def draw_sender(self, pdf, x, y):
+        """Zeichnet Absender, Logo und Trennlinie eines Etiketts."""
+        pdf.set_font("Arial", size=self.sender_font_size)
+        baseline = self._baseline(pdf, self.SENDER_LINE_HEIGHT)
+        for dx, dy, line in self.sender_lines:
+            pdf.text(x + 3 + dx, y + dy + baseline, line)
+
+        # Platziere das Logo (falls vorhanden) am oberen Rand des Absenderbereichs
+        self.logo.place(pdf, x + self.logo_offset_x, y + 2)
+
+        line_y = y + 12
+        pdf.line(x1=x + 3, y1=line_y, x2=x + LABEL_WIDTH - 3, y2=line_y)
+
+    def draw_recipient(self, pdf, x, y, daten):
+        """Zeichnet den Adressblock eines Etiketts."""
+        pdf.set_font("Arial", size=self.recipient_font_size)
+
+        lines = [_latin1(line) for line in self.addresses.format_lines(daten)]
+        top = y + 14
+        usable_width = self.recipient_width - 2 * pdf.c_margin
+
+        if any(pdf.get_string_width(line) > usable_width for line in lines):
+            # Zu lange Zeilen werden wie bisher von multi_cell umbrochen
+            pdf.set_xy(x + 3, top)
+            pdf.multi_cell(
+                w=self.recipient_width,
+                h=self.RECIPIENT_LINE_HEIGHT,
+                text="\n".join(lines),
+                align=self.recipient_align,
+            )
+            return
+
+        baseline = self._baseline(pdf, self.RECIPIENT_LINE_HEIGHT)
+        for i, line in enumerate(lines):
+            dx = self._line_offset(pdf, line, self.recipient_width, self.recipient_align)
+            pdf.text(x + 3 + dx, top + i * self.RECIPIENT_LINE_HEIGHT + baseline, line)
+
+
+def generate_labels_pdf(kontakte, config=None):
+    """
+    Erstellt eine PDF-Datei mit Adressaufklebern basierend auf benutzerdefinierten Formaten.
+
+    Args:
+        kontakte: Kontakte mit `daten`, auch als Generator.
+        config: Die Konfiguration, falls bereits geladen. Sonst wird sie einmal gelesen.
+    """
     pdf = FPDF(orientation="P", unit="mm", format="A4")
     pdf.set_auto_page_break(auto=False, margin=0)
     pdf.add_page()
+    pdf.set_draw_color(180, 180, 180)
+
+    layout = _LabelLayout(pdf, config if config is not None else get_config())
 
     label_count = 0
     for kontakt in kontakte:
@@ -103,71 +315,107 @@ def generate_labels_pdf(kontakte):
         x = MARGIN_LEFT + col * (LABEL_WIDTH + H_SPACING)
         y = MARGIN_TOP + row * (LABEL_HEIGHT + V_SPACING)
 
-        pdf.set_font("Arial", size=sender_font_size)
-        sender_x, sender_y_base = x + 3, y + 2
-        safe_sender = sender_address.encode("latin-1", "replace").decode("latin-1")
+        layout.draw_sender(pdf, x, y)
+        layout.draw_recipient(pdf, x, y, daten)
 
-        # KORREKTUR: Logik zur vertikalen Zentrierung des Textes, unabhängig vom Logo
-        sender_area_height = 10  # Der Bereich ist 10mm hoch (von y+2 bis y+12)
+        label_count += 1
 
-        # Bestimme die Textbreite basierend auf der Logo-Existenz
-        if logo_exists:
-            text_width = LABEL_WIDTH - logo_width - 6
-        else:
-            text_width = LABEL_WIDTH - 6
-
-        # Berechne die Höhe des Text-Blocks durch eine Simulation
-        text_height = pdf.multi_cell(
-            w=text_width, h=3, text=safe_sender, dry_run=True, align=sender_align
-        )
+    return bytes(pdf.output())
 
-        # Berechne den Y-Offset, um den Text im 10mm-Bereich zu zentrieren
-        text_y_offset = (sender_area_height / 2) - (text_height / 2)
-        if text_y_offset < 0:
-            text_y_offset = 0  # Verhindert, dass der Text nach oben rutscht
 
-        # Platziere den Text an der zentrierten Position
-        pdf.set_xy(sender_x, sender_y_base + text_y_offset)
-        pdf.multi_cell(w=text_width, h=3, text=safe_sender, align=sender_align)
+class _LetterLayout:
+    """
+    Vorberechnete Angaben eines Serienbriefs: Vorlagen, Absender, Datum und Logo werden
+    einmal pro Export vorbereitet. Umbrochene Absätze werden zwischengespeichert, damit
+    gleiche Absätze (z.B. ohne Platzhalter) nur einmal umbrochen werden.
+    """
 
-        # Platziere das Logo (falls vorhanden) am oberen Rand des Absenderbereichs
-        if logo_exists:
-            try:
-                logo_x = x + LABEL_WIDTH - logo_width - 3
-                pdf.image(logo_path, x=logo_x, y=sender_y_base, w=logo_width)
-            except Exception as e:
-                print(f"WARNUNG: Logo konnte nicht verarbeitet werden. Fehler: {e}")
-
-        # --- Weiterer Code bleibt unverändert ---
-        line_y = y + 12
-        pdf.set_draw_color(180, 180, 180)
-        pdf.line(x1=sender_x, y1=line_y, x2=x + LABEL_WIDTH - 3, y2=line_y)
+    FONT_SIZE = 11
+    SENDER_FONT_SIZE = 7
+    LINE_HEIGHT = 5
+    # Obergrenze für zwischengespeicherte Absätze, danach wird neu begonnen
+    MAX_CACHED_PARAGRAPHS = 10000
+
+    def __init__(self, pdf, config):
+        self.addresses = AddressFormatter.from_config(config)
+        self.subject = TextTemplate(config.get("serienbrief_betreff") or DEFAULT_LETTER_SUBJECT)
+        self.body = TextTemplate(config.get("serienbrief_text") or DEFAULT_LETTER_TEXT)
+        self.sender = _latin1(config.get("sender_address", ""))
+        self.date = date.today().strftime("%d.%m.%Y")
+        self.text_width = pdf.w - LETTER_MARGIN_LEFT - LETTER_MARGIN_RIGHT
+
+        logo_path = config.get("logo_path")
+        logo_exists = bool(logo_path and os.path.exists(logo_path))
+        self.logo = _LogoStamp(logo_path if logo_exists else None, LETTER_LOGO_WIDTH)
+        self._wrapped = {}
+
+    def _wrap(self, pdf, paragraph):
+        """Umbricht einen Absatz auf die Textbreite, wie `multi_cell` es tun würde."""
+        lines = self._wrapped.get(paragraph)
+        if lines is None:
+            if len(self._wrapped) >= self.MAX_CACHED_PARAGRAPHS:
+                self._wrapped.clear()
+            lines = pdf.multi_cell(
+                w=self.text_width,
+                h=self.LINE_HEIGHT,
+                text=paragraph,
+                dry_run=True,
+                output="LINES",
+            ) if paragraph else [""]
+            self._wrapped[paragraph] = lines
+        return lines
+
+    def draw(self, pdf, daten):
+        """Zeichnet einen Brief ab einer neuen Seite."""
+        pdf.add_page()
+        self.logo.place(pdf, pdf.w - LETTER_MARGIN_RIGHT - LETTER_LOGO_WIDTH, LETTER_MARGIN_TOP)
+        left = LETTER_MARGIN_LEFT + pdf.c_margin
 
-        pdf.set_font("Arial", size=recipient_font_size)
+        pdf.set_font("Arial", size=self.SENDER_FONT_SIZE)
+        pdf.text(left, LETTER_SENDER_Y, self.sender)
 
-        template_key = (
-            "address_format_company"
-            if daten.get("Firmenname")
-            and str(daten.get("Firmenname")).strip().lower() != "none"
-            else "address_format_private"
-        )
-        template = config.get(template_key) or (
-            "{firmenname}\nz. Hd. {name_komplett}\n{strasse} {hausnummer}\n{plz} {ort}"
-            if template_key == "address_format_company"
-            else "{name_komplett}\n{strasse} {hausnummer}\n{plz} {ort}"
-        )
+        pdf.set_font("Arial", size=self.FONT_SIZE)
+        baseline = 0.5 * self.LINE_HEIGHT + 0.3 * pdf.font_size
+        for i, line in enumerate(self.addresses.format_lines(daten)):
+            pdf.text(left, LETTER_ADDRESS_Y + i * self.LINE_HEIGHT + baseline, _latin1(line))
 
-        address_block = _build_address_block(template, daten)
-        pdf.set_xy(x + 3, line_y + 2)
-        safe_address_block = address_block.encode("latin-1", "replace").decode(
-            "latin-1"
-        )
-        pdf.multi_cell(
-            w=LABEL_WIDTH - 6, h=5, text=safe_address_block, align=recipient_align
-        )
+        right = pdf.w - LETTER_MARGIN_RIGHT - pdf.c_margin
+        pdf.text(right - pdf.get_string_width(self.date), LETTER_DATE_Y + baseline, self.date)
 
-        label_count += 1
+        pdf.set_font("Arial", "B", self.FONT_SIZE)
+        pdf.text(left, LETTER_SUBJECT_Y + baseline, _latin1(self.subject.format(daten)))
 
+        pdf.set_font("Arial", size=self.FONT_SIZE)
+        y = LETTER_BODY_Y
+        page_bottom = pdf.h - LETTER_MARGIN_BOTTOM
+        for paragraph in _latin1(self.body.format(daten)).split("\n"):
+            for line in self._wrap(pdf, paragraph):
+                if y + self.LINE_HEIGHT > page_bottom:
+                    pdf.add_page()
+                    y = LETTER_MARGIN_TOP
+                if line:
+                    pdf.text(left, y + baseline, line)
+                y += self.LINE_HEIGHT
+
+
+def generate_letters_pdf(kontakte, config=None):
+    """
+    Erstellt Serienbriefe: für jeden Kontakt ein Brief mit Adressfeld, Datum, Betreff
+    und Brieftext aus der Konfiguration, jeweils ab einer neuen Seite.
+
+    Args:
+        kontakte: Kontakte mit `daten`, auch als Generator.
+        config: Die Konfiguration, falls bereits geladen. Sonst wird sie einmal gelesen.
+    """
+    pdf = FPDF(orientation="P", unit="mm", format="A4")
+    pdf.set_auto_page_break(auto=False, margin=0)
+    layout = _LetterLayout(pdf, config if config is not None else get_config())
+
+    for kontakt in kontakte:
+        layout.draw(pdf, kontakt.get("daten", {}))
+
+    if pdf.page == 0:
+        pdf.add_page()
     return bytes(pdf.output())
 
 
@@ -181,7 +429,7 @@ def generate_pdf(kontakte, vorlage_struktur):
     for kontakt in kontakte:
         pdf.add_page()
         daten = kontakt["daten"]
-        full_name = _get_formatted_name(daten) or daten.get("Firmenname", "")
+        full_name = get_formatted_name(daten) or daten.get("Firmenname", "")
         pdf.set_font("Arial", "B", 16)
         safe_full_name = full_name.encode("latin-1", "replace").decode("latin-1")
         pdf.cell(0, 10, safe_full_name, ln=True, align="L")
@@ -226,3 +474,4 @@ def generate_pdf(kontakte, vorlage_struktur):
                 pdf.ln(5)
 
     return bytes(pdf.output())
+
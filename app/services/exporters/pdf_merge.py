@@ -0,0 +1,131 @@
+# app/services/exporters/pdf_merge.py
+"""This module merges separately rendered PDF documents into one file."""
+import io
+from collections import deque
+from typing import Dict, Iterable, List
+
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject
+
+# Feste Objektnummern für Katalog und Seitenbaum, sie werden erst am Ende geschrieben
+_CATALOG_ID = 1
+_PAGES_ID = 2
+
+
+class _StreamingPdfWriter:
+    """
+    Schreibt die Seiten mehrerer PDF-Dokumente nacheinander in eine Datei. Jedes
+    Objekt wird sofort mit neuer Objektnummer geschrieben, im Speicher bleiben nur
+    die Dateipositionen und die Nummern der Seiten. So lassen sich auch Exporte mit
+    hunderttausend Seiten zusammenführen.
+    """
+
+    def __init__(self, output):
+        self.output = output
+        self.position = 0
+        self.offsets: Dict[int, int] = {}
+        self.page_ids: List[int] = []
+        self.next_id = _PAGES_ID + 1
+        self._write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+
+    def _write(self, data: bytes):
+        self.output.write(data)
+        self.position += len(data)
+
+    def _allocate(self) -> int:
+        self.next_id += 1
+        return self.next_id - 1
+
+    def _write_object(self, idnum: int, obj):
+        buffer = io.BytesIO()
+        buffer.write(f"{idnum} 0 obj\n".encode("ascii"))
+        obj.write_to_stream(buffer)
+        buffer.write(b"\nendobj\n")
+        self.offsets[idnum] = self.position
+        self._write(buffer.getvalue())
+
+    def add_document(self, data: bytes):
+        """Hängt alle Seiten eines Dokuments samt der von ihnen verwendeten Objekte an."""
+        reader = PdfReader(io.BytesIO(data))
+        new_ids: Dict[int, int] = {}
+        pending = deque()
+
+        def ref(indirect: IndirectObject) -> IndirectObject:
+            if indirect.idnum not in new_ids:
+                new_ids[indirect.idnum] = self._allocate()
+                pending.append(indirect)
+            return IndirectObject(new_ids[indirect.idnum], 0, None)
+
+        def remap(obj):
+            # Das Dokument wird nur einmal geschrieben, die Objekte dürfen daher
+            # direkt umgeschrieben werden
+            if isinstance(obj, IndirectObject):
+                return ref(obj)
+            if isinstance(obj, DictionaryObject):
+                for key, value in list(dict.items(obj)):
+                    obj[key] = remap(value)
+            elif isinstance(obj, ArrayObject):
+                for i, value in enumerate(obj):
+                    obj[i] = remap(value)
+            return obj
+
+        pages = list(reader.pages)
+        for page in pages:
+            # Verweise auf Seiten (z.B. aus Links) zeigen auf die neue Seite
+            page_id = self._allocate()
+            if page.indirect_reference is not None:
+                new_ids[page.indirect_reference.idnum] = page_id
+            self.page_ids.append(page_id)
+
+        for page, page_id in zip(pages, self.page_ids[-len(pages):]):
+            page.pop(NameObject("/Parent"), None)
+            remap(page)
+            page[NameObject("/Parent")] = IndirectObject(_PAGES_ID, 0, None)
+            self._write_object(page_id, page)
+            while pending:
+                indirect = pending.popleft()
+                self._write_object(new_ids[indirect.idnum], remap(indirect.get_object()))
+
+    def close(self) -> int:
+        """Schreibt Seitenbaum, Katalog und Querverweistabelle. Gibt die Seitenzahl zurück."""
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self.offsets[_PAGES_ID] = self.position
+        self._write(
+            f"{_PAGES_ID} 0 obj\n<< /Type /Pages /Kids [{kids}] "
+            f"/Count {len(self.page_ids)} >>\nendobj\n".encode("ascii")
+        )
+        self.offsets[_CATALOG_ID] = self.position
+        self._write(
+            f"{_CATALOG_ID} 0 obj\n<< /Type /Catalog /Pages {_PAGES_ID} 0 R >>\n"
+            "endobj\n".encode("ascii")
+        )
+
+        xref_position = self.position
+        lines = [f"xref\n0 {self.next_id}\n", "0000000000 65535 f \n"]
+        lines.extend(
+            f"{self.offsets[idnum]:010d} 00000 n \n" for idnum in range(1, self.next_id)
+        )
+        lines.append(
+            f"trailer\n<< /Size {self.next_id} /Root {_CATALOG_ID} 0 R >>\n"
+            f"startxref\n{xref_position}\n%%EOF\n"
+        )
+        self._write("".join(lines).encode("ascii"))
+        return len(self.page_ids)
+
+
+def merge_pdfs(parts: Iterable[bytes], output) -> int:
+    """
+    Hängt einzeln gerenderte PDF-Dokumente in ihrer Reihenfolge zu einem Dokument
+    zusammen. Die Teilstücke werden nacheinander gelesen und sofort geschrieben.
+
+    Args:
+        parts: Die Teilstücke als Bytes, auch als Generator.
+        output: Dateiobjekt, in das das zusammengeführte PDF geschrieben wird.
+
+    Returns:
+        Die Anzahl der Seiten.
+    """
+    writer = _StreamingPdfWriter(output)
+    for part in parts:
+        writer.add_document(part)
+    return writer.close()
@@ -1,20 +1,74 @@
 # src/exporters/xlsx_exporter.py
+import re
+import tempfile
+
 import openpyxl
-import io
 
-def generate_xlsx(kontakte, eigenschaften):
-    """Erstellt eine Excel-Datei (.xlsx) im Speicher."""
-    workbook = openpyxl.Workbook()
-    sheet = workbook.active
-    
-    headers = [e['name'] for e in eigenschaften]
-    sheet.append(headers)
-    
-    for kontakt in kontakte:
-        row = [kontakt['daten'].get(h, '') for h in headers]
-        sheet.append(row)
-        
-    output = io.BytesIO()
+# Bis zu dieser Größe bleibt die fertige Datei im Speicher, danach wird sie auf die Platte ausgelagert
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+# Excel erlaubt höchstens 31 Zeichen und keine der Zeichen []:*?/\ im Blattnamen
+SHEET_TITLE_MAX_LENGTH = 31
+_INVALID_SHEET_CHARS = re.compile(r"[\[\]:*?/\\]")
+
+
+def _sheet_title(name, used_titles):
+    """Erzeugt einen gültigen, innerhalb der Arbeitsmappe eindeutigen Blattnamen."""
+    base = _INVALID_SHEET_CHARS.sub("_", str(name or "")).strip() or "Kontakte"
+    base = base[:SHEET_TITLE_MAX_LENGTH]
+    title = base
+    counter = 2
+    while title.lower() in used_titles:
+        suffix = f" ({counter})"
+        title = base[: SHEET_TITLE_MAX_LENGTH - len(suffix)] + suffix
+        counter += 1
+    used_titles.add(title.lower())
+    return title
+
+
+def write_xlsx(sheets, output):
+    """
+    Schreibt eine Excel-Datei im Write-only-Modus von openpyxl: Zeilen werden direkt
+    serialisiert statt als Zellobjekte im Speicher gehalten.
+
+    Args:
+        sheets: Folge von (Blattname, Eigenschaften, Kontakte). Die Kontakte können
+            ein Generator sein und werden genau einmal durchlaufen.
+        output: Ein beschreibbares, seekbares Dateiobjekt.
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    used_titles = set()
+
+    for name, eigenschaften, kontakte in sheets:
+        sheet = workbook.create_sheet(_sheet_title(name, used_titles))
+        headers = [e['name'] for e in eigenschaften]
+        sheet.append(headers)
+        for kontakt in kontakte:
+            daten = kontakt['daten']
+            sheet.append([daten.get(h, '') for h in headers])
+
+    if not used_titles:
+        # Eine Arbeitsmappe braucht mindestens ein Tabellenblatt
+        workbook.create_sheet("Kontakte")
     workbook.save(output)
+
+
+def generate_xlsx_file(sheets):
+    """
+    Erstellt eine Excel-Datei in einer SpooledTemporaryFile und gibt sie auf den
+    Anfang zurückgespult zurück. Der Aufrufer muss die Datei schließen.
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    try:
+        write_xlsx(sheets, output)
+    except Exception:
+        output.close()
+        raise
     output.seek(0)
-    return output.getvalue()
\ No newline at end of file
+    return output
+
+
+def generate_xlsx(kontakte, eigenschaften):
+    """Erstellt eine Excel-Datei (.xlsx) im Speicher."""
+    with generate_xlsx_file([("Kontakte", eigenschaften, kontakte)]) as output:
+        return output.read()
@@ -1,24 +1,39 @@
 # app/services/gender_detector.py
 """This module provides a service to guess the gender based on a first name."""
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
 import gender_guesser.detector as gender
 
+_detector: Optional[gender.Detector] = None
 
-def get_anrede_from_vorname(vorname: str) -> str:
+
+def get_detector() -> gender.Detector:
     """
-    Ermittelt die Anrede ('Herr'/'Frau') anhand eines Vornamens.
-    Gibt einen leeren String zurück, wenn der Name nicht eindeutig ist.
+    Gibt den prozessweit geteilten Detektor zurück.
+    Das Namensverzeichnis wird nur beim ersten Aufruf eingelesen.
     """
+    global _detector  # pylint: disable=global-statement
+    if _detector is None:
+        # Initialisiere den Detektor (unabhängig von Groß-/Kleinschreibung)
+        _detector = gender.Detector(case_sensitive=False)
+    return _detector
+
+
+def _normalize_vorname(vorname) -> str:
+    """Gibt den ersten Vornamen in Kleinbuchstaben zurück (Schlüssel für den Cache)."""
     if not vorname or not isinstance(vorname, str):
         return ""
+    parts = vorname.split()
+    return parts[0].lower() if parts else ""
 
-    # Initialisiere den Detektor (unabhängig von Groß-/Kleinschreibung)
-    detector = gender.Detector(case_sensitive=False)
 
+@lru_cache(maxsize=8192)
+def _anrede_for_normalized(vorname: str) -> str:
+    """Ermittelt die Anrede für einen bereits normalisierten Vornamen."""
     # get_gender gibt 'male', 'female', 'mostly_male', 'mostly_female',
     # 'andy' oder 'unknown' zurück.
-    geschlecht = detector.get_gender(
-        vorname.split()[0]
-    )  # Nur den ersten Vornamen prüfen
+    geschlecht = get_detector().get_gender(vorname)
 
     if geschlecht in ("male", "mostly_male"):
         return "Herr"
@@ -27,3 +42,29 @@ def get_anrede_from_vorname(vorname: str) -> str:
 
     # Für 'andy' (androgyn/unisex) oder 'unknown' wird nichts vorgeschlagen
     return ""
+
+
+def get_anrede_from_vorname(vorname: str) -> str:
+    """
+    Ermittelt die Anrede ('Herr'/'Frau') anhand eines Vornamens.
+    Gibt einen leeren String zurück, wenn der Name nicht eindeutig ist.
+    """
+    normalized = _normalize_vorname(vorname)  # Nur den ersten Vornamen prüfen
+    if not normalized:
+        return ""
+    return _anrede_for_normalized(normalized)
+
+
+def get_anreden_from_vornamen(vornamen: Iterable[str]) -> List[str]:
+    """
+    Ermittelt die Anreden für eine ganze Spalte von Vornamen.
+    Jeder unterschiedliche Vorname wird dabei nur einmal nachgeschlagen.
+
+    Returns:
+        Eine Liste mit einer Anrede (oder "") pro Vorname, in derselben Reihenfolge.
+    """
+    normalized = [_normalize_vorname(vorname) for vorname in vornamen]
+    anreden = {
+        name: _anrede_for_normalized(name) for name in set(normalized) if name
+    }
+    return [anreden.get(name, "") for name in normalized]
@@ -1,42 +1,128 @@
 # app/services/importer_service.py
 """This service handles the file import logic."""
 import os
-from typing import Dict, Any, List, Union, Tuple
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional
 
-from flask import current_app
+from ..models import db, Kontakt
 from .importers import csv_importer, msg_importer, vcf_importer, xlsx_importer
 
+DEFAULT_CHUNK_SIZE = 5000
 
-def import_file_from_path(
+
+def iter_file_records(
     file_path: str,
-) -> Union[Tuple[List[Dict[str, Any]], str], Dict[str, str]]:
+    chunk_size: int = csv_importer.DEFAULT_CHUNK_SIZE,
+    xlsx_all_sheets: bool = False,
+) -> Iterator[List[Dict[str, Any]]]:
     """
-    Erkennt den Dateityp eines existierenden Pfades und ruft den entsprechenden Parser auf.
-    Gibt die geparsten Daten und den rohen Inhalt zurück.
+    Erkennt den Dateityp eines existierenden Pfades und gibt die geparsten Datensätze
+    blockweise zurück. Große CSV/TXT- und XLSX-Dateien werden dabei gestreamt.
 
     Args:
         file_path: Der vollständige Pfad zur zu importierenden Datei.
+        chunk_size: Anzahl der Datensätze pro Block (für streamende Parser).
+        xlsx_all_sheets: Bei .xlsx-Dateien alle Tabellenblätter importieren.
+
+    Raises:
+        ValueError: Bei nicht unterstützten Dateitypen oder Parser-Fehlern.
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+
+    if file_ext == ".csv":
+        yield from csv_importer.iter_csv_txt(file_path, ",", chunk_size)
+    elif file_ext == ".txt":
+        yield from csv_importer.iter_csv_txt(file_path, "\t", chunk_size)
+    elif file_ext == ".xlsx":
+        yield from xlsx_importer.iter_xlsx(
+            file_path, chunk_size, all_sheets=xlsx_all_sheets
+        )
+    elif file_ext == ".vcf":
+        yield from vcf_importer.iter_vcf(file_path, chunk_size)
+    elif file_ext in [".msg", ".oft"]:
+        result = msg_importer.parse_msg_file(file_path)
+        if isinstance(result, dict) and "error" in result:
+            raise ValueError(result["error"])
+        yield result
+    else:
+        raise ValueError(f"Dateityp {file_ext} wird nicht unterstützt.")
+
+
+def parse_file(file_path: str, xlsx_all_sheets: bool = False) -> List[Dict[str, Any]]:
+    """
+    Liest eine Datei vollständig ein. Benötigt keinen App-Kontext und kann daher
+    in einem Worker-Prozess (siehe worker_pool) ausgeführt werden.
+
+    Raises:
+        IOError, ValueError, csv.Error: Wenn die Datei nicht gelesen werden kann.
+    """
+    return [
+        record
+        for chunk in iter_file_records(file_path, xlsx_all_sheets=xlsx_all_sheets)
+        for record in chunk
+    ]
+
+
+def map_record(record: Dict[str, Any], mappings: Dict[str, str]) -> Dict[str, Any]:
+    """Überträgt einen importierten Datensatz anhand der Zuordnung Spalte -> Attribut."""
+    return {
+        vorlage_prop: record.get(import_header)
+        for import_header, vorlage_prop in mappings.items()
+        if vorlage_prop
+    }
+
+
+def bulk_insert_kontakte(
+    vorlage_id: int,
+    records: Iterable[Dict[str, Any]],
+    mappings: Dict[str, str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress_callback: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Schreibt importierte Datensätze als Kontakte in die Datenbank.
+
+    Statt einzelner ORM-Objekte werden die Zeilen blockweise per executemany
+    eingefügt und jeder Block in einer eigenen Transaktion gespeichert.
+
+    Args:
+        vorlage_id: Die ID der Ziel-Vorlage.
+        records: Die importierten Datensätze (auch als Generator möglich).
+        mappings: Zuordnung Spalte aus der Datei -> Attribut der Vorlage.
+        chunk_size: Anzahl der Zeilen pro Transaktion.
+        progress_callback: Wird nach jedem Block mit der Anzahl verarbeiteter Datensätze aufgerufen.
 
     Returns:
-        Ein Tupel (Liste von Kontakten, Rohdaten-String) oder ein Fehler-Dictionary.
+        Die Anzahl der angelegten Kontakte.
     """
-    filename = os.path.basename(file_path)
-    file_ext = os.path.splitext(filename)[1].lower()
+    insert_stmt = Kontakt.__table__.insert()
+    chunk: List[Dict[str, Any]] = []
+    processed = 0
+    count = 0
+
+    def flush():
+        nonlocal count
+        if chunk:
+            db.session.execute(insert_stmt, chunk)
+            db.session.commit()
+            count += len(chunk)
+            chunk.clear()
+        if progress_callback:
+            progress_callback(processed)
 
     try:
-        if file_ext == ".csv":
-            return csv_importer.parse_csv_txt(file_path, delimiter=",")
-        if file_ext == ".txt":
-            return csv_importer.parse_csv_txt(file_path, delimiter="\t")
-        if file_ext == ".xlsx":
-            return xlsx_importer.parse_xlsx(file_path)
-        if file_ext == ".vcf":
-            return vcf_importer.parse_vcf(file_path)
-        if file_ext in [".msg", ".oft"]:
-            return msg_importer.parse_msg_file(file_path)
-
-        return {"error": f"Dateityp {file_ext} wird nicht unterstützt."}
-    except (IOError, ValueError) as e:
-        # Fange spezifische Parser-Fehler ab
-        current_app.logger.error(f"Parser-Fehler bei Datei {filename}: {e}")
-        return {"error": "Fehler beim Parsen der Datei."}
+        for record in records:
+            processed += 1
+            kontakt_data = map_record(record, mappings)
+            if kontakt_data:
+                row = Kontakt.prepare_data(kontakt_data)
+                row["vorlage_id"] = vorlage_id
+                row["validation_acknowledged"] = False
+                chunk.append(row)
+            if processed % chunk_size == 0:
+                flush()
+        flush()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return count
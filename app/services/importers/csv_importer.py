@@ -1,51 +1,109 @@
 # app/services/importers/csv_importer.py
+import codecs
 import csv
-from ..gender_detector import get_anrede_from_vorname
-from ..titel_detector import extract_titles
+import io
+from itertools import islice
+from typing import Any, Dict, Iterator, List
 
+from .enrichment import enrich_records
 
-def parse_csv_txt(file_path, delimiter=","):
+# Größe des Dateianfangs, anhand dessen Kodierung und Trennzeichen erkannt werden
+SNIFF_BYTES = 64 * 1024
+DEFAULT_CHUNK_SIZE = 1000
+CANDIDATE_DELIMITERS = ",;\t|"
+
+
+def _detect_encoding(sample: bytes) -> str:
+    """Erkennt die Kodierung anhand des Dateianfangs (UTF-8 oder Windows-1252)."""
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as err:
+        # Ein am Blockende abgeschnittenes Mehrbyte-Zeichen ist kein Fehler
+        if err.start < len(sample) - 3:
+            return "cp1252"
+    return "utf-8"
+
+
+def _detect_delimiter(sample: str, default: str) -> str:
     """
-    Liest CSV- oder TXT-Dateien, gibt eine Liste von Dictionaries und den rohen Inhalt zurück.
+    Bestimmt das Trennzeichen. Es bleibt beim Trennzeichen der Dateiendung `default`;
+    nur wenn die Kopfzeile damit eine einzige Spalte ergibt, wird es anhand der ersten
+    Zeilen erkannt (z.B. Semikolon in einer .csv aus dem deutschen Excel).
     """
-    records = []
-    raw_content = ""
+    header = next(csv.reader(io.StringIO(sample), delimiter=default), [])
+    if len(header) > 1:
+        return default
     try:
-        with open(file_path, mode="r", encoding="utf-8", errors="ignore") as f:
-            raw_content = f.read()
-            f.seek(0)  # Zurück zum Anfang der Datei für das Parsen
-            reader = csv.DictReader(f, delimiter=delimiter)
-            for row in reader:
+        return csv.Sniffer().sniff(sample, delimiters=CANDIDATE_DELIMITERS).delimiter
+    except csv.Error:
+        return default
+
+
+def _iter_chunks(
+    file_path: str,
+    encoding: str,
+    delimiter: str,
+    chunk_size: int,
+    skip: int,
+) -> Iterator[List[Dict[str, Any]]]:
+    """Liest die Datensätze ab dem `skip`-ten blockweise in der angegebenen Kodierung."""
+    # UTF-8 wird streng gelesen, damit ein Fehler den Wechsel auf Windows-1252 auslöst
+    errors = "strict" if encoding.startswith("utf-8") else "replace"
+    with open(file_path, mode="r", encoding=encoding, errors=errors, newline="") as f:
+        reader = csv.DictReader(f, delimiter=delimiter)
+        chunk: List[Dict[str, Any]] = []
+        for row in islice(reader, skip, None):
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def iter_csv_txt(
+    file_path: str,
+    delimiter: str = ",",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Liest CSV- oder TXT-Dateien zeilenweise und gibt die Datensätze blockweise zurück.
+
+    Die Kodierung wird aus dem Dateianfang erkannt. Ergibt `delimiter` dort nur eine
+    Spalte, wird auch das Trennzeichen erkannt. Die Datei wird dabei in der Regel nur
+    einmal gelesen. Stellt sich eine als UTF-8 erkannte Datei erst hinter dem
+    Dateianfang als Windows-1252 heraus, wird sie ab dem ersten noch nicht
+    zurückgegebenen Datensatz erneut als Windows-1252 gelesen.
+
+    Args:
+        file_path: Der Pfad zur Datei.
+        delimiter: Trennzeichen der Dateiendung.
+        chunk_size: Anzahl der Datensätze pro Block.
+    """
+    with open(file_path, "rb") as binary_file:
+        sample = binary_file.read(SNIFF_BYTES)
+
+    encoding = _detect_encoding(sample)
+    sample_text = sample.decode(encoding, errors="ignore")
+    if len(sample) == SNIFF_BYTES and "\n" in sample_text:
+        # Nur vollständige Zeilen für die Erkennung verwenden
+        sample_text = sample_text[: sample_text.rfind("\n")]
+    delimiter = _detect_delimiter(sample_text, delimiter)
+
+    emitted = 0
+    while True:
+        try:
+            for chunk in _iter_chunks(
+                file_path, encoding, delimiter, chunk_size, emitted
+            ):
+                emitted += len(chunk)
                 # Automatische Erkennung von Anrede und Titel
-                if not row.get("Anrede"):
-                    if row.get("Vorname"):
-                        anrede = get_anrede_from_vorname(row["Vorname"])
-                        if anrede:
-                            row["Anrede"] = anrede
-                if not row.get("Titel (akademisch)"):
-                    if row.get("Position"):
-                        titel = extract_titles(row["Position"])
-                        if titel:
-                            row["Titel (akademisch)"] = ", ".join(titel)
-                records.append(row)
-    except Exception:
-        # Fallback für andere Kodierungen
-        with open(file_path, mode="r", encoding="latin-1", errors="ignore") as f:
-            raw_content = f.read()
-            f.seek(0)
-            reader = csv.DictReader(f, delimiter=delimiter)
-            for row in reader:
-                # Dieselbe Logik hier für den Fallback
-                if not row.get("Anrede"):
-                    if row.get("Vorname"):
-                        anrede = get_anrede_from_vorname(row["Vorname"])
-                        if anrede:
-                            row["Anrede"] = anrede
-                if not row.get("Titel (akademisch)"):
-                    if row.get("Position"):
-                        titel = extract_titles(row["Position"])
-                        if titel:
-                            row["Titel (akademisch)"] = ", ".join(titel)
-                records.append(row)
-
-    return records, raw_content
+                yield enrich_records(chunk)
+            return
+        except UnicodeDecodeError:
+            if encoding == "cp1252":
+                raise
+            encoding = "cp1252"
+
@@ -0,0 +1,28 @@
+# app/services/importers/enrichment.py
+"""Ergänzt importierte Datensätze um automatisch erkannte Anrede und Titel."""
+from typing import Any, Dict, List
+
+from ..gender_detector import get_anreden_from_vornamen
+from ..titel_detector import extract_titles_many
+
+
+def enrich_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Ergänzt fehlende Anreden (aus dem Vornamen) und akademische Titel (aus der Position)
+    für einen ganzen Block von Datensätzen. Die Datensätze werden direkt verändert.
+    """
+    ohne_anrede = [r for r in records if not r.get("Anrede") and r.get("Vorname")]
+    anreden = get_anreden_from_vornamen(str(r["Vorname"]) for r in ohne_anrede)
+    for record, anrede in zip(ohne_anrede, anreden):
+        if anrede:
+            record["Anrede"] = anrede
+
+    ohne_titel = [
+        r for r in records if not r.get("Titel (akademisch)") and r.get("Position")
+    ]
+    titel_listen = extract_titles_many(str(r["Position"]) for r in ohne_titel)
+    for record, titel in zip(ohne_titel, titel_listen):
+        if titel:
+            record["Titel (akademisch)"] = ", ".join(titel)
+
+    return records
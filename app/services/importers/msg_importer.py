@@ -1,14 +1,13 @@
 # app/services/importers/msg_importer.py
 """This module handles the import of .msg files."""
-import os
 import re
-import subprocess
-import tempfile
-import shutil
-import sys
 from typing import Dict, Any, List, Union
-from ..gender_detector import get_anrede_from_vorname
-from ..titel_detector import extract_titles
+
+import extract_msg
+from extract_msg.exceptions import ExMsgBaseException
+from extract_msg.msg_classes import Contact
+
+from .enrichment import enrich_records
 
 
 def _search_field(pattern: str, text: str) -> str:
@@ -83,15 +82,8 @@ def _parse_message_text(text: str) -> Dict[str, Any]:
         ]
 
         if len(address_parts) > 0:
-            street_line = address_parts[0]
-            # KORREKTUR: Versuche, Straße und Hausnummer zu trennen
-            street_match = re.match(r"^(.+?)\s+([\d\w\s/.-]+)$", street_line)
-            if street_match:
-                data["Straße"] = street_match.group(1).strip().rstrip(",")
-                data["Hausnummer"] = street_match.group(2).strip()
-            else:
-                # Fallback, falls keine Hausnummer gefunden wird
-                data["Straße"] = street_line
+            # Versuche, Straße und Hausnummer zu trennen
+            data.update(_split_street(address_parts[0]))
 
         if len(address_parts) > 1:
             # Suche nach Muster: PLZ Ort
@@ -137,72 +129,100 @@ def _parse_message_text(text: str) -> Dict[str, Any]:
         if key not in data:
             data[key] = value
 
-    # 3. Anrede automatisch erkennen, falls nicht vorhanden
-    if "Anrede" not in data and "Vorname" in data:
-        anrede = get_anrede_from_vorname(data["Vorname"])
-        if anrede:
-            data["Anrede"] = anrede
-
-    # 4. Titel aus Position extrahieren, falls nicht schon vorhanden
-    if "Titel (akademisch)" not in data and "Position" in data:
-        titel = extract_titles(data["Position"])
-        if titel:
-            data["Titel (akademisch)"] = ", ".join(titel)
+    # 3. Anrede und Titel automatisch erkennen, falls nicht vorhanden
+    enrich_records([data])
 
     return {k: v for k, v in data.items() if v}
 
 
+def _split_street(street_line: str) -> Dict[str, str]:
+    """Trennt eine Straßenzeile in Straße und Hausnummer."""
+    street_match = re.match(r"^(.+?)\s+([\d\w\s/.-]+)$", street_line)
+    if street_match:
+        return {
+            "Straße": street_match.group(1).strip().rstrip(","),
+            "Hausnummer": street_match.group(2).strip(),
+        }
+    # Fallback, falls keine Hausnummer gefunden wird
+    return {"Straße": street_line}
+
+
+def _parse_contact(contact) -> Dict[str, Any]:
+    """
+    Liest die Eigenschaften eines Outlook-Kontakts (IPM.Contact) direkt aus der
+    OLE-Struktur und bildet sie auf die Attribute der Vorlagen ab.
+    """
+    business_fax = contact.businessFax or {}
+    data = {
+        "Vorname": contact.givenName,
+        "Nachname": contact.surname,
+        "Firma": contact.companyName,
+        "Position": contact.jobTitle,
+        "Telefon (geschäftlich)": contact.businessTelephoneNumber,
+        "Telefon (privat)": contact.homeTelephoneNumber,
+        "Mobilnummer": contact.mobileTelephoneNumber,
+        "Faxnummer": business_fax.get("number"),
+        "E-Mail": contact.email1EmailAddress,
+        "Web Page": contact.businessHomePage or contact.webpageUrl,
+        "Postleitzahl": contact.workAddressPostalCode,
+        "Ort": contact.workAddressLocality,
+        "Land": contact.workAddressCountry,
+    }
+
+    # Mehrzeilige Straßenangaben: die letzte Zeile ist die Straße, davor steht ein Zusatz
+    street_lines = [
+        line.strip()
+        for line in (contact.workAddressStreet or "").splitlines()
+        if line.strip()
+    ]
+    if street_lines:
+        data.update(_split_street(street_lines[-1]))
+        if len(street_lines) > 1:
+            data["Adresszusatz"] = ", ".join(street_lines[:-1])
+
+    data = {k: v.strip() for k, v in data.items() if isinstance(v, str) and v.strip()}
+
+    # Manche Kontakte enthalten die PLZ im Ortsfeld (z.B. "10115 Berlin")
+    if "Postleitzahl" not in data and "Ort" in data:
+        plz_ort_match = re.match(r"(\d{4,5})\s+(.+)", data["Ort"])
+        if plz_ort_match:
+            data["Postleitzahl"] = plz_ort_match.group(1)
+            data["Ort"] = plz_ort_match.group(2).strip()
+
+    return enrich_records([data])[0]
+
+
 def parse_msg_file(file_path: str) -> Union[List[Dict[str, Any]], Dict[str, str]]:
     """
-    Extrahiert den Inhalt einer .msg-Datei, parst ihn und gibt die strukturierten Daten zurück.
+    Liest eine .msg/.oft-Datei direkt im Prozess ein und gibt die strukturierten Daten zurück.
 
-    Verwendet temporäre Ordner für eine saubere Extraktion und umgeht Umgebungsprobleme
-    durch die explizite Nutzung des aktuellen Python-Interpreters (sys.executable).
+    Kontakte werden aus ihren Eigenschaften gelesen, andere Nachrichtentypen über
+    den von extract_msg erzeugten Text (wie beim Speichern als message.txt) geparst.
+    Es werden keine temporären Dateien oder Unterprozesse benötigt.
     """
-    # Erstelle einen temporären Ordner (sauberer als ein Cache im Projektordner)
-    temp_dir = tempfile.mkdtemp(prefix="msg_extract_")
+    try:
+        msg = extract_msg.openMsg(file_path)
+    except (ExMsgBaseException, OSError) as err:
+        return {"error": f"Die MSG-Datei konnte nicht gelesen werden: {err}"}
 
     try:
-        # Führe das extract_msg-Tool aus
-        subprocess.run(
-            [sys.executable, "-m", "extract_msg", "--out", temp_dir, file_path],
-            capture_output=True,
-            text=True,
-            check=False,
-            encoding="latin-1",
-        )
+        if isinstance(msg, Contact):
+            data = _parse_contact(msg)
+        else:
+            text = msg.getSaveBody().decode("utf-8", errors="ignore")
+            data = _parse_message_text(text)
+    except (ExMsgBaseException, UnicodeError) as err:
+        return {"error": f"Die MSG-Datei konnte nicht verarbeitet werden: {err}"}
+    finally:
+        msg.close()
 
-        found_txt_path = None
-        # Dateien, die interne Daten enthalten und ignoriert werden sollen
-        ignored_files = ["attachments.txt", "rtf-body.txt", "body.html", "message.html"]
-
-        # ROBUSDE SUCHE: Finde die erste brauchbare TXT-Datei im Temp-Ordner.
-        for root, _, files in os.walk(temp_dir):
-            for file in files:
-                # Prüfe, ob es eine Textdatei ist und nicht auf der Ignorierliste steht
-                if file.lower().endswith(".txt") and file.lower() not in ignored_files:
-                    full_path = os.path.join(root, file)
-                    found_txt_path = full_path
-                    break
-            if found_txt_path:
-                break
-
-        if not found_txt_path:
-            # Zeile umgebrochen für bessere Lesbarkeit
-            error_msg = (
-                "Konnte keine extrahierte Textdatei (.txt) aus der MSG-Datei finden. "
-                "Dies geschieht oft bei Kontakten, die nur Metadaten oder nicht "
-                "unterstützte Formate enthalten."
-            )
-            return {"error": error_msg}
-
-        # Verwende den gefundenen Pfad
-        with open(found_txt_path, "r", encoding="utf-8", errors="ignore") as file:
-            text = file.read()
-
-        # Rückgabe muss eine Liste von Kontakten sein, um konsistent mit anderen Importern zu sein
-        return [_parse_message_text(text)]
+    if not data:
+        error_msg = (
+            "Die MSG-Datei enthält keine verwertbaren Kontaktdaten. "
+            "Dies geschieht oft bei Kontakten, die nur Metadaten oder nicht "
+            "unterstützte Formate enthalten."
+        )
+        return {"error": error_msg}
 
-    finally:
-        # Löscht den temporären Ordner IMMER, wenn die Funktion beendet ist (WICHTIG!)
-        shutil.rmtree(temp_dir)
+    # Rückgabe muss eine Liste von Kontakten sein, um konsistent mit anderen Importern zu sein
+    return [data]
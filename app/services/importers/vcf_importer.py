@@ -1,24 +1,76 @@
 # app/services/importers/vcf_importer.py
 """This module handles the import of .vcf files."""
 import re
+from typing import Any, Dict, Iterator, List, Optional
+
 import vobject
 from vobject.base import VObjectError
-from ..gender_detector import get_anrede_from_vorname
-from ..titel_detector import extract_titles
 
+from .enrichment import enrich_records
+
+DEFAULT_CHUNK_SIZE = 1000
 
-def parse_vcf(file_path):
-    """Liest eine .vcf-Datei und gibt eine Liste mit einem Kontakt-Dictionary zurück."""
-    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-        vcard_text = f.read()
 
+def _decode_line(raw_line: bytes) -> str:
+    """
+    Dekodiert eine Zeile als UTF-8, sonst als Windows-1252. Outlook mischt beides
+    in einer Datei (z.B. `ADR;CHARSET=Windows-1252` neben UTF-8-Feldern).
+    """
     try:
-        vcard = vobject.readOne(vcard_text)
+        return raw_line.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw_line.decode("cp1252", errors="replace")
+
+
+def _iter_card_texts(file_path: str) -> Iterator[str]:
+    """
+    Liest die Datei zeilenweise und gibt den Text jeder einzelnen vCard zurück
+    (von BEGIN:VCARD bis zum zugehörigen END:VCARD).
+    """
+    lines: List[str] = []
+    depth = 0
+    with open(file_path, "rb") as f:
+        for raw_line in f:
+            line = _decode_line(raw_line).lstrip("\ufeff")
+            marker = line.strip().upper()
+            if marker == "BEGIN:VCARD":
+                depth += 1
+            if depth:
+                lines.append(line)
+            if marker == "END:VCARD" and depth:
+                depth -= 1
+                if depth == 0:
+                    yield "".join(lines)
+                    lines = []
+
+
+def _read_card(card_text: str) -> Optional[Any]:
+    """Parst eine einzelne vCard, defekte Zeilen werden notfalls übersprungen."""
+    try:
+        return vobject.readOne(card_text, allowQP=True)
     except VObjectError:
-        # Manchmal haben VCFs Probleme, versuche es Zeile für Zeile
-        vcard = vobject.readOne(vcard_text, ignoreUnreadable=True)
+        try:
+            # Manchmal haben VCFs Probleme, versuche es Zeile für Zeile
+            return vobject.readOne(card_text, allowQP=True, ignoreUnreadable=True)
+        except VObjectError:
+            return None
+
+
+def _param_types(content_line) -> set:
+    """
+    Sammelt die Typen einer Eigenschaft in Großbuchstaben, sowohl aus TYPE=...
+    (vCard 3/4) als auch aus Parametern ohne Namen (vCard 2.1, z.B. `TEL;WORK`).
+    """
+    types = {v.upper() for v in content_line.singletonparams}
+    for name, values in content_line.params.items():
+        if name.upper() == "TYPE":
+            types.update(v.upper() for v in values)
+    return types
 
-    data = {}
+
+def _card_to_record(vcard) -> Dict[str, Any]:
+    """Bildet die Eigenschaften einer vCard auf die Attribute der Vorlagen ab."""
+    data: Dict[str, Any] = {}
     if hasattr(vcard, "n"):
         data["Vorname"] = vcard.n.value.given
         data["Nachname"] = vcard.n.value.family
@@ -30,12 +82,15 @@ def parse_vcf(file_path):
         data["Position"] = vcard.title.value
     if hasattr(vcard, "tel"):
         for tel in vcard.tel_list:
-            if "WORK" in tel.type_param:
+            types = _param_types(tel)
+            if "CELL" in types:
+                data["Mobilnummer"] = tel.value
+            elif "FAX" in types:
+                data["Faxnummer"] = tel.value
+            elif "WORK" in types:
                 data["Telefon (geschäftlich)"] = tel.value
-            elif "HOME" in tel.type_param:
+            elif "HOME" in types:
                 data["Telefon (privat)"] = tel.value
-            elif "CELL" in tel.type_param:
-                data["Mobilnummer"] = tel.value
     if hasattr(vcard, "email"):
         data["E-Mail"] = vcard.email.value
     if hasattr(vcard, "url"):
@@ -43,6 +98,8 @@ def parse_vcf(file_path):
     if hasattr(vcard, "adr"):
         addr = vcard.adr.value
         street_line = addr.street
+        if not isinstance(street_line, str):
+            street_line = " ".join(street_line)
 
         # KORREKTUR: Versuche, Straße und Hausnummer zu trennen
         street_match = re.match(r"^(.+?)\s+([\d\w\s/.-]+)$", street_line)
@@ -56,16 +113,47 @@ def parse_vcf(file_path):
         data["Postleitzahl"] = addr.code
         data["Land"] = addr.country
 
-    # Anrede automatisch erkennen, falls nicht vorhanden
-    if "Anrede" not in data and "Vorname" in data:
-        anrede = get_anrede_from_vorname(data["Vorname"])
-        if anrede:
-            data["Anrede"] = anrede
+    return {k: v for k, v in data.items() if v}
+
+
+def iter_vcf(
+    file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Liest alle vCards einer .vcf-Datei zeilenweise und gibt die Kontakte blockweise zurück.
+    Exporte aus Telefonen oder Groupware-Systemen enthalten oft tausende Karten in einer Datei.
+
+    Jede Karte wird einzeln geparst: eine defekte Karte wird übersprungen, ohne den
+    Rest der Datei zu verlieren.
+
+    Args:
+        file_path: Der Pfad zur Datei.
+        chunk_size: Anzahl der Kontakte pro Block.
+
+    Raises:
+        ValueError: Wenn die Datei keine lesbare vCard enthält.
+    """
+    chunk: List[Dict[str, Any]] = []
+    found = False
+    for card_text in _iter_card_texts(file_path):
+        vcard = _read_card(card_text)
+        if vcard is None:
+            continue
+        record = _card_to_record(vcard)
+        if not record:
+            continue
+        found = True
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            # Automatische Erkennung von Anrede und Titel
+            yield enrich_records(chunk)
+            chunk = []
+    if chunk:
+        yield enrich_records(chunk)
+    if not found:
+        raise ValueError("Die Datei enthält keine lesbare vCard.")
 
-    # Titel aus Position extrahieren, falls nicht schon vorhanden
-    if "Titel (akademisch)" not in data and "Position" in data:
-        titel = extract_titles(data["Position"])
-        if titel:
-            data["Titel (akademisch)"] = ", ".join(titel)
 
-    return [data]  # In eine Liste packen, um konsistent mit anderen Importern zu sein
+def parse_vcf(file_path) -> List[Dict[str, Any]]:
+    """Liest eine .vcf-Datei und gibt eine Liste aller enthaltenen Kontakte zurück."""
+    return [record for chunk in iter_vcf(file_path) for record in chunk]
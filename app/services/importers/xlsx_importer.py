@@ -1,43 +1,65 @@
 # app/services/importers/xlsx_importer.py
+import datetime
+from typing import Any, Dict, Iterator, List
+
 import openpyxl
-from ..gender_detector import get_anrede_from_vorname
-from ..titel_detector import extract_titles
+
+from .enrichment import enrich_records
+
+DEFAULT_CHUNK_SIZE = 1000
+SHEET_COLUMN = "Tabellenblatt"
+
+
+def _cell_value(value: Any) -> Any:
+    """Wandelt Datums- und Zeitwerte in Text um, damit sie als JSON speicherbar sind."""
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    return value
 
 
-def parse_xlsx(file_path):
+def iter_xlsx(
+    file_path: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    all_sheets: bool = False,
+) -> Iterator[List[Dict[str, Any]]]:
     """
-    Liest eine .xlsx-Datei, gibt eine Liste von Dictionaries und eine Text-Repräsentation zurück.
+    Liest eine .xlsx-Datei im Read-only-Modus zeilenweise und gibt die Datensätze
+    blockweise zurück. Die erste Zeile jedes Tabellenblatts enthält die Spaltennamen.
+
+    Args:
+        file_path: Der Pfad zur Datei.
+        chunk_size: Anzahl der Datensätze pro Block.
+        all_sheets: Alle Tabellenblätter importieren statt nur des aktiven. Der Name des
+            Blatts wird dann in der Spalte "Tabellenblatt" mitgeliefert.
     """
-    records = []
-    raw_content_lines = []
-    workbook = openpyxl.load_workbook(file_path)
-    sheet = workbook.active
-
-    # Konvertiere Header zu Strings, um Fehler bei leeren oder Nicht-String-Zellen zu vermeiden
-    headers = [str(cell.value) if cell.value is not None else "" for cell in sheet[1]]
-    raw_content_lines.append("\t".join(headers))
-
-    for row_values in sheet.iter_rows(min_row=2, values_only=True):
-        if any(cell is not None for cell in row_values):
-            row_dict = dict(zip(headers, row_values))
-
-            # Automatische Erkennung von Anrede und Titel
-            if not row_dict.get("Anrede"):
-                if row_dict.get("Vorname"):
-                    anrede = get_anrede_from_vorname(str(row_dict["Vorname"]))
-                    if anrede:
-                        row_dict["Anrede"] = anrede
-            if not row_dict.get("Titel (akademisch)"):
-                if row_dict.get("Position"):
-                    titel = extract_titles(str(row_dict["Position"]))
-                    if titel:
-                        row_dict["Titel (akademisch)"] = ", ".join(titel)
-
-            records.append(row_dict)
-            # Konvertiere alle Werte der Zeile für den rohen Inhalt in Strings
-            raw_content_lines.append(
-                "\t".join(str(v) if v is not None else "" for v in row_values)
-            )
-
-    raw_content = "\n".join(raw_content_lines)
-    return records, raw_content
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheets = workbook.worksheets if all_sheets else [workbook.active]
+        chunk: List[Dict[str, Any]] = []
+        for sheet in sheets:
+            rows = sheet.iter_rows(values_only=True)
+            first_row = next(rows, None)
+            if first_row is None:
+                continue
+
+            # Konvertiere Header zu Strings, um Fehler bei leeren oder Nicht-String-Zellen zu vermeiden
+            headers = [str(v) if v is not None else "" for v in first_row]
+
+            for row_values in rows:
+                if not any(cell is not None for cell in row_values):
+                    continue
+                row_dict = dict(zip(headers, map(_cell_value, row_values)))
+                if all_sheets:
+                    row_dict[SHEET_COLUMN] = sheet.title
+                chunk.append(row_dict)
+
+                if len(chunk) >= chunk_size:
+                    # Automatische Erkennung von Anrede und Titel
+                    yield enrich_records(chunk)
+                    chunk = []
+        if chunk:
+            yield enrich_records(chunk)
+    finally:
+        # Im Read-only-Modus bleibt die Datei sonst geöffnet
+        workbook.close()
+
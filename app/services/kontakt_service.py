@@ -0,0 +1,479 @@
+# app/services/kontakt_service.py
+"""
+Dieses Modul stellt seitenweise, gefilterte Abfragen und die Volltextsuche auf Kontakte
+bereit sowie das gesammelte Ändern einzelner Attribute vieler Kontakte.
+"""
+import base64
+import binascii
+import json
+import math
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import (
+    and_,
+    bindparam,
+    case,
+    column,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..models import db, Kontakt, INDEXED_ATTRIBUTES, MIRRORED_ATTRIBUTES
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+# Höchstzahl an Einträgen pro Aufruf von update_fields
+MAX_BULK_UPDATES = 1000
+
+# Attribute, die als echte Spalten gespiegelt sind (siehe Kontakt.set_data)
+MIRRORED_COLUMNS = {
+    "id": Kontakt.id,
+    "vorname": Kontakt.vorname,
+    "nachname": Kontakt.nachname,
+    "firma": Kontakt.firma,
+}
+
+# Volltextindex über alle Attribute (siehe KONTAKT_FTS_DDL in models.py)
+kontakt_fts = table("kontakt_fts", column("rowid"))
+
+# Gewichtung der FTS-Spalten (vorname, nachname, firma, inhalt) für das Ranking
+FTS_RANK = text("bm25(kontakt_fts, 10.0, 10.0, 5.0, 1.0)")
+
+# Vorlagen-Attribute, die direkt auf eine gespiegelte Spalte zeigen
+ATTRIBUTE_ALIASES = {
+    "Vorname": "vorname",
+    "Nachname": "nachname",
+    "Firma": "firma",
+}
+
+
+def _json_path(attribute: str) -> str:
+    """Erzeugt einen JSON-Pfad für json_extract, der auch Sonderzeichen erlaubt."""
+    escaped = attribute.replace("\\", "\\\\").replace('"', '\\"')
+    return f'$."{escaped}"'
+
+
+# Tatsächlich vorhandene generierte Spalten je Datenbank (siehe INDEXED_ATTRIBUTES)
+_generated_columns: Dict[str, frozenset] = {}
+
+
+def _existing_generated_columns() -> frozenset:
+    """
+    Die generierten Attribut-Spalten, die in der Datenbank angelegt sind. Fehlen sie
+    (z.B. Migration noch nicht ausgeführt), wird weiter json_extract verwendet.
+    """
+    url = str(db.engine.url)
+    if url not in _generated_columns:
+        found = frozenset()
+        if db.engine.dialect.name == "sqlite":
+            with db.engine.connect() as conn:
+                found = frozenset(
+                    row[1]
+                    for row in conn.execute(text("PRAGMA table_xinfo(kontakt)"))
+                    if row[1] in INDEXED_ATTRIBUTES.values()
+                )
+        _generated_columns[url] = found
+    return _generated_columns[url]
+
+
+def _attribute_expression(name: str):
+    """Liefert den SQL-Ausdruck für eine Spalte oder ein Attribut aus `daten`."""
+    key = ATTRIBUTE_ALIASES.get(name, name)
+    if key in MIRRORED_COLUMNS:
+        return MIRRORED_COLUMNS[key]
+    column_name = INDEXED_ATTRIBUTES.get(name)
+    if column_name and column_name in _existing_generated_columns():
+        # Generierte Spalte mit Index statt json_extract auf jeder Zeile
+        return literal_column(f"kontakt.{column_name}")
+    if db.engine.dialect.name == "postgresql":
+        return Kontakt.daten.cast(JSONB)[name].astext
+    return func.json_extract(Kontakt.daten, _json_path(name))
+
+
+def _sort_expression(name: str):
+    """Sortierausdruck ohne NULL-Werte, damit der Keyset-Vergleich stabil bleibt."""
+    expression = _attribute_expression(name)
+    if expression is Kontakt.id:
+        return expression
+    expression = func.coalesce(expression, literal_column("''"))
+    if db.engine.dialect.name == "postgresql":
+        # PostgreSQL kennt keine NOCASE-Kollation
+        return func.lower(expression)
+    return expression.collate("NOCASE")
+
+
+def _escape_like(value: str) -> str:
+    """Maskiert Platzhalterzeichen für LIKE-Abfragen."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def encode_cursor(sort_value: Any, kontakt_id: int) -> str:
+    """Kodiert die Position des letzten Eintrags einer Seite als URL-sicheren String."""
+    raw = json.dumps([sort_value, kontakt_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    """Dekodiert einen Cursor. Wirft ValueError bei ungültigen Werten."""
+    try:
+        sort_value, kontakt_id = json.loads(base64.urlsafe_b64decode(cursor))
+    except (binascii.Error, json.JSONDecodeError, TypeError, ValueError) as err:
+        raise ValueError("Ungültiger Cursor") from err
+    if not isinstance(kontakt_id, int):
+        raise ValueError("Ungültiger Cursor")
+    return sort_value, kontakt_id
+
+
+def _uses_fts() -> bool:
+    """Der Volltextindex existiert nur in SQLite-Datenbanken."""
+    return db.engine.dialect.name == "sqlite"
+
+
+def build_fts_query(search: str) -> str:
+    """
+    Übersetzt eine Benutzereingabe in eine FTS5-Abfrage: Jedes Wort wird als
+    Präfix gesucht, alle Wörter müssen vorkommen (z.B. "max mü" -> "max"* "mü"*).
+    """
+    terms = re.findall(r"\w+", search or "")
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _fts_match(fts_query: str):
+    """Bedingung, die eine Abfrage auf Kontakte mit Treffer im Volltextindex einschränkt."""
+    return Kontakt.id.in_(
+        select(kontakt_fts.c.rowid).where(
+            text("kontakt_fts MATCH :fts_query").bindparams(fts_query=fts_query)
+        )
+    )
+
+
+def _like_search(search: str):
+    """Fallback-Suche per LIKE, falls kein Volltextindex verfügbar ist."""
+    pattern = f"%{_escape_like(search)}%"
+    return or_(
+        Kontakt.vorname.like(pattern, escape="\\"),
+        Kontakt.nachname.like(pattern, escape="\\"),
+        Kontakt.daten.like(pattern, escape="\\"),
+    )
+
+
+def apply_filters(query, filters: Optional[Dict[str, str]] = None, search: str = ""):
+    """Schränkt eine Kontakt-Abfrage auf Spaltenfilter und eine Freitextsuche ein."""
+    for name, value in (filters or {}).items():
+        value = str(value).strip()
+        if not value:
+            continue
+        pattern = f"%{_escape_like(value)}%"
+        query = query.filter(_attribute_expression(name).like(pattern, escape="\\"))
+
+    search = (search or "").strip()
+    if search:
+        if _uses_fts():
+            fts_query = build_fts_query(search)
+            if fts_query:
+                query = query.filter(_fts_match(fts_query))
+        else:
+            query = query.filter(_like_search(search))
+    return query
+
+
+def search_kontakte(
+    search: str, limit: int = 10, vorlage_id: Optional[int] = None
+) -> List[Kontakt]:
+    """
+    Sucht Kontakte über alle Attribute, die besten Treffer zuerst.
+
+    Args:
+        search: Die Benutzereingabe, Wörter werden als Präfix gesucht.
+        limit: Maximale Anzahl an Ergebnissen.
+        vorlage_id: Optional nur Kontakte dieser Vorlage durchsuchen.
+
+    Returns:
+        Eine nach Relevanz sortierte Liste von Kontakten.
+    """
+    query = Kontakt.query
+    if vorlage_id is not None:
+        query = query.filter(Kontakt.vorlage_id == vorlage_id)
+
+    if not _uses_fts():
+        return query.filter(_like_search(search.strip())).limit(limit).all()
+
+    fts_query = build_fts_query(search)
+    if not fts_query:
+        return []
+    return (
+        query.join(kontakt_fts, kontakt_fts.c.rowid == Kontakt.id)
+        .filter(text("kontakt_fts MATCH :fts_query").bindparams(fts_query=fts_query))
+        .order_by(FTS_RANK)
+        .limit(limit)
+        .all()
+    )
+
+
+def list_kontakte_page(
+    vorlage_id: int,
+    sort: str = "id",
+    direction: str = "asc",
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    filters: Optional[Dict[str, str]] = None,
+    search: str = "",
+) -> Dict[str, Any]:
+    """
+    Liefert eine Seite von Kontakten einer Vorlage per Keyset-Paginierung.
+
+    Args:
+        vorlage_id: Die ID der Vorlage.
+        sort: "id", eine gespiegelte Spalte (vorname, nachname, firma) oder ein Attributname.
+        direction: "asc" oder "desc".
+        cursor: Der `next_cursor` der vorherigen Seite oder None für die erste Seite.
+        limit: Anzahl der Kontakte pro Seite (maximal MAX_PAGE_SIZE).
+        filters: Attributname -> Teilstring, nach dem gefiltert wird.
+        search: Freitext, der in allen Attributen gesucht wird.
+
+    Returns:
+        Ein Dictionary mit `kontakte`, `next_cursor` und (nur auf der ersten Seite) `total`.
+    """
+    limit = max(1, min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+    descending = direction == "desc"
+    sort_expr = _sort_expression(sort or "id")
+
+    query = apply_filters(
+        Kontakt.query.filter(Kontakt.vorlage_id == vorlage_id), filters, search
+    )
+    total = query.count() if cursor is None else None
+
+    if sort_expr is Kontakt.id:
+        columns = [Kontakt.id]
+        order_by = [Kontakt.id.desc() if descending else Kontakt.id.asc()]
+    else:
+        columns = [sort_expr, Kontakt.id]
+        order_by = (
+            [sort_expr.desc(), Kontakt.id.desc()]
+            if descending
+            else [sort_expr.asc(), Kontakt.id.asc()]
+        )
+
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        if len(columns) == 1:
+            position = Kontakt.id < last_id if descending else Kontakt.id > last_id
+        elif descending:
+            # Als Bereich auf dem Sortierausdruck statt als Zeilenwert-Vergleich, nur so
+            # springt SQLite im Sortierindex direkt an die Position des Cursors
+            position = and_(
+                sort_expr <= sort_value,
+                or_(sort_expr < sort_value, Kontakt.id < last_id),
+            )
+        else:
+            position = and_(
+                sort_expr >= sort_value,
+                or_(sort_expr > sort_value, Kontakt.id > last_id),
+            )
+        query = query.filter(position)
+
+    rows = (
+        query.add_columns(sort_expr.label("sort_value"))
+        .order_by(*order_by)
+        .limit(limit + 1)
+        .all()
+    )
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    page_kontakte = [kontakt for kontakt, _ in rows]
+    kontakte: List[Dict[str, Any]] = [
+        {
+            "id": kontakt.id,
+            "daten": daten,
+            "validation_acknowledged": kontakt.validation_acknowledged,
+        }
+        for kontakt, daten in zip(page_kontakte, Kontakt.get_data_many(page_kontakte))
+    ]
+
+    next_cursor = None
+    if has_more and rows:
+        last_kontakt, last_sort_value = rows[-1]
+        next_cursor = encode_cursor(last_sort_value, last_kontakt.id)
+
+    return {"kontakte": kontakte, "next_cursor": next_cursor, "total": total}
+
+
+def _uses_json_set() -> bool:
+    """Attribute lassen sich nur in SQLite per json_set direkt in der Datenbank ändern."""
+    return db.engine.dialect.name == "sqlite"
+
+
+def _find_targets(kontakt_ids: List[int]) -> Dict[int, bool]:
+    """Die vorhandenen Kontakte unter den IDs und ob ihre Daten gültiges JSON sind."""
+    if not kontakt_ids:
+        return {}
+    valid = func.json_valid(Kontakt.daten) if _uses_json_set() else literal(True)
+    rows = db.session.execute(
+        select(Kontakt.id, valid).where(Kontakt.id.in_(kontakt_ids))
+    )
+    return {kontakt_id: bool(is_valid) for kontakt_id, is_valid in rows}
+
+
+def _json_set_statement(names: Tuple[str, ...]):
+    """
+    UPDATE für eine Gruppe von Kontakten, bei denen dieselben Attribute geändert werden.
+    Parameter je Kontakt: b_id, j<i> (Wert als JSON) und r<i> (Wert für die Suchspalten).
+    """
+    arguments = []
+    for i, name in enumerate(names):
+        arguments += [literal(_json_path(name)), func.json(bindparam(f"j{i}"))]
+    values = {"daten": func.json_set(Kontakt.daten, *arguments)}
+
+    # Suchspalten wie in Kontakt.prepare_data: das Attribut, sonst dessen Ersatz, solange
+    # das Attribut selbst nicht in den Daten steht
+    for column_name, (attribute, fallback) in MIRRORED_ATTRIBUTES.items():
+        if attribute in names:
+            values[column_name] = bindparam(f"r{names.index(attribute)}")
+        elif fallback in names:
+            values[column_name] = case(
+                (
+                    func.json_type(Kontakt.daten, _json_path(attribute)).is_(None),
+                    bindparam(f"r{names.index(fallback)}"),
+                ),
+                else_=getattr(Kontakt, column_name),
+            )
+    return (
+        Kontakt.__table__.update()
+        .where(Kontakt.id == bindparam("b_id"))
+        .values(**values)
+    )
+
+
+def _is_scalar_value(value: Any) -> bool:
+    """
+    Prüft, ob ein Wert als Attribut gespeichert werden kann: ein JSON-Skalar ohne
+    NaN/Infinity, da er auch in die Spalten vorname/nachname/firma übernommen wird
+    und SQLite solche Zahlen nicht als JSON akzeptiert.
+    """
+    if isinstance(value, float):
+        return math.isfinite(value)
+    return value is None or isinstance(value, (str, int, bool))
+
+
+def _apply_json_set(changes: Dict[int, Dict[str, Any]]):
+    """Setzt die Attribute per json_set, ein executemany je Kombination geänderter Attribute."""
+    if not changes:
+        return
+    groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for kontakt_id, fields in changes.items():
+        params: Dict[str, Any] = {"b_id": kontakt_id}
+        for i, value in enumerate(fields.values()):
+            params[f"j{i}"] = json.dumps(value, ensure_ascii=False, allow_nan=False)
+            params[f"r{i}"] = value
+        groups.setdefault(tuple(fields), []).append(params)
+
+    for names, params in groups.items():
+        db.session.execute(_json_set_statement(names), params)
+
+
+def _apply_decoded(changes: Dict[int, Dict[str, Any]]):
+    """Ändert die Attribute über get_data/set_data (Datenbanken ohne json_set)."""
+    if not changes:
+        return
+    for kontakt in Kontakt.query.filter(Kontakt.id.in_(list(changes))):
+        daten = dict(kontakt.get_data())
+        daten.update(changes[kontakt.id])
+        kontakt.set_data(daten)
+
+
+def update_fields(updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Ändert einzelne Attribute vieler Kontakte in einer Transaktion. In SQLite werden die
+    Werte per json_set gesetzt, ohne `daten` in Python zu dekodieren.
+
+    Args:
+        updates: Liste von {"id": Kontakt-ID, "fields": {Attributname: Wert}}. Mehrere
+            Einträge für denselben Kontakt werden in ihrer Reihenfolge angewendet.
+            Werte müssen Text, Zahlen, Wahrheitswerte, null oder Listen davon sein.
+
+    Returns:
+        Pro Eintrag {"id", "success"} und bei Fehlern "error", in der Reihenfolge der Eingabe.
+
+    Raises:
+        ValueError: Wenn `updates` keine Liste ist oder zu viele Einträge enthält.
+        SQLAlchemyError: Bei Datenbankfehlern, es wird dann keine Änderung gespeichert.
+    """
+    if not isinstance(updates, list):
+        raise ValueError("updates muss eine Liste sein")
+    if len(updates) > MAX_BULK_UPDATES:
+        raise ValueError(f"Höchstens {MAX_BULK_UPDATES} Änderungen pro Anfrage")
+
+    results: List[Dict[str, Any]] = []
+    changes: Dict[int, Dict[str, Any]] = {}
+    for item in updates:
+        kontakt_id = item.get("id") if isinstance(item, dict) else None
+        fields = item.get("fields") if isinstance(item, dict) else None
+        if (
+            not isinstance(kontakt_id, int)
+            or isinstance(kontakt_id, bool)
+            or not isinstance(fields, dict)
+            or not fields
+            or not all(isinstance(name, str) and name for name in fields)
+        ):
+            results.append(
+                {"id": kontakt_id, "success": False, "error": "Ungültige Änderung"}
+            )
+            continue
+        values = {name: Kontakt.prepare_value(value) for name, value in fields.items()}
+        invalid = [name for name, value in values.items() if not _is_scalar_value(value)]
+        if invalid:
+            results.append(
+                {
+                    "id": kontakt_id,
+                    "success": False,
+                    "error": f"Ungültiger Wert für {', '.join(invalid)}",
+                }
+            )
+            continue
+        results.append({"id": kontakt_id, "success": True})
+        changes.setdefault(kontakt_id, {}).update(values)
+
+    targets = _find_targets(list(changes))
+    for result in results:
+        if not result["success"]:
+            continue
+        if result["id"] not in targets:
+            result.update(success=False, error="Kontakt nicht gefunden")
+        elif not targets[result["id"]]:
+            result.update(
+                success=False, error="Gespeicherte Daten sind kein gültiges JSON"
+            )
+    changes = {
+        kontakt_id: fields
+        for kontakt_id, fields in changes.items()
+        if targets.get(kontakt_id)
+    }
+
+    decoded = changes
+    if _uses_json_set():
+        # SQLite-JSON-Pfade können keine Anführungszeichen in Attributnamen enthalten
+        decoded = {
+            kontakt_id: fields
+            for kontakt_id, fields in changes.items()
+            if any('"' in name or "\\" in name for name in fields)
+        }
+    try:
+        _apply_json_set(
+            {key: value for key, value in changes.items() if key not in decoded}
+        )
+        _apply_decoded(decoded)
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        raise
+    return results
@@ -0,0 +1,155 @@
+# app/services/serialization.py
+"""
+Dieses Modul legt fest, wie `Kontakt.daten` und `Kontakt.import_raw_content` gespeichert
+werden. `daten` bleibt JSON-Text, da Volltextindex, generierte Spalten und Filter per
+json_extract direkt darauf zugreifen, wird aber kompakt und ohne \\u-Escapes geschrieben.
+Der rohe Import-Inhalt wird komprimiert als Binärwert abgelegt.
+"""
+import json
+import math
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import orjson
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+
+def _has_non_finite(value: Any) -> bool:
+    """Prüft, ob ein Wert (auch in Listen und Dictionaries) NaN oder Infinity enthält."""
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_non_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_has_non_finite(item) for item in value)
+    return False
+
+
+class JsonDataCodec:
+    """
+    Standardbibliothek, schreibt wie bisher json.dumps. NaN/Infinity werden dabei als
+    `NaN`/`Infinity` geschrieben, was die JSON-Funktionen von SQLite nicht lesen können.
+    """
+
+    name = "json"
+
+    def dumps(self, data: Dict[str, Any]) -> str:
+        return json.dumps(data)
+
+    def loads(self, text: str) -> Dict[str, Any]:
+        return json.loads(text)
+
+    def loads_many(self, texts: Iterable[Optional[str]]) -> List[Dict[str, Any]]:
+        return [json.loads(text) if text else {} for text in texts]
+
+
+class OrjsonDataCodec:
+    """
+    orjson, schreibt kompaktes UTF-8-JSON und liest deutlich schneller. orjson würde
+    NaN/Infinity stillschweigend als `null` schreiben, solche Werte werden daher mit
+    einem ValueError abgelehnt.
+    """
+
+    name = "orjson"
+
+    def dumps(self, data: Dict[str, Any]) -> str:
+        try:
+            encoded = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            # z.B. Ganzzahlen über 64 Bit, die nur die Standardbibliothek schreiben kann
+            return json.dumps(data, allow_nan=False)
+        # Nur wenn `null` vorkommt, kann ein nicht endlicher Wert darin stecken
+        if b"null" in encoded and _has_non_finite(data):
+            raise ValueError("NaN und Infinity können nicht gespeichert werden")
+        return encoded.decode("utf-8")
+
+    def loads(self, text: Union[str, bytes]) -> Dict[str, Any]:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            # Ältere Einträge können NaN/Infinity enthalten, was nur json.loads akzeptiert
+            return json.loads(text)
+
+    def loads_many(
+        self, texts: Iterable[Optional[Union[str, bytes]]]
+    ) -> List[Dict[str, Any]]:
+        texts = list(texts)
+        loads = orjson.loads
+        try:
+            return [loads(text) if text else {} for text in texts]
+        except orjson.JSONDecodeError:
+            return [self.loads(text) if text else {} for text in texts]
+
+
+DATA_CODECS = {codec.name: codec for codec in (JsonDataCodec(), OrjsonDataCodec())}
+_data_codec = DATA_CODECS["orjson"]
+
+
+def set_data_codec(name: str):
+    """Wählt das Format für `Kontakt.daten` (siehe DATA_CODECS)."""
+    global _data_codec  # pylint: disable=global-statement
+    if name not in DATA_CODECS:
+        raise ValueError(f"Unbekanntes Format für Kontaktdaten: {name}")
+    _data_codec = DATA_CODECS[name]
+
+
+def dumps_data(data: Dict[str, Any]) -> str:
+    """Serialisiert die Attribute eines Kontakts."""
+    return _data_codec.dumps(data)
+
+
+def loads_data(text: Optional[Union[str, bytes]]) -> Dict[str, Any]:
+    """Liest die Attribute eines Kontakts, leere Werte ergeben ein leeres Dictionary."""
+    return _data_codec.loads(text) if text else {}
+
+
+def loads_data_many(
+    texts: Iterable[Optional[Union[str, bytes]]]
+) -> List[Dict[str, Any]]:
+    """Liest die Attribute vieler Kontakte auf einmal, z.B. einer Seite oder eines Exportblocks."""
+    return _data_codec.loads_many(texts)
+
+
+# Erstes Byte eines gespeicherten Rohinhalts: Art der Kodierung
+RAW_PLAIN = b"\x00"
+RAW_ZLIB = b"\x01"
+# Kürzere Inhalte werden nicht komprimiert, der Gewinn wäre kleiner als der Aufwand
+RAW_COMPRESS_MIN_SIZE = 256
+RAW_COMPRESS_LEVEL = 6
+
+
+def compress_text(text: str) -> bytes:
+    """Kodiert einen Text als UTF-8 und komprimiert ihn ab RAW_COMPRESS_MIN_SIZE Bytes."""
+    raw = text.encode("utf-8")
+    if len(raw) >= RAW_COMPRESS_MIN_SIZE:
+        compressed = zlib.compress(raw, RAW_COMPRESS_LEVEL)
+        if len(compressed) < len(raw):
+            return RAW_ZLIB + compressed
+    return RAW_PLAIN + raw
+
+
+def decompress_text(value: Union[str, bytes, memoryview]) -> str:
+    """Gegenstück zu compress_text. Noch nicht umgewandelte Texte bleiben unverändert."""
+    if isinstance(value, str):
+        return value
+    value = bytes(value)
+    marker, payload = value[:1], value[1:]
+    if marker == RAW_ZLIB:
+        return zlib.decompress(payload).decode("utf-8")
+    if marker == RAW_PLAIN:
+        return payload.decode("utf-8")
+    # Binärwert ohne Kennung, z.B. von Hand eingetragen
+    return value.decode("utf-8", errors="replace")
+
+
+class CompressedText(TypeDecorator):
+    """Spaltentyp für Texte, die komprimiert als Binärwert gespeichert werden."""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else decompress_text(value)
@@ -0,0 +1,190 @@
+# app/services/task_store.py
+"""
+Dieses Modul speichert den Status von Hintergrundaufgaben (Import, Speichern) in einer
+eigenen SQLite-Datei. So sehen alle Worker-Prozesse eines Servers dieselben Aufgaben,
+und große Ergebnisse liegen auf der Platte statt im Arbeitsspeicher.
+"""
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from flask import Flask, current_app
+
+# Zeilen, die beim Lesen der Ergebnisse auf einmal aus der Datenbank geholt werden
+ROW_BATCH_SIZE = 1000
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS tasks ("
+    "id TEXT PRIMARY KEY, status TEXT NOT NULL, progress INTEGER NOT NULL DEFAULT 0, "
+    "total INTEGER NOT NULL DEFAULT 0, records INTEGER NOT NULL DEFAULT 0, "
+    "error TEXT, result TEXT, updated_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS task_rows ("
+    "task_id TEXT NOT NULL, part INTEGER NOT NULL, position INTEGER NOT NULL, "
+    "data TEXT NOT NULL, PRIMARY KEY (task_id, part, position)) WITHOUT ROWID",
+    "CREATE INDEX IF NOT EXISTS ix_tasks_updated_at ON tasks (updated_at)",
+)
+
+_UPDATABLE_FIELDS = {"status", "progress", "total", "records", "error", "result"}
+
+
+def init_app(app: Flask):
+    """Legt die Tabellen an und stellt die Datei auf WAL um (parallele Leser und ein Schreiber)."""
+    with _connect(app.config["TASK_STORE_PATH"]) as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in _SCHEMA:
+            conn.execute(statement)
+
+
+@contextmanager
+def _connect(path: Optional[str] = None) -> Iterator[sqlite3.Connection]:
+    """Öffnet eine kurzlebige Verbindung und schreibt die Änderungen am Ende fest."""
+    conn = sqlite3.connect(path or current_app.config["TASK_STORE_PATH"], timeout=30)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def evict_expired(ttl_seconds: Optional[int] = None):
+    """Löscht Aufgaben samt Zeilen, die länger als `ttl_seconds` nicht aktualisiert wurden."""
+    ttl = ttl_seconds if ttl_seconds is not None else current_app.config["TASK_TTL_SECONDS"]
+    cutoff = time.time() - ttl
+    with _connect() as conn:
+        conn.execute(
+            "DELETE FROM task_rows WHERE task_id IN "
+            "(SELECT id FROM tasks WHERE updated_at < ?)",
+            (cutoff,),
+        )
+        conn.execute("DELETE FROM tasks WHERE updated_at < ?", (cutoff,))
+
+
+def create_task(task_id: str, status: str, total: int = 0):
+    """Legt eine neue Aufgabe an. Abgelaufene Aufgaben werden dabei aufgeräumt."""
+    evict_expired()
+    with _connect() as conn:
+        conn.execute(
+            "INSERT INTO tasks (id, status, total, updated_at) VALUES (?, ?, ?, ?)",
+            (task_id, status, total, time.time()),
+        )
+
+
+def update_task(task_id: str, **fields: Any):
+    """
+    Aktualisiert einzelne Felder einer Aufgabe (status, progress, total, records,
+    error, result). `result` wird als JSON gespeichert.
+    """
+    unknown = set(fields) - _UPDATABLE_FIELDS
+    if unknown:
+        raise ValueError(f"Unbekannte Felder: {', '.join(sorted(unknown))}")
+    if "result" in fields:
+        fields["result"] = json.dumps(fields["result"])
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    with _connect() as conn:
+        conn.execute(
+            f"UPDATE tasks SET {assignments}, updated_at = ? WHERE id = ?",
+            (*fields.values(), time.time(), task_id),
+        )
+
+
+def claim_task(task_id: str, expected_status: str, status: str, **fields: Any) -> bool:
+    """
+    Setzt den Status nur, wenn die Aufgabe noch `expected_status` hat. Verhindert,
+    dass zwei Anfragen (z.B. doppelter Klick, zwei Worker) dieselbe Aufgabe übernehmen.
+
+    Returns:
+        True, wenn die Aufgabe übernommen wurde.
+    """
+    unknown = set(fields) - _UPDATABLE_FIELDS
+    if unknown:
+        raise ValueError(f"Unbekannte Felder: {', '.join(sorted(unknown))}")
+    assignments = "".join(f", {name} = ?" for name in fields)
+    with _connect() as conn:
+        cursor = conn.execute(
+            f"UPDATE tasks SET status = ?{assignments}, updated_at = ? "
+            "WHERE id = ? AND status = ?",
+            (status, *fields.values(), time.time(), task_id, expected_status),
+        )
+        return cursor.rowcount == 1
+
+
+def get_task(task_id: str) -> Optional[Dict[str, Any]]:
+    """Gibt den Status einer Aufgabe zurück oder None, falls sie nicht (mehr) existiert."""
+    with _connect() as conn:
+        row = conn.execute(
+            "SELECT status, progress, total, records, error, result FROM tasks WHERE id = ?",
+            (task_id,),
+        ).fetchone()
+    if row is None:
+        return None
+    status, progress, total, records, error, result = row
+    task = {
+        "status": status,
+        "progress": progress,
+        "total": total,
+        "records": records,
+        "result": json.loads(result) if result else None,
+    }
+    if error:
+        task["error"] = error
+    return task
+
+
+def delete_task(task_id: str):
+    """Entfernt eine Aufgabe und alle zugehörigen Zeilen."""
+    with _connect() as conn:
+        conn.execute("DELETE FROM task_rows WHERE task_id = ?", (task_id,))
+        conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+
+def delete_rows(task_id: str):
+    """Entfernt nur die ausgelagerten Datensätze, der Status der Aufgabe bleibt erhalten."""
+    with _connect() as conn:
+        conn.execute("DELETE FROM task_rows WHERE task_id = ?", (task_id,))
+
+
+def append_rows(
+    task_id: str, records: List[Dict[str, Any]], part: int = 0, start: int = 0
+) -> int:
+    """
+    Lagert geparste Datensätze einer Aufgabe auf die Platte aus.
+
+    Args:
+        task_id: Die ID der Aufgabe.
+        records: Die Datensätze in ihrer Reihenfolge.
+        part: Teil der Aufgabe, z.B. der Index der Datei. Teile dürfen in beliebiger
+            Reihenfolge geschrieben werden, gelesen wird nach `part` sortiert.
+        start: Position des ersten Datensatzes innerhalb des Teils.
+
+    Returns:
+        Die Position hinter dem letzten geschriebenen Datensatz.
+    """
+    with _connect() as conn:
+        conn.executemany(
+            "INSERT INTO task_rows (task_id, part, position, data) VALUES (?, ?, ?, ?)",
+            (
+                # Nicht als JSON darstellbare Werte (z.B. timedelta aus Excel) als Text
+                (task_id, part, start + offset, json.dumps(record, default=str))
+                for offset, record in enumerate(records)
+            ),
+        )
+    return start + len(records)
+
+
+def iter_rows(task_id: str, batch_size: int = ROW_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Liest die ausgelagerten Datensätze einer Aufgabe blockweise in ihrer Reihenfolge."""
+    part, position = -1, -1
+    while True:
+        with _connect() as conn:
+            rows = conn.execute(
+                "SELECT part, position, data FROM task_rows "
+                "WHERE task_id = ? AND (part, position) > (?, ?) "
+                "ORDER BY part, position LIMIT ?",
+                (task_id, part, position, batch_size),
+            ).fetchall()
+        if not rows:
+            return
+        for part, position, data in rows:
+            yield json.loads(data)
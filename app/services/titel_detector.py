@@ -4,7 +4,8 @@ Dieses Modul extrahiert und formatiert akademische Titel gemäß DIN 5008
 aus einem gegebenen Text.
 """
 import re
-from typing import List
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
 
 # 1. Titel, die in der Anschrift vor dem Namen stehen (in der gewünschten Reihenfolge)
 PRESTAGED_TITLES = [
@@ -48,41 +49,42 @@ IGNORED_TITLES = [
 ]
 
 
-def extract_titles(text: str) -> List[str]:
+def _title_pattern(title: str) -> str:
     """
-    Extrahiert alle für die Anschrift relevanten Titel aus einem Text.
-
-    Args:
-        text: Ein String, der Titel enthalten könnte (z.B. "Prof. Dr. rer. nat. Max Mustermann").
-
-    Returns:
-        Eine Liste der gefundenen, sortierten Titel, die in der Anschrift verwendet werden.
+    Pattern für einen einzelnen Titel. Die Wortgrenze am Ende ist nur nötig, wenn der
+    Titel auf einen Buchstaben endet (z.B. "MBA"); ein Punkt schließt den Titel bereits ab.
     """
-    if not text:
-        return []
+    pattern = r"\b" + re.escape(title)
+    if title[-1].isalnum():
+        pattern += r"\b"
+    return pattern
 
-    found_titles = set()
 
-    # Erstelle ein kombiniertes Pattern, um alle Titel zu finden.
-    # Wir escapen Punkte und erstellen Wortgrenzen, um Teil-Matches zu vermeiden.
-    all_known_titles = PRESTAGED_TITLES + IGNORED_TITLES
+# Alle Titel werden einmalig zu einer Alternation kompiliert. Längere Titel stehen vorn,
+# damit z.B. "Dr.-Ing." vor "Dr." gefunden wird. Der Lookahead erlaubt überlappende
+# Treffer, sodass ein Durchlauf alle Titel des Textes findet.
+_ALL_TITLES = sorted(PRESTAGED_TITLES + IGNORED_TITLES, key=len, reverse=True)
+_TITLE_REGEX = re.compile(
+    "(?=(" + "|".join(_title_pattern(t) for t in _ALL_TITLES) + "))", re.IGNORECASE
+)
+# Zuordnung der gefundenen Schreibweise zur korrekten Schreibweise
+_CANONICAL_TITLES = {title.lower(): title for title in _ALL_TITLES}
+_TITLE_ORDER = {title: index for index, title in enumerate(PRESTAGED_TITLES)}
 
-    # Sortiere die Titel nach Länge (absteigend), damit längere Titel zuerst gefunden werden
-    # (z.B. "Dr.-Ing." vor "Dr.")
-    sorted_titles = sorted(all_known_titles, key=len, reverse=True)
 
-    for title in sorted_titles:
-        # \b sorgt für eine Wortgrenze, re.escape behandelt z.B. den Punkt in "Dr."
-        pattern = r"\b" + re.escape(title) + r"\b"
-        if re.search(pattern, text, re.IGNORECASE):
-            # Füge den Titel in seiner korrekten Schreibweise hinzu
-            found_titles.add(title)
+@lru_cache(maxsize=4096)
+def _extract_titles_cached(text: str) -> Tuple[str, ...]:
+    """Findet alle Titel in einem Durchlauf und wendet die Anschrift-Regeln an."""
+    found_titles = {
+        _CANONICAL_TITLES[match.group(1).lower()]
+        for match in _TITLE_REGEX.finditer(text)
+    }
 
-    # Filtere nur die Titel, die in der Anschrift erlaubt sind
-    relevant_titles = [t for t in found_titles if t in PRESTAGED_TITLES]
-
-    # Sortiere die gefundenen Titel gemäß der vordefinierten Reihenfolge
-    relevant_titles.sort(key=PRESTAGED_TITLES.index)
+    # Filtere nur die Titel, die in der Anschrift erlaubt sind, und sortiere sie
+    # gemäß der vordefinierten Reihenfolge
+    relevant_titles = sorted(
+        (t for t in found_titles if t in _TITLE_ORDER), key=_TITLE_ORDER.get
+    )
 
     # Sonderfall: Wenn "Dr.-Ing." etc. und "Dr." gefunden wurden,
     # behalte nur den spezifischeren Titel.
@@ -94,4 +96,35 @@ def extract_titles(text: str) -> List[str]:
     if "Ph.D." in found_titles and "Dr." not in relevant_titles:
         relevant_titles.append("Dr.")
 
-    return relevant_titles
+    return tuple(relevant_titles)
+
+
+def extract_titles(text: str) -> List[str]:
+    """
+    Extrahiert alle für die Anschrift relevanten Titel aus einem Text.
+
+    Args:
+        text: Ein String, der Titel enthalten könnte (z.B. "Prof. Dr. rer. nat. Max Mustermann").
+
+    Returns:
+        Eine Liste der gefundenen, sortierten Titel, die in der Anschrift verwendet werden.
+    """
+    if not text:
+        return []
+    return list(_extract_titles_cached(text))
+
+
+def extract_titles_many(texts: Iterable[str]) -> List[List[str]]:
+    """
+    Extrahiert die Titel für eine ganze Spalte (z.B. alle Positionen eines Imports).
+    Wiederholte Texte werden nur einmal ausgewertet.
+    """
+    titles_by_text: Dict[str, List[str]] = {}
+    result = []
+    for text in texts:
+        titles = titles_by_text.get(text)
+        if titles is None:
+            titles = titles_by_text[text] = extract_titles(text)
+        # Jede Zeile erhält eine eigene Liste, auch bei gleichem Text
+        result.append(list(titles))
+    return result
@@ -0,0 +1,50 @@
+# app/services/worker_pool.py
+"""Dieses Modul stellt einen prozessweit geteilten Pool von Worker-Prozessen bereit."""
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def default_worker_count() -> int:
+    """Standardmäßig ein Worker-Prozess pro CPU-Kern."""
+    return os.cpu_count() or 1
+
+
+def get_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Gibt den geteilten ProcessPoolExecutor zurück und erzeugt ihn beim ersten Aufruf.
+
+    CPU-lastige Aufgaben (z.B. das Parsen vieler Importdateien) laufen so außerhalb
+    des GIL. Die Worker-Prozesse werden nur einmal gestartet und wiederverwendet.
+
+    Args:
+        max_workers: Anzahl der Worker-Prozesse. Ändert sich der Wert, wird der
+            Pool neu erzeugt, sobald er wieder angefordert wird.
+    """
+    global _pool, _pool_workers  # pylint: disable=global-statement
+    workers = max(1, max_workers or default_worker_count())
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_workers = workers
+        return _pool
+
+
+def reset_pool():
+    """Verwirft den Pool, z.B. nachdem ein Worker-Prozess abgestürzt ist."""
+    global _pool  # pylint: disable=global-statement
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(reset_pool)
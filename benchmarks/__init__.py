@@ -0,0 +1,5 @@
+# benchmarks/__init__.py
+"""
+Benchmarks für performancekritische Teile der Anwendung.
+Aufruf aus dem Projektverzeichnis, z.B.: python -m benchmarks.bench_titel_detector
+"""
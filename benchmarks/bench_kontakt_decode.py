@@ -0,0 +1,150 @@
+# benchmarks/bench_kontakt_decode.py
+"""
+Misst das Dekodieren von `Kontakt.daten` auf den Wegen, die es am häufigsten nutzen:
+mehrfaches get_data() am selben Objekt (Editor, Feld-Update), eine Seite der
+Kontaktliste und ein Export. Verglichen werden json.loads pro Aufruf (ursprünglich),
+loads_data pro Aufruf (orjson ohne Zwischenspeicher) und der aktuelle Stand.
+
+Aufruf: python -m benchmarks.bench_kontakt_decode
+"""
+import json
+import time
+
+from app.models import Kontakt
+from app.services.exporter_service import EXPORT_BATCH_SIZE
+from app.services.kontakt_service import DEFAULT_PAGE_SIZE
+from app.services.serialization import dumps_data, loads_data, loads_data_many
+
+EXPORT_ROWS = 100_000
+# So oft ruft ein Editor-Aufruf get_data() für denselben Kontakt auf
+CALLS_PER_OBJECT = 3
+REPEATS = 5
+
+
+def _daten(i: int) -> str:
+    return dumps_data(
+        {
+            "Anrede": "Frau" if i % 2 else "Herr",
+            "Vorname": f"Vorname{i % 997}",
+            "Nachname": f"Müller{i % 5003}",
+            "Firmenname": f"Bäckerei {i % 311} GmbH" if i % 3 == 0 else "",
+            "Straße": "Große Straße",
+            "Hausnummer": str(i % 200),
+            "Postleitzahl": f"{26000 + i % 900}",
+            "Ort": "Aurich",
+            "E-Mail": f"kontakt{i}@example.de",
+            "Telefon": f"+49 4941 {i:07d}",
+            "Verknüpfungen": [i - 1, i + 1],
+        }
+    )
+
+
+def _best(func) -> float:
+    """Beste von REPEATS Laufzeiten in Millisekunden."""
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def _report(label: str, variants):
+    print(label)
+    baseline = None
+    for name, func in variants:
+        elapsed = _best(func)
+        baseline = baseline or elapsed
+        print(f"  {name:34s} {elapsed:9.2f} ms  ({baseline / elapsed:4.1f}x)")
+
+
+def main():
+    texts = [_daten(i) for i in range(EXPORT_ROWS)]
+
+    def fresh_kontakte(count):
+        return [Kontakt(id=i, daten=texts[i]) for i in range(count)]
+
+    # Editor / Feld-Update: mehrere get_data() am selben Objekt, für 10.000 Kontakte
+    kontakte = fresh_kontakte(10_000)
+
+    def per_call_json():
+        for kontakt in kontakte:
+            for _ in range(CALLS_PER_OBJECT):
+                json.loads(kontakt.daten)
+
+    def per_call_orjson():
+        for kontakt in kontakte:
+            for _ in range(CALLS_PER_OBJECT):
+                loads_data(kontakt.daten)
+
+    def cached():
+        for kontakt in kontakte:
+            kontakt._data_cache = None  # pylint: disable=protected-access
+            for _ in range(CALLS_PER_OBJECT):
+                kontakt.get_data()
+
+    _report(
+        f"{CALLS_PER_OBJECT}x get_data() je Kontakt, 10.000 Kontakte:",
+        [
+            ("json.loads pro Aufruf", per_call_json),
+            ("loads_data pro Aufruf", per_call_orjson),
+            ("get_data mit Zwischenspeicher", cached),
+        ],
+    )
+
+    # Kontaktliste: eine Seite, 1.000 Seiten hintereinander
+    pages = [fresh_kontakte(DEFAULT_PAGE_SIZE) for _ in range(1_000)]
+
+    def page_json():
+        for page in pages:
+            [json.loads(kontakt.daten) for kontakt in page]
+
+    def page_single():
+        for page in pages:
+            for kontakt in page:
+                kontakt._data_cache = None  # pylint: disable=protected-access
+            [kontakt.get_data() for kontakt in page]
+
+    def page_bulk():
+        for page in pages:
+            Kontakt.get_data_many(page)
+
+    _report(
+        f"Kontaktliste, 1.000 Seiten à {DEFAULT_PAGE_SIZE}:",
+        [
+            ("json.loads je Kontakt", page_json),
+            ("get_data je Kontakt", page_single),
+            ("Kontakt.get_data_many", page_bulk),
+        ],
+    )
+
+    # Export: alle Zeilen in Blöcken wie iter_kontakte_data
+    batches = [
+        texts[start : start + EXPORT_BATCH_SIZE]
+        for start in range(0, EXPORT_ROWS, EXPORT_BATCH_SIZE)
+    ]
+
+    def export_json():
+        for batch in batches:
+            [json.loads(text or "{}") for text in batch]
+
+    def export_single():
+        for batch in batches:
+            [loads_data(text) for text in batch]
+
+    def export_bulk():
+        for batch in batches:
+            loads_data_many(batch)
+
+    _report(
+        f"Export, {EXPORT_ROWS:,} Kontakte:",
+        [
+            ("json.loads je Zeile", export_json),
+            ("loads_data je Zeile", export_single),
+            ("loads_data_many je Block", export_bulk),
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# benchmarks/bench_kontakt_indexes.py
+"""
+Vergleicht die häufigsten Abfragen auf `kontakt`, `gruppe` und `eigenschaft` ohne und mit
+den Indizes aus models.py (Fremdschlüssel, Sortierindizes, generierte Spalten) bei
+100.000 und 1.000.000 Kontakten. Für jede Abfrage werden der Abfrageplan
+(EXPLAIN QUERY PLAN) und die Laufzeit ausgegeben.
+
+Aufruf: python -m benchmarks.bench_kontakt_indexes [Anzahl ...]
+"""
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from flask import Flask
+
+from app.models import db
+
+ROW_COUNTS = (100_000, 1_000_000)
+VORLAGEN = 10
+GRUPPEN_PRO_VORLAGE = 5
+EIGENSCHAFTEN_PRO_GRUPPE = 6
+INSERT_BATCH = 10_000
+REPEATS = 5
+
+ORTE = ["Aurich", "Emden", "Leer", "Norden", "Wittmund", "Oldenburg", "Bremen"]
+
+# Die Abfragen, wie SQLAlchemy sie für die jeweiligen Stellen der App erzeugt
+QUERIES = {
+    "api/kontakte-by-vorlage (filter_by vorlage_id)": (
+        "SELECT id, vorlage_id, daten FROM kontakt WHERE vorlage_id = :vorlage_id"
+    ),
+    "Export (vorlage_id, ORDER BY id)": (
+        "SELECT id, daten FROM kontakt WHERE vorlage_id = :vorlage_id ORDER BY id"
+    ),
+    "Vorlage.gruppen laden": "SELECT id, name FROM gruppe WHERE vorlage_id = :vorlage_id",
+    "Gruppe.eigenschaften laden": (
+        "SELECT id, name FROM eigenschaft WHERE gruppe_id = :gruppe_id"
+    ),
+    "Kontaktliste nach Nachname (erste Seite)": (
+        "SELECT id, daten, coalesce(nachname, '') COLLATE NOCASE AS sort_value "
+        "FROM kontakt WHERE vorlage_id = :vorlage_id "
+        "ORDER BY coalesce(nachname, '') COLLATE NOCASE, id LIMIT 101"
+    ),
+    "Kontaktliste nach Nachname (Folgeseite)": (
+        "SELECT id, daten FROM kontakt WHERE vorlage_id = :vorlage_id "
+        "AND coalesce(nachname, '') COLLATE NOCASE >= :last_value "
+        "AND (coalesce(nachname, '') COLLATE NOCASE > :last_value OR id > :last_id) "
+        "ORDER BY coalesce(nachname, '') COLLATE NOCASE, id LIMIT 101"
+    ),
+    "Kontaktliste nach Ort (erste Seite)": (
+        "SELECT id, daten FROM kontakt WHERE vorlage_id = :vorlage_id "
+        "ORDER BY coalesce({ort}, '') COLLATE NOCASE, id LIMIT 101"
+    ),
+}
+
+
+def _create_schema(db_path: str):
+    """Legt das Schema wie db.create_all() inklusive aller Indizes an."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.engine.dispose()
+
+
+def _fill(conn: sqlite3.Connection, row_count: int):
+    """Füllt Vorlagen, Gruppen, Eigenschaften und Kontakte."""
+    # Der Volltextindex ist nicht Gegenstand dieser Messung und bremst nur das Befüllen
+    for trigger in ("kontakt_fts_insert", "kontakt_fts_update", "kontakt_fts_delete"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+
+    eigenschaft_id = 0
+    for vorlage_id in range(1, VORLAGEN + 1):
+        conn.execute(
+            "INSERT INTO vorlage (id, name, is_standard) VALUES (?, ?, 0)",
+            (vorlage_id, f"Vorlage {vorlage_id}"),
+        )
+        for g in range(GRUPPEN_PRO_VORLAGE):
+            gruppe_id = (vorlage_id - 1) * GRUPPEN_PRO_VORLAGE + g + 1
+            conn.execute(
+                "INSERT INTO gruppe (id, name, vorlage_id) VALUES (?, ?, ?)",
+                (gruppe_id, f"Gruppe {g}", vorlage_id),
+            )
+            for e in range(EIGENSCHAFTEN_PRO_GRUPPE):
+                eigenschaft_id += 1
+                conn.execute(
+                    "INSERT INTO eigenschaft (id, name, datentyp, gruppe_id, "
+                    "allow_multiselect) VALUES (?, ?, 'text', ?, 0)",
+                    (eigenschaft_id, f"Feld {e}", gruppe_id),
+                )
+
+    def rows(start, stop):
+        for i in range(start, stop):
+            daten = {
+                "Vorname": f"Vorname{i % 997}",
+                "Nachname": f"Nachname{(i * 7919) % 100_003:06d}",
+                "E-Mail": f"kontakt{i}@example.de",
+                "Postleitzahl": f"{26000 + i % 900}",
+                "Ort": ORTE[i % len(ORTE)],
+                "Straße": "Hauptstraße",
+                "Hausnummer": str(i % 200),
+            }
+            yield (
+                i % VORLAGEN + 1,
+                json.dumps(daten),
+                daten["Vorname"],
+                daten["Nachname"],
+                "",
+            )
+
+    for start in range(0, row_count, INSERT_BATCH):
+        conn.executemany(
+            "INSERT INTO kontakt (vorlage_id, daten, vorname, nachname, firma, "
+            "validation_acknowledged) VALUES (?, ?, ?, ?, ?, 0)",
+            rows(start, min(start + INSERT_BATCH, row_count)),
+        )
+        conn.commit()
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+def _measure(conn: sqlite3.Connection, ort_expression: str):
+    """Gibt Abfrageplan und Median der Laufzeit aller Abfragen aus."""
+    params = {"vorlage_id": 3, "gruppe_id": 12, "last_value": "nachname050000", "last_id": 0}
+    for label, sql in QUERIES.items():
+        sql = sql.format(ort=ort_expression)
+        plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            count = len(conn.execute(sql, params).fetchall())
+            timings.append(time.perf_counter() - start)
+        print(f"  {label}: {statistics.median(timings) * 1000:9.2f} ms  ({count} Zeilen)")
+        for step in plan:
+            print(f"      {step}")
+
+
+def run(row_count: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        _create_schema(db_path)
+        conn = sqlite3.connect(db_path)
+
+        index_sql = [
+            sql
+            for (sql,) in conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'"
+            )
+        ]
+        index_names = [
+            name
+            for (name,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'ix_%'"
+            )
+        ]
+
+        start = time.perf_counter()
+        _fill(conn, row_count)
+        print(f"\n{row_count:,} Kontakte angelegt in {time.perf_counter() - start:.1f} s")
+
+        # Vorher: ohne die Indizes, Attribute wie bisher per json_extract
+        for name in index_names:
+            conn.execute(f"DROP INDEX {name}")
+        conn.execute("ANALYZE")
+        print("Ohne Indizes:")
+        _measure(conn, "json_extract(daten, '$.\"Ort\"')")
+
+        start = time.perf_counter()
+        for sql in index_sql:
+            conn.execute(sql)
+        conn.execute("ANALYZE")
+        conn.commit()
+        print(f"Mit Indizes (angelegt in {time.perf_counter() - start:.1f} s):")
+        _measure(conn, "attr_ort")
+        conn.close()
+
+
+def main():
+    row_counts = [int(arg) for arg in sys.argv[1:]] or ROW_COUNTS
+    for row_count in row_counts:
+        run(row_count)
+
+
+if __name__ == "__main__":
+    main()
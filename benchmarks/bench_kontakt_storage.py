@@ -0,0 +1,134 @@
+# benchmarks/bench_kontakt_storage.py
+"""
+Vergleicht das bisherige Speicherformat der Kontakte (json.dumps, Rohinhalt als Text)
+mit dem aktuellen (kompaktes JSON über orjson, Rohinhalt zlib-komprimiert): Größe der
+Datenbankdatei sowie Durchsatz beim Lesen von `daten` und `import_raw_content`.
+
+Aufruf: python -m benchmarks.bench_kontakt_storage [Anzahl]
+"""
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from app.services.serialization import DATA_CODECS, compress_text, decompress_text
+
+ROW_COUNT = 100_000
+# Anteil der Kontakte mit Rohinhalt und dessen Umfang (Zeilen der Quelldatei)
+RAW_EVERY = 10
+RAW_LINES = 200
+
+ORTE = ["Aurich", "Emden", "Leer", "Norden", "Wittmund", "Oldenburg", "Bremen", "Münster"]
+
+
+def _kontakt(i: int):
+    return {
+        "Anrede": "Frau" if i % 2 else "Herr",
+        "Titel (akademisch)": "Dr." if i % 9 == 0 else "",
+        "Vorname": f"Vorname{i % 997}",
+        "Nachname": f"Müller-Lüdenscheidt{i % 5003}",
+        "Firmenname": f"Bäckerei Größe {i % 311} GmbH & Co. KG" if i % 3 == 0 else "",
+        "Straße": "Große Straße",
+        "Hausnummer": str(i % 200),
+        "Postleitzahl": f"{26000 + i % 900}",
+        "Ort": ORTE[i % len(ORTE)],
+        "E-Mail": f"kontakt{i}@example.de",
+        "Telefon": f"+49 4941 {i:07d}",
+        "Bemerkung": "Rückruf erwünscht, bevorzugt vormittags",
+    }
+
+
+def _raw_content(i: int) -> str:
+    header = "Anrede;Vorname;Nachname;Straße;Hausnummer;Postleitzahl;Ort;E-Mail\n"
+    return header + "".join(
+        f"Frau;Vorname{j};Müller{j};Große Straße;{j % 200};{26000 + j % 900};"
+        f"{ORTE[j % len(ORTE)]};kontakt{j}@example.de\n"
+        for j in range(i, i + RAW_LINES)
+    )
+
+
+def _build(path: str, row_count: int, dumps_data, encode_raw):
+    """Legt eine Datenbank mit dem jeweiligen Format an und gibt ihre Größe zurück."""
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE kontakt (id INTEGER PRIMARY KEY, daten TEXT NOT NULL, "
+        "import_raw_content TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO kontakt (id, daten, import_raw_content) VALUES (?, ?, ?)",
+        (
+            (
+                i,
+                dumps_data(_kontakt(i)),
+                encode_raw(_raw_content(i)) if i % RAW_EVERY == 0 else None,
+            )
+            for i in range(1, row_count + 1)
+        ),
+    )
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    return os.path.getsize(path)
+
+
+def _read(path: str, loads_data, decode_raw):
+    """Misst Lesen und Dekodieren aller `daten` bzw. aller Rohinhalte (Einträge pro Sekunde)."""
+    conn = sqlite3.connect(path)
+    (daten_bytes,) = conn.execute(
+        "SELECT sum(length(CAST(daten AS BLOB))) FROM kontakt"
+    ).fetchone()
+
+    start = time.perf_counter()
+    count = 0
+    for (daten,) in conn.execute("SELECT daten FROM kontakt"):
+        loads_data(daten)
+        count += 1
+    daten_rate = count / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    raw_count = 0
+    for (raw,) in conn.execute(
+        "SELECT import_raw_content FROM kontakt WHERE import_raw_content IS NOT NULL"
+    ):
+        decode_raw(raw)
+        raw_count += 1
+    raw_rate = raw_count / (time.perf_counter() - start)
+    conn.close()
+    return daten_bytes, daten_rate, raw_rate
+
+
+def main():
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else ROW_COUNT
+    variants = {
+        "bisher (json, Rohinhalt als Text)": (
+            DATA_CODECS["json"],
+            lambda text: text,
+            lambda raw: raw,
+        ),
+        "neu (orjson, Rohinhalt mit zlib)": (
+            DATA_CODECS["orjson"],
+            compress_text,
+            decompress_text,
+        ),
+    }
+    print(f"{row_count:,} Kontakte, jeder {RAW_EVERY}. mit {RAW_LINES} Zeilen Rohinhalt")
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, (codec, encode_raw, decode_raw) in variants.items():
+            path = os.path.join(tmp, f"{codec.name}.db")
+            size = _build(path, row_count, codec.dumps, encode_raw)
+            daten_bytes, daten_rate, raw_rate = _read(path, codec.loads, decode_raw)
+            print(
+                f"  {label:34s} Datei {size / 1024 / 1024:6.1f} MB, "
+                f"davon daten {daten_bytes / 1024 / 1024:5.1f} MB   "
+                f"daten: {daten_rate:9,.0f}/s   Rohinhalt: {raw_rate:7,.0f}/s"
+            )
+    # Beide Formate müssen dieselben Daten ergeben
+    sample = _kontakt(7)
+    assert DATA_CODECS["orjson"].loads(DATA_CODECS["orjson"].dumps(sample)) == sample
+    assert json.loads(DATA_CODECS["orjson"].dumps(sample)) == sample
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_msg_importer.py
+"""
+Vergleicht den Durchsatz (Dateien pro Sekunde) des MSG-Imports im Prozess mit der
+bisherigen Variante, die pro Datei `python -m extract_msg` als Unterprozess startet.
+"""
+import glob
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from app.services.importers import msg_importer
+
+SAMPLE_DIR = "msgDatein"
+ROUNDS = 10
+
+
+def parse_msg_subprocess(file_path: str):
+    """Die bisherige Implementierung: Extraktion über einen Unterprozess und Temp-Ordner."""
+    temp_dir = tempfile.mkdtemp(prefix="msg_extract_")
+    try:
+        subprocess.run(
+            [sys.executable, "-m", "extract_msg", "--out", temp_dir, file_path],
+            capture_output=True,
+            text=True,
+            check=False,
+            encoding="latin-1",
+        )
+        ignored_files = ["attachments.txt", "rtf-body.txt", "body.html", "message.html"]
+        for root, _, files in os.walk(temp_dir):
+            for file in files:
+                if file.lower().endswith(".txt") and file.lower() not in ignored_files:
+                    with open(
+                        os.path.join(root, file), "r", encoding="utf-8", errors="ignore"
+                    ) as f:
+                        return [msg_importer._parse_message_text(f.read())]
+        return {"error": "Keine Textdatei gefunden"}
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+def _measure(label: str, func, files):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for file_path in files:
+            func(file_path)
+    duration = time.perf_counter() - start
+    count = ROUNDS * len(files)
+    print(f"{label}: {count} Dateien in {duration:.2f} s ({count / duration:.1f} Dateien/s)")
+
+
+def run_benchmark():
+    """Führt beide Varianten über die Beispieldateien aus."""
+    files = sorted(glob.glob(os.path.join(SAMPLE_DIR, "*.msg")))
+    files += sorted(glob.glob(os.path.join(SAMPLE_DIR, "*.oft")))
+    if not files:
+        print(f"Keine .msg/.oft-Dateien in '{SAMPLE_DIR}' gefunden.")
+        return
+
+    _measure("Unterprozess", parse_msg_subprocess, files)
+    _measure("Im Prozess  ", msg_importer.parse_msg_file, files)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,94 @@
+# benchmarks/bench_pdf_logo.py
+"""
+Erzeugt Etiketten und Serienbriefe über mehrere Seiten mit SVG-, PNG- und JPG-Logo,
+misst die Laufzeit und prüft mit pypdf, dass jede Seite das Logo enthält und jedes
+gezeichnete XObject (auch innerhalb des Logo-Formulars) in den Ressourcen steht.
+
+Aufruf: python -m benchmarks.bench_pdf_logo [Anzahl]
+"""
+import io
+import os
+import re
+import sys
+import tempfile
+import time
+
+from PIL import Image
+from pypdf import PdfReader
+
+from app.services.exporters import pdf_exporter
+
+ROW_COUNT = 1_200
+SVG_LOGO = os.path.join("static", "img", "logo_rolf-janssen_2024.svg")
+
+_DO_PATTERN = re.compile(rb"/([A-Za-z0-9]+) Do")
+
+
+def _kontakte(count):
+    for i in range(count):
+        yield {
+            "daten": {
+                "Vorname": f"Vorname{i}",
+                "Nachname": f"Nachname{i}",
+                "Straße": "Hauptstraße",
+                "Hausnummer": str(i % 200),
+                "Postleitzahl": "26603",
+                "Ort": "Aurich",
+            }
+        }
+
+
+def _raster_logos(folder):
+    """Legt ein PNG- und ein JPG-Logo an."""
+    paths = []
+    for extension in ("png", "jpg"):
+        path = os.path.join(folder, f"logo.{extension}")
+        Image.new("RGB", (120, 60), (200, 30, 30)).save(path)
+        paths.append(path)
+    return paths
+
+
+def _check_xobjects(content, resources, where):
+    """Jedes per "Do" gezeichnete XObject muss in den Ressourcen stehen, rekursiv."""
+    names = set(_DO_PATTERN.findall(content))
+    xobjects = resources.get("/XObject", {}) if resources else {}
+    for name in names:
+        key = "/" + name.decode("latin-1")
+        assert key in xobjects, f"{where}: XObject {key} fehlt in den Ressourcen"
+        xobject = xobjects[key].get_object()
+        if xobject.get("/Subtype") == "/Form":
+            _check_xobjects(xobject.get_data(), xobject.get("/Resources"), where)
+    return names
+
+
+def _check(pdf_bytes, label):
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    for number, page in enumerate(reader.pages, start=1):
+        content = page.get_contents().get_data()
+        names = _check_xobjects(content, page.get("/Resources"), f"{label} S. {number}")
+        assert names, f"{label} S. {number}: kein Logo gezeichnet"
+    return len(reader.pages)
+
+
+def main():
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else ROW_COUNT
+    with tempfile.TemporaryDirectory() as tmp:
+        for logo_path in [SVG_LOGO, *_raster_logos(tmp)]:
+            config = {"logo_path": logo_path}
+            name = os.path.splitext(logo_path)[1]
+            for label, generate, count in (
+                ("Etiketten", pdf_exporter.generate_labels_pdf, row_count),
+                ("Serienbriefe", pdf_exporter.generate_letters_pdf, row_count // 10),
+            ):
+                start = time.perf_counter()
+                pdf_bytes = generate(_kontakte(count), config)
+                elapsed = time.perf_counter() - start
+                pages = _check(pdf_bytes, f"{label} {name}")
+                print(
+                    f"{label:12s} {name:4s} {count:6d} Kontakte, {pages:4d} Seiten: "
+                    f"{elapsed:6.2f} s, {len(pdf_bytes) / 1024:8.0f} KiB, Logo auf jeder Seite"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+# benchmarks/bench_titel_detector.py
+"""
+Vergleicht den vorkompilierten Titel-Extraktor mit der bisherigen Variante
+(ein Regex pro Titel und Aufruf) auf Ergebnisse und Laufzeit.
+
+Beabsichtigte Abweichungen von der bisherigen Variante:
+- Titel, die auf einen Punkt enden (z.B. "Dr.", "Dr. rer. nat."), werden auch vor
+  einem Leerzeichen, einem Satzzeichen oder am Textende gefunden. Das bisherige
+  abschließende \\b verlangte dort ein Wortzeichen, sodass z.B. "Prof. Dr. Max"
+  keinen Titel ergab. Titel, die auf einen Buchstaben enden (z.B. "MBA"), behalten
+  die Wortgrenze.
+
+Jede andere Abweichung wird als unerwartet gemeldet.
+
+Aufruf: python -m benchmarks.bench_titel_detector
+"""
+import random
+import re
+import time
+from typing import Callable, List
+
+from app.services import titel_detector
+from app.services.titel_detector import IGNORED_TITLES, PRESTAGED_TITLES
+
+SAMPLE_SIZE = 50_000
+DISTINCT_POSITIONS = 2_000  # Positionen wiederholen sich in echten Importen häufig
+WORDS = ["Geschäftsführer", "Leiter", "Vertrieb", "Max", "Anna", "(FH)", "Einkauf"]
+
+
+def baseline_pattern(title: str) -> str:
+    """Das Pattern der bisherigen Implementierung: Wortgrenze auf beiden Seiten."""
+    return r"\b" + re.escape(title) + r"\b"
+
+
+def extract_titles_reference(
+    text: str, title_pattern: Callable[[str], str] = baseline_pattern
+) -> List[str]:
+    """Die bisherige Implementierung: jeder Titel wird einzeln gesucht."""
+    if not text:
+        return []
+    found_titles = set()
+    sorted_titles = sorted(PRESTAGED_TITLES + IGNORED_TITLES, key=len, reverse=True)
+    for title in sorted_titles:
+        if re.search(title_pattern(title), text, re.IGNORECASE):
+            found_titles.add(title)
+    relevant_titles = [t for t in found_titles if t in PRESTAGED_TITLES]
+    relevant_titles.sort(key=PRESTAGED_TITLES.index)
+    if any(t.startswith("Dr.") and t != "Dr." for t in relevant_titles):
+        if "Dr." in relevant_titles:
+            relevant_titles.remove("Dr.")
+    if "Ph.D." in found_titles and "Dr." not in relevant_titles:
+        relevant_titles.append("Dr.")
+    return relevant_titles
+
+
+def generate_positions(count: int, seed: int = 42) -> List[str]:
+    """Erzeugt zufällige Positionsangaben aus Titeln und Füllwörtern."""
+    rng = random.Random(seed)
+    tokens = PRESTAGED_TITLES + IGNORED_TITLES + WORDS
+    positions = []
+    for _ in range(count):
+        parts = rng.sample(tokens, rng.randint(0, 4))
+        text = " ".join(parts)
+        if rng.random() < 0.2:
+            text = text.lower()
+        positions.append(text)
+    return positions
+
+
+def run_benchmark():
+    """Führt den Vergleich aus und gibt die Ergebnisse auf der Konsole aus."""
+    positions = generate_positions(SAMPLE_SIZE)
+    rng = random.Random(7)
+    pool = positions[:DISTINCT_POSITIONS]
+    repeated_positions = [rng.choice(pool) for _ in range(SAMPLE_SIZE)]
+
+    intended, unexpected = [], []
+    for text in positions:
+        titles = titel_detector.extract_titles(text)
+        if titles == extract_titles_reference(text):
+            continue
+        # pylint: disable=protected-access
+        if titles == extract_titles_reference(text, titel_detector._title_pattern):
+            intended.append(text)
+        else:
+            unexpected.append(text)
+    print(
+        f"Stichproben: {len(positions)}, beabsichtigte Abweichungen "
+        f"(Titel mit Punkt am Ende): {len(intended)}, unerwartete: {len(unexpected)}"
+    )
+    for text in intended[:3]:
+        print(
+            f"  {text!r}: bisher {extract_titles_reference(text)}, "
+            f"jetzt {titel_detector.extract_titles(text)}"
+        )
+    for text in unexpected[:10]:
+        print(f"  unerwartet: {text!r}")
+
+    start = time.perf_counter()
+    for text in positions:
+        extract_titles_reference(text)
+    reference_time = time.perf_counter() - start
+
+    # pylint: disable=protected-access
+    uncached = titel_detector._extract_titles_cached.__wrapped__
+    start = time.perf_counter()
+    for text in positions:
+        uncached(text)
+    compiled_time = time.perf_counter() - start
+
+    titel_detector._extract_titles_cached.cache_clear()
+    start = time.perf_counter()
+    titel_detector.extract_titles_many(repeated_positions)
+    cached_time = time.perf_counter() - start
+
+    print(f"Referenz (ein Regex pro Titel):        {reference_time:.3f} s")
+    print(f"Vorkompiliert, ohne Cache:             {compiled_time:.3f} s")
+    print(
+        f"extract_titles_many, {DISTINCT_POSITIONS} versch. Texte: {cached_time:.3f} s"
+    )
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,85 @@
+# benchmarks/bench_xlsx_exporter.py
+"""
+Misst den Spitzenverbrauch an Arbeitsspeicher (Peak RSS) des Excel-Exports für
+100.000 Kontakte: bisherige Variante (alle Kontakte als Liste, normale Arbeitsmappe
+im Speicher) gegen den Write-only-Export aus einem Generator in eine temporäre Datei.
+Jede Variante läuft in einem eigenen Prozess, damit sich die Messungen nicht beeinflussen.
+"""
+import io
+import multiprocessing
+import resource
+import time
+from typing import Any, Dict, Iterator, List
+
+import openpyxl
+
+from app.services.exporters import xlsx_exporter
+
+ROW_COUNT = 100_000
+COLUMNS = [
+    "Anrede", "Titel", "Vorname", "Nachname", "Firmenname", "Position", "Abteilung",
+    "E-Mail", "Telefon (geschäftlich)", "Mobilnummer", "Website", "Straße",
+    "Hausnummer", "Postleitzahl", "Ort", "Land", "Kundennummer", "Status", "Notizen",
+]
+
+
+def generate_kontakte(count: int) -> Iterator[Dict[str, Any]]:
+    """Erzeugt Kontakte mit realistisch langen Werten, wie sie iter_kontakte_data liefert."""
+    for i in range(count):
+        yield {
+            "id": i,
+            "daten": {name: f"{name} {i:06d}" for name in COLUMNS},
+        }
+
+
+def generate_xlsx_legacy(kontakte: List[Dict[str, Any]], eigenschaften) -> bytes:
+    """Die bisherige Implementierung: normale Arbeitsmappe, gespeichert in ein BytesIO."""
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    headers = [e["name"] for e in eigenschaften]
+    sheet.append(headers)
+    for kontakt in kontakte:
+        sheet.append([kontakt["daten"].get(h, "") for h in headers])
+    output = io.BytesIO()
+    workbook.save(output)
+    output.seek(0)
+    return output.getvalue()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss ist unter Linux in KiB angegeben
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run(mode: str, results):
+    eigenschaften = [{"name": name} for name in COLUMNS]
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    if mode == "legacy":
+        # Wie bisher in export_data: erst alle Kontakte laden, dann exportieren
+        size = len(generate_xlsx_legacy(list(generate_kontakte(ROW_COUNT)), eigenschaften))
+    else:
+        with xlsx_exporter.generate_xlsx_file(
+            [("Kontakte", eigenschaften, generate_kontakte(ROW_COUNT))]
+        ) as output:
+            size = output.seek(0, io.SEEK_END)
+    results.put((mode, time.perf_counter() - start, _peak_rss_mb() - baseline, size))
+
+
+def run_benchmark():
+    """Führt beide Varianten nacheinander in frischen Prozessen aus."""
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    for mode in ("legacy", "write_only"):
+        process = context.Process(target=_run, args=(mode, results))
+        process.start()
+        mode, duration, peak_mb, size = results.get()
+        process.join()
+        print(
+            f"{mode:<10}: {ROW_COUNT} Zeilen in {duration:.1f} s, "
+            f"Peak RSS +{peak_mb:.0f} MB, Datei {size / 1024 / 1024:.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark()
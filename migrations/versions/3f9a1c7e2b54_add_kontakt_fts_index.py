@@ -0,0 +1,70 @@
+"""Add FTS5 full-text index for Kontakt
+
+Revision ID: 3f9a1c7e2b54
+Revises: 855daa6bf681
+Create Date: 2026-10-17 09:12:41.518203
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "3f9a1c7e2b54"
+down_revision = "855daa6bf681"
+branch_labels = None
+depends_on = None
+
+
+def _inhalt(alias):
+    # Alle Attributwerte aus `daten` als durchsuchbarer Text
+    return (
+        "(SELECT group_concat(value, ' ') FROM json_each("
+        f"CASE WHEN json_valid({alias}.daten) THEN {alias}.daten ELSE '{{}}' END"
+        ") WHERE atom IS NOT NULL)"
+    )
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS kontakt_fts USING fts5("
+        "vorname, nachname, firma, inhalt, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS kontakt_fts_insert AFTER INSERT ON kontakt BEGIN "
+        "INSERT INTO kontakt_fts (rowid, vorname, nachname, firma, inhalt) VALUES "
+        f"(NEW.id, NEW.vorname, NEW.nachname, NEW.firma, {_inhalt('NEW')}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS kontakt_fts_delete AFTER DELETE ON kontakt BEGIN "
+        "DELETE FROM kontakt_fts WHERE rowid = OLD.id; END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS kontakt_fts_update "
+        "AFTER UPDATE OF daten, vorname, nachname, firma ON kontakt BEGIN "
+        "DELETE FROM kontakt_fts WHERE rowid = OLD.id; "
+        "INSERT INTO kontakt_fts (rowid, vorname, nachname, firma, inhalt) VALUES "
+        f"(NEW.id, NEW.vorname, NEW.nachname, NEW.firma, {_inhalt('NEW')}); END"
+    )
+
+    # Bestehende Kontakte in den Index übernehmen
+    op.execute("DELETE FROM kontakt_fts")
+    op.execute(
+        "INSERT INTO kontakt_fts (rowid, vorname, nachname, firma, inhalt) "
+        f"SELECT k.id, k.vorname, k.nachname, k.firma, {_inhalt('k')} FROM kontakt AS k"
+    )
+    op.execute("INSERT INTO kontakt_fts (kontakt_fts) VALUES ('optimize')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS kontakt_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS kontakt_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS kontakt_fts_insert")
+    op.execute("DROP TABLE IF EXISTS kontakt_fts")
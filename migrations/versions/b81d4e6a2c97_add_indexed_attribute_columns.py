@@ -0,0 +1,57 @@
+"""Add generated, indexed columns for frequently used Kontakt attributes
+
+Revision ID: b81d4e6a2c97
+Revises: 3f9a1c7e2b54
+Create Date: 2026-10-17 14:03:27.861245
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b81d4e6a2c97"
+down_revision = "3f9a1c7e2b54"
+branch_labels = None
+depends_on = None
+
+# Attributname -> Spaltenname (Stand dieser Migration, siehe INDEXED_ATTRIBUTES)
+INDEXED_ATTRIBUTES = {
+    "Postleitzahl": "attr_postleitzahl",
+    "Ort": "attr_ort",
+    "E-Mail": "attr_email",
+    "Anrede": "attr_anrede",
+}
+
+
+def _json_path(attribute):
+    """JSON-Pfad im SQL-Literal, maskiert wie in models.indexed_attribute_ddl."""
+    path = attribute.replace("\\", "\\\\").replace('"', '\\"').replace("'", "''")
+    return f"$.\"{path}\""
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for attribute, column_name in INDEXED_ATTRIBUTES.items():
+        # Virtuelle Spalten belegen keinen Platz in der Tabelle, nur im Index
+        op.execute(
+            f"ALTER TABLE kontakt ADD COLUMN {column_name} GENERATED ALWAYS AS ("
+            f"CASE WHEN json_valid(daten) THEN json_extract(daten, '{_json_path(attribute)}') END"
+            ") VIRTUAL"
+        )
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_kontakt_{column_name} ON kontakt "
+            f"(vorlage_id, coalesce({column_name}, '') COLLATE NOCASE, id)"
+        )
+    op.execute("ANALYZE kontakt")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for column_name in INDEXED_ATTRIBUTES.values():
+        op.execute(f"DROP INDEX IF EXISTS ix_kontakt_{column_name}")
+        op.execute(f"ALTER TABLE kontakt DROP COLUMN {column_name}")
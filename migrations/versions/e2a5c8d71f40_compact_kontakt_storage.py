@@ -0,0 +1,149 @@
+"""Store Kontakt.daten as compact JSON and compress import_raw_content
+
+Revision ID: e2a5c8d71f40
+Revises: c4f7a9e1d205
+Create Date: 2026-10-17 16:48:52.117390
+
+"""
+
+import json
+import zlib
+
+from alembic import op
+import orjson
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e2a5c8d71f40"
+down_revision = "c4f7a9e1d205"
+branch_labels = None
+depends_on = None
+
+# Zeilen pro Durchgang, damit auch große Datenbanken nicht komplett im Speicher landen
+BATCH_SIZE = 5000
+
+# Kodierung des Rohinhalts (Stand dieser Migration, siehe app/services/serialization.py)
+RAW_PLAIN = b"\x00"
+RAW_ZLIB = b"\x01"
+RAW_COMPRESS_MIN_SIZE = 256
+RAW_COMPRESS_LEVEL = 6
+
+
+def _compact_json(text):
+    try:
+        data = json.loads(text)
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    except (ValueError, TypeError, orjson.JSONEncodeError):
+        # Ungültige oder nicht darstellbare Werte bleiben, wie sie sind
+        return text
+
+
+def _legacy_json(text):
+    try:
+        return json.dumps(json.loads(text))
+    except (ValueError, TypeError):
+        return text
+
+
+def _compress(text):
+    raw = text.encode("utf-8")
+    if len(raw) >= RAW_COMPRESS_MIN_SIZE:
+        compressed = zlib.compress(raw, RAW_COMPRESS_LEVEL)
+        if len(compressed) < len(raw):
+            return RAW_ZLIB + compressed
+    return RAW_PLAIN + raw
+
+
+def _decompress(value):
+    value = bytes(value)
+    if value[:1] == RAW_ZLIB:
+        return zlib.decompress(value[1:]).decode("utf-8")
+    return value[1:].decode("utf-8")
+
+
+def _rewrite(convert_daten, convert_raw, raw_is_pending):
+    """Schreibt daten und import_raw_content aller Kontakte blockweise um."""
+    conn = op.get_bind()
+    kontakt = sa.table(
+        "kontakt",
+        sa.column("id", sa.Integer),
+        sa.column("daten", sa.Text),
+        sa.column("import_raw_content"),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(kontakt.c.id, kontakt.c.daten, kontakt.c.import_raw_content)
+            .where(kontakt.c.id > last_id)
+            .order_by(kontakt.c.id)
+            .limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            break
+        updates = []
+        for kontakt_id, daten, raw in rows:
+            new_daten = convert_daten(daten) if daten else daten
+            new_raw = convert_raw(raw) if raw is not None and raw_is_pending(raw) else raw
+            if new_daten != daten or new_raw is not raw:
+                updates.append({"b_id": kontakt_id, "daten": new_daten, "raw": new_raw})
+        if updates:
+            conn.execute(
+                kontakt.update()
+                .where(kontakt.c.id == sa.bindparam("b_id"))
+                .values(daten=sa.bindparam("daten"), import_raw_content=sa.bindparam("raw")),
+                updates,
+            )
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    conn = op.get_bind()
+    if conn.dialect.name != "sqlite":
+        # SQLite speichert Binärwerte auch in der bisherigen TEXT-Spalte, sonst wird
+        # die Spalte umgestellt (der Inhalt folgt unten)
+        with op.batch_alter_table("kontakt", schema=None) as batch_op:
+            batch_op.alter_column(
+                "import_raw_content",
+                existing_type=sa.Text(),
+                type_=sa.LargeBinary(),
+                existing_nullable=True,
+                postgresql_using="convert_to(import_raw_content, 'UTF8')",
+            )
+        # convert_to liefert die UTF-8-Bytes ohne Kennung, sie wird hier vorangestellt
+        op.execute(
+            "UPDATE kontakt SET import_raw_content = '\\x00'::bytea || import_raw_content "
+            "WHERE import_raw_content IS NOT NULL"
+        )
+
+        def pending(raw):
+            return bytes(raw)[:1] == RAW_PLAIN
+
+        def convert(raw):
+            return _compress(bytes(raw)[1:].decode("utf-8"))
+
+        _rewrite(_compact_json, convert, pending)
+        return
+
+    _rewrite(_compact_json, _compress, lambda raw: isinstance(raw, str))
+
+
+def downgrade():
+    conn = op.get_bind()
+    if conn.dialect.name != "sqlite":
+        _rewrite(
+            _legacy_json,
+            lambda raw: RAW_PLAIN + _decompress(raw).encode("utf-8"),
+            lambda raw: bytes(raw)[:1] == RAW_ZLIB,
+        )
+        with op.batch_alter_table("kontakt", schema=None) as batch_op:
+            batch_op.alter_column(
+                "import_raw_content",
+                existing_type=sa.LargeBinary(),
+                type_=sa.Text(),
+                existing_nullable=True,
+                postgresql_using="convert_from(substring(import_raw_content from 2), 'UTF8')",
+            )
+        return
+
+    _rewrite(_legacy_json, _decompress, lambda raw: isinstance(raw, bytes))
@@ -37,11 +37,16 @@ document.addEventListener("DOMContentLoaded", () => {
       const importStep = ref(1);
       const importTargetVorlageId = ref(null);
       const importData = ref({});
+      const importTaskId = ref(null);
       const importMappings = ref({});
       const importError = ref("");
       const isUploading = ref(false);
       const uploadProgress = ref(0);
       const uploadStatus = ref("");
+      const isSaving = ref(false);
+      const isExporting = ref(false);
+      const exportProgress = ref(0);
+      const exportStatus = ref("");
       const mappingSearchQuery = ref("");
       const mappingStep = ref(0);
       const tomSelectInstances = {};
@@ -49,6 +54,17 @@ document.addEventListener("DOMContentLoaded", () => {
 
       const searchQuery = ref("");
       const showIncompleteFirst = ref(false);
+      const kontakte = ref([]);
+      const columnFilters = ref({});
+      const nextCursor = ref(null);
+      const totalKontakte = ref(0);
+      const isLoadingKontakte = ref(false);
+      const loadError = ref("");
+      const loadMoreSentinel = ref(null);
+      const pageSize = 100;
+      let loadRequestId = 0;
+      let reloadTimer = null;
+      let sentinelObserver = null;
       const validationFields = [
         "Anrede",
         "Vorname",
@@ -108,24 +124,16 @@ document.addEventListener("DOMContentLoaded", () => {
         return vorlagen.value.find((v) => v.id === activeVorlageId.value);
       });
 
+      // Suche, Filter und Sortierung erfolgen serverseitig; hier wird nur validiert.
       const processedKontakte = computed(() => {
         if (!activeVorlage.value) return [];
-        const query = searchQuery.value.toLowerCase().trim();
-
-        const filtered = !query
-          ? activeVorlage.value.kontakte
-          : activeVorlage.value.kontakte.filter((k) =>
-              Object.values(k.daten).some((val) =>
-                String(val).toLowerCase().includes(query)
-              )
-            );
-
-        return filtered.map((k) => ({
+        return kontakte.value.map((k) => ({
           ...k,
           validation: getKontaktValidation(k),
         }));
       });
 
+      // Sortiert nur die bereits geladenen Kontakte um, die Validierung erfolgt im Browser
       const sortedKontakte = computed(() => {
         if (!processedKontakte.value) return [];
 
@@ -143,19 +151,6 @@ document.addEventListener("DOMContentLoaded", () => {
           });
         }
 
-        if (sortColumn.value) {
-          kontakteCopy.sort((a, b) => {
-            const valA = a.daten[sortColumn.value] || "";
-            const valB = b.daten[sortColumn.value] || "";
-            let comparison = String(valA).localeCompare(
-              String(valB),
-              undefined,
-              { numeric: true }
-            );
-            return sortDirection.value === "asc" ? comparison : -comparison;
-          });
-        }
-
         return kontakteCopy;
       });
 
@@ -182,14 +177,20 @@ document.addEventListener("DOMContentLoaded", () => {
       });
 
       const isAllSelected = computed(() => {
-        if (!activeVorlage.value || activeVorlage.value.kontakte.length === 0) {
+        if (!activeVorlage.value || kontakte.value.length === 0) {
           return false;
         }
-        return (
-          selectedKontakte.value.size === activeVorlage.value.kontakte.length
-        );
+        return selectedKontakte.value.size === kontakte.value.length;
       });
 
+      const hasMoreKontakte = computed(() => nextCursor.value !== null);
+
+      const hasActiveFilters = computed(
+        () =>
+          searchQuery.value.trim() !== "" ||
+          Object.values(columnFilters.value).some((v) => v && v.trim())
+      );
+
       const addModalVorlage = computed(() =>
         vorlagen.value.find((v) => v.id === addModalVorlageId.value)
       );
@@ -232,10 +233,95 @@ document.addEventListener("DOMContentLoaded", () => {
           : false
       );
 
+      // --- Laden der Kontakte (seitenweise vom Server) ---
+      const buildKontakteUrl = (cursor) => {
+        const params = new URLSearchParams({
+          sort: sortColumn.value || "id",
+          dir: sortDirection.value,
+          limit: pageSize,
+        });
+        const query = searchQuery.value.trim();
+        if (query) params.set("q", query);
+        const activeFilters = {};
+        for (const [name, value] of Object.entries(columnFilters.value)) {
+          if (value && value.trim()) activeFilters[name] = value.trim();
+        }
+        if (Object.keys(activeFilters).length > 0) {
+          params.set("filter", JSON.stringify(activeFilters));
+        }
+        if (cursor) params.set("cursor", cursor);
+        return `/api/vorlage/${activeVorlageId.value}/kontakte?${params}`;
+      };
+
+      const loadKontakte = async (reset = false) => {
+        if (!activeVorlageId.value) return;
+        if (!reset && (isLoadingKontakte.value || nextCursor.value === null)) {
+          return;
+        }
+
+        const requestId = ++loadRequestId;
+        isLoadingKontakte.value = true;
+        loadError.value = "";
+        try {
+          // Noch nicht gesendete Änderungen zuerst speichern, sonst lädt die Liste alte Werte
+          if (reset) await flushUpdates();
+          const response = await fetch(
+            buildKontakteUrl(reset ? null : nextCursor.value)
+          );
+          const result = await response.json();
+          if (requestId !== loadRequestId) return;
+          if (!result.success) {
+            throw new Error(result.error || "Unbekannter Fehler");
+          }
+          if (reset) {
+            kontakte.value = result.kontakte;
+            totalKontakte.value = result.total;
+            selectedKontakte.value.clear();
+          } else {
+            kontakte.value.push(...result.kontakte);
+          }
+          nextCursor.value = result.next_cursor;
+        } catch (error) {
+          if (requestId === loadRequestId) {
+            loadError.value = `Kontakte konnten nicht geladen werden: ${error.message}`;
+          }
+        } finally {
+          if (requestId === loadRequestId) {
+            isLoadingKontakte.value = false;
+          }
+        }
+      };
+
+      const scheduleReload = () => {
+        clearTimeout(reloadTimer);
+        reloadTimer = setTimeout(() => loadKontakte(true), 300);
+      };
+
       // --- Watchers ---
       watch(activeVorlageId, () => {
         selectedKontakte.value.clear();
         searchQuery.value = "";
+        columnFilters.value = {};
+        sortColumn.value = null;
+        sortDirection.value = "asc";
+        kontakte.value = [];
+        nextCursor.value = null;
+        loadKontakte(true);
+      });
+
+      watch(searchQuery, scheduleReload);
+      watch(columnFilters, scheduleReload, { deep: true });
+
+      // Lädt die nächste Seite, sobald das Ende der Tabelle sichtbar wird
+      watch(loadMoreSentinel, (el) => {
+        if (sentinelObserver) sentinelObserver.disconnect();
+        if (!el) return;
+        sentinelObserver = new IntersectionObserver((entries) => {
+          if (entries.some((entry) => entry.isIntersecting)) {
+            loadKontakte();
+          }
+        });
+        sentinelObserver.observe(el);
       });
 
       watch(
@@ -323,11 +409,10 @@ document.addEventListener("DOMContentLoaded", () => {
             });
             const result = await response.json();
             if (result.success) {
-              const index = activeVorlage.value.kontakte.findIndex(
-                (k) => k.id === kontaktId
-              );
+              const index = kontakte.value.findIndex((k) => k.id === kontaktId);
               if (index > -1) {
-                activeVorlage.value.kontakte.splice(index, 1);
+                kontakte.value.splice(index, 1);
+                totalKontakte.value--;
               }
               selectedKontakte.value.delete(kontaktId);
             } else {
@@ -340,9 +425,7 @@ document.addEventListener("DOMContentLoaded", () => {
       };
 
       const toggleValidationAcknowledgement = async (kontaktId) => {
-        const kontakt = activeVorlage.value.kontakte.find(
-          (k) => k.id === kontaktId
-        );
+        const kontakt = kontakte.value.find((k) => k.id === kontaktId);
         if (!kontakt) return;
 
         try {
@@ -412,11 +495,12 @@ document.addEventListener("DOMContentLoaded", () => {
                 (result.progress / result.total) * 100
               );
               uploadProgress.value = percent;
-              uploadStatus.value = `Verarbeite Datei ${result.progress} von ${result.total}... ${percent}%`;
+              uploadStatus.value = `Verarbeite Datei ${result.progress} von ${result.total} (${result.records || 0} Datensätze)... ${percent}%`;
             } else if (result.status === "complete") {
               clearInterval(interval);
               isUploading.value = false;
               importData.value = result.data;
+              importTaskId.value = taskId;
 
               const newMappings = {};
               allTemplateProperties.value.forEach((prop) => {
@@ -438,6 +522,32 @@ document.addEventListener("DOMContentLoaded", () => {
         }, 1000);
       };
 
+      const pollSaveStatus = (taskId) => {
+        const interval = setInterval(async () => {
+          try {
+            const response = await fetch(`/import/status/${taskId}`);
+            const result = await response.json();
+
+            if (result.status === "saving") {
+              const percent = result.total
+                ? Math.round((result.progress / result.total) * 100)
+                : 0;
+              uploadProgress.value = percent;
+              uploadStatus.value = `Speichere Kontakt ${result.progress} von ${result.total}... ${percent}%`;
+            } else if (result.status === "complete") {
+              clearInterval(interval);
+              window.location.href = result.data.redirect_url;
+            } else {
+              throw new Error(result.error || "Unbekannter Fehler");
+            }
+          } catch (error) {
+            clearInterval(interval);
+            isSaving.value = false;
+            importError.value = `Import fehlgeschlagen: ${error.message}`;
+          }
+        }, 1000);
+      };
+
       const finalizeImport = async () => {
         const mappingsForBackend = {};
         for (const templateProp in importMappings.value) {
@@ -454,14 +564,17 @@ document.addEventListener("DOMContentLoaded", () => {
               "Content-Type": "application/json",
             },
             body: JSON.stringify({
+              task_id: importTaskId.value,
               vorlage_id: importTargetVorlageId.value,
               mappings: mappingsForBackend,
-              original_data: importData.value.original_data,
             }),
           });
           const result = await response.json();
           if (result.success) {
-            window.location.href = result.redirect_url;
+            isSaving.value = true;
+            uploadProgress.value = 0;
+            uploadStatus.value = "Speichere Kontakte...";
+            pollSaveStatus(result.task_id);
           } else {
             throw new Error(result.error);
           }
@@ -537,6 +650,7 @@ document.addEventListener("DOMContentLoaded", () => {
           sortColumn.value = columnName;
           sortDirection.value = "asc";
         }
+        loadKontakte(true);
       };
 
       const toggleSelection = (kontaktId) => {
@@ -547,13 +661,12 @@ document.addEventListener("DOMContentLoaded", () => {
         }
       };
 
+      // Wählt nur die bereits geladenen Kontakte aus (siehe Hinweis in der Kopfzeile)
       const toggleSelectAll = () => {
         if (isAllSelected.value) {
           selectedKontakte.value.clear();
         } else {
-          activeVorlage.value.kontakte.forEach((k) =>
-            selectedKontakte.value.add(k.id)
-          );
+          kontakte.value.forEach((k) => selectedKontakte.value.add(k.id));
         }
       };
 
@@ -581,10 +694,11 @@ document.addEventListener("DOMContentLoaded", () => {
             });
             const result = await response.json();
             if (result.success) {
-              activeVorlage.value.kontakte =
-                activeVorlage.value.kontakte.filter(
-                  (k) => !selectedKontakte.value.has(k.id)
-                );
+              const remaining = kontakte.value.filter(
+                (k) => !selectedKontakte.value.has(k.id)
+              );
+              totalKontakte.value -= kontakte.value.length - remaining.length;
+              kontakte.value = remaining;
               selectedKontakte.value.clear();
             } else {
               throw new Error(result.error);
@@ -625,33 +739,77 @@ document.addEventListener("DOMContentLoaded", () => {
       const openAddModal = () => (isAddModalOpen.value = true);
       const closeAddModal = () => (isAddModalOpen.value = false);
 
-      const updateField = async (kontakt, fieldName, newValue) => {
-        const originalKontakt = activeVorlage.value.kontakte.find(
-          (k) => k.id === kontakt.id
-        );
-
-        if (originalKontakt.daten[fieldName] === newValue) return;
+      // Geänderte Felder werden gesammelt und gemeinsam in einer Anfrage gespeichert
+      const pendingUpdates = new Map();
+      const updateFlushDelay = 300;
+      let updateTimer = null;
+      let updateFlush = Promise.resolve();
 
+      const sendUpdates = async (updates) => {
         try {
-          const response = await fetch(`/api/kontakt/${kontakt.id}/update`, {
-            method: "POST",
+          const response = await fetch("/api/kontakte", {
+            method: "PATCH",
             headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ field: fieldName, value: newValue }),
+            body: JSON.stringify({
+              updates: updates.map(({ id, fields }) => ({ id, fields })),
+            }),
+            keepalive: true,
           });
-          if (!response.ok) throw new Error("Update fehlgeschlagen");
-
           const result = await response.json();
-          if (result.success) {
-            originalKontakt.daten[fieldName] = newValue;
-          } else {
-            throw new Error(result.error || "Unbekannter Fehler");
+          if (!result.results) {
+            throw new Error(result.error || "Update fehlgeschlagen");
           }
+          const errors = [];
+          result.results.forEach((itemResult, index) => {
+            const { kontakt, fields } = updates[index];
+            if (itemResult.success) {
+              Object.assign(kontakt.daten, fields);
+            } else {
+              errors.push(`Kontakt ${itemResult.id}: ${itemResult.error}`);
+            }
+          });
+          if (errors.length) throw new Error(errors.join("\n"));
         } catch (error) {
-          console.error("Fehler beim Speichern des Feldes:", error);
+          console.error("Fehler beim Speichern der Felder:", error);
           alert(`Speichern fehlgeschlagen: ${error.message}`);
         }
       };
 
+      const flushUpdates = () => {
+        clearTimeout(updateTimer);
+        updateTimer = null;
+        if (pendingUpdates.size) {
+          const updates = [...pendingUpdates.values()];
+          pendingUpdates.clear();
+          // Anfragen nacheinander senden, damit spätere Änderungen gewinnen
+          updateFlush = updateFlush.then(() => sendUpdates(updates));
+        }
+        return updateFlush;
+      };
+
+      const updateField = (kontakt, fieldName, newValue) => {
+        const originalKontakt = kontakte.value.find((k) => k.id === kontakt.id);
+        const pending = pendingUpdates.get(kontakt.id);
+        const currentValue =
+          pending && fieldName in pending.fields
+            ? pending.fields[fieldName]
+            : originalKontakt.daten[fieldName];
+
+        if (currentValue === newValue) return;
+
+        if (pending) {
+          pending.fields[fieldName] = newValue;
+        } else {
+          pendingUpdates.set(kontakt.id, {
+            id: kontakt.id,
+            kontakt: originalKontakt,
+            fields: { [fieldName]: newValue },
+          });
+        }
+        clearTimeout(updateTimer);
+        updateTimer = setTimeout(flushUpdates, updateFlushDelay);
+      };
+
       const saveNewContact = async () => {
         if (!addModalVorlageId.value) {
           alert("Bitte eine Vorlage auswählen.");
@@ -670,11 +828,14 @@ document.addEventListener("DOMContentLoaded", () => {
           });
           const result = await response.json();
           if (result.success) {
-            const targetVorlage = vorlagen.value.find(
-              (v) => v.id === addModalVorlageId.value
-            );
-            if (targetVorlage) {
-              targetVorlage.kontakte.push(result.kontakt);
+            if (addModalVorlageId.value === activeVorlageId.value) {
+              if (hasActiveFilters.value) {
+                // Ob der neue Kontakt zu Suche und Filtern passt, entscheidet der Server
+                loadKontakte(true);
+              } else {
+                kontakte.value.unshift(result.kontakt);
+                totalKontakte.value++;
+              }
             }
             closeAddModal();
           } else {
@@ -691,6 +852,7 @@ document.addEventListener("DOMContentLoaded", () => {
         mappingStep.value = 0;
         mappingSearchQuery.value = "";
         importData.value = {};
+        importTaskId.value = null;
         importMappings.value = {};
         importError.value = "";
         importTargetVorlageId.value = activeVorlageId.value;
@@ -769,9 +931,9 @@ document.addEventListener("DOMContentLoaded", () => {
         xhr.send(formData);
       };
 
-      const getExportUrl = (format) => {
+      const getExportUrl = (format, suffix = "") => {
         if (!activeVorlageId.value) return "#";
-        let baseUrl = `/export/${activeVorlageId.value}/${format}`;
+        let baseUrl = `/export/${activeVorlageId.value}/${format}${suffix}`;
         if (selectedKontakte.value.size > 0) {
           const ids = Array.from(selectedKontakte.value).join(",");
           baseUrl += `?ids=${ids}`;
@@ -779,6 +941,52 @@ document.addEventListener("DOMContentLoaded", () => {
         return baseUrl;
       };
 
+      const pollExportStatus = (taskId) => {
+        const interval = setInterval(async () => {
+          try {
+            const response = await fetch(`/export/status/${taskId}`);
+            const result = await response.json();
+
+            if (result.status === "processing") {
+              const percent = result.total
+                ? Math.round((result.progress / result.total) * 100)
+                : 0;
+              exportProgress.value = percent;
+              exportStatus.value = `Erstelle PDF: ${result.progress} von ${result.total} Kontakten... ${percent}%`;
+            } else if (result.status === "complete") {
+              clearInterval(interval);
+              isExporting.value = false;
+              window.location.href = result.data.download_url;
+            } else {
+              throw new Error(result.error || "Unbekannter Fehler");
+            }
+          } catch (error) {
+            clearInterval(interval);
+            isExporting.value = false;
+            alert(`Export fehlgeschlagen: ${error.message}`);
+          }
+        }, 1000);
+      };
+
+      const startPdfExport = async (format) => {
+        if (!activeVorlageId.value || isExporting.value) return;
+        try {
+          const response = await fetch(getExportUrl(format, "/job"), {
+            method: "POST",
+          });
+          const result = await response.json();
+          if (!response.ok) {
+            throw new Error(result.error || "Unbekannter Fehler");
+          }
+          isExporting.value = true;
+          exportProgress.value = 0;
+          exportStatus.value = "PDF-Export wird vorbereitet...";
+          pollExportStatus(result.task_id);
+        } catch (error) {
+          alert(`Export fehlgeschlagen: ${error.message}`);
+        }
+      };
+
       const openMultiSelectModal = (eigenschaft, kontakt) => {
         const currentValues = kontakt.daten[eigenschaft.name] || "";
         multiSelectEditData.value = {
@@ -799,7 +1007,16 @@ document.addEventListener("DOMContentLoaded", () => {
         isMultiSelectModalOpen.value = false;
       };
 
+      loadKontakte(true);
+
+      // Beim Verlassen der Seite offene Änderungen noch senden (keepalive)
+      window.addEventListener("pagehide", flushUpdates);
+
       onBeforeUnmount(() => {
+        if (sentinelObserver) sentinelObserver.disconnect();
+        clearTimeout(reloadTimer);
+        window.removeEventListener("pagehide", flushUpdates);
+        flushUpdates();
         for (const key in tomSelectInstances) {
           if (tomSelectInstances[key]) tomSelectInstances[key].destroy();
         }
@@ -849,8 +1066,13 @@ document.addEventListener("DOMContentLoaded", () => {
         handleFileUpload,
         finalizeImport,
         getExportUrl,
+        startPdfExport,
+        isExporting,
+        exportProgress,
+        exportStatus,
         getVerknuepfungDisplayName,
         isUploading,
+        isSaving,
         uploadProgress,
         uploadStatus,
         isMultiSelectModalOpen,
@@ -871,6 +1093,14 @@ document.addEventListener("DOMContentLoaded", () => {
         showIncompleteFirst,
         toggleValidationAcknowledgement,
         deleteKontakt,
+        kontakte,
+        columnFilters,
+        totalKontakte,
+        hasMoreKontakte,
+        isLoadingKontakte,
+        loadError,
+        loadKontakte,
+        loadMoreSentinel,
       };
     },
   });
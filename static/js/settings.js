@@ -56,6 +56,16 @@ document.addEventListener("DOMContentLoaded", () => {
         const addressFormatSaveStatus = ref("");
         const isAddressFormatSuccess = ref(false);
 
+        const defaultLetterSubject = "Aktuelle Informationen";
+        const defaultLetterText =
+          "Sehr geehrte Damen und Herren,\n\nhier steht der Text Ihres Serienbriefs.\n\nMit freundlichen Grüßen";
+        const letterTemplate = ref({
+          subject: initialConfigData.serienbrief_betreff || defaultLetterSubject,
+          text: initialConfigData.serienbrief_text || defaultLetterText,
+        });
+        const letterTemplateSaveStatus = ref("");
+        const isLetterTemplateSuccess = ref(false);
+
         // --- COMPUTED PROPERTIES ---
         const hasChanges = computed(
           () =>
@@ -91,6 +101,15 @@ document.addEventListener("DOMContentLoaded", () => {
           );
         });
 
+        const hasLetterTemplateChanges = computed(() => {
+          return (
+            letterTemplate.value.subject !==
+              (initialConfigData.serienbrief_betreff || defaultLetterSubject) ||
+            letterTemplate.value.text !==
+              (initialConfigData.serienbrief_text || defaultLetterText)
+          );
+        });
+
         const previewAddressBlock = computed(() => {
           const previewData = {
             firmenname: "Musterfirma GmbH & Co. KG",
@@ -270,6 +289,34 @@ document.addEventListener("DOMContentLoaded", () => {
           }
         };
 
+        const saveLetterTemplate = async () => {
+          letterTemplateSaveStatus.value = "Speichert...";
+          isLetterTemplateSuccess.value = false;
+          const payload = {
+            serienbrief_betreff: letterTemplate.value.subject,
+            serienbrief_text: letterTemplate.value.text,
+          };
+          try {
+            const response = await fetch("/settings/api/config", {
+              method: "POST",
+              headers: { "Content-Type": "application/json" },
+              body: JSON.stringify(payload),
+            });
+            const result = await response.json();
+            if (result.success) {
+              letterTemplateSaveStatus.value = result.message;
+              isLetterTemplateSuccess.value = true;
+              initialConfigData.serienbrief_betreff = letterTemplate.value.subject;
+              initialConfigData.serienbrief_text = letterTemplate.value.text;
+            } else {
+              throw new Error(result.error);
+            }
+          } catch (error) {
+            letterTemplateSaveStatus.value = `Fehler: ${error.message}`;
+            isLetterTemplateSuccess.value = false;
+          }
+        };
+
         // --- WATCHERS ---
         watch(
           saveStatus,
@@ -285,6 +332,11 @@ document.addEventListener("DOMContentLoaded", () => {
           (v) =>
             v && setTimeout(() => (addressFormatSaveStatus.value = ""), 3000)
         );
+        watch(
+          letterTemplateSaveStatus,
+          (v) =>
+            v && setTimeout(() => (letterTemplateSaveStatus.value = ""), 3000)
+        );
 
         return {
           options,
@@ -308,6 +360,11 @@ document.addEventListener("DOMContentLoaded", () => {
           addressFormatSaveStatus,
           isAddressFormatSuccess,
           previewAddressBlock,
+          letterTemplate,
+          hasLetterTemplateChanges,
+          saveLetterTemplate,
+          letterTemplateSaveStatus,
+          isLetterTemplateSuccess,
         };
       },
       delimiters: ["{[", "]}"],